@@ -2,3 +2,90 @@ import os
 from typing import Final
 
 BASE_URL: Final = os.getenv("BASE_URL", "https://sbis.ru")
+
+# Пул браузеров: сколько браузеров держать запущенными на один воркер
+# и после скольких тестов пересоздавать браузер.
+DRIVER_POOL_SIZE: Final = int(os.getenv("DRIVER_POOL_SIZE", "1"))
+DRIVER_MAX_USES: Final = int(os.getenv("DRIVER_MAX_USES", "20"))
+
+# Работа с сетью: "" — живые сайты, "record" — запись ответов в архив,
+# "replay" — воспроизведение архива локальным сервером с профилем сети REPLAY_PROFILE.
+NETWORK_MODE: Final = os.getenv("NETWORK_MODE", "")
+NETWORK_ARCHIVE: Final = os.getenv("NETWORK_ARCHIVE", "network-archive")
+REPLAY_PROFILE: Final = os.getenv("REPLAY_PROFILE", "none")
+
+# Категории ресурсов, которые браузер не загружает (см. tests/utils/resource_policy.py).
+# Изображения по умолчанию загружаются: без них сценарии и метрики загрузки страниц
+# (LCP) были бы другими. Тест может переопределить категории маркером
+# @pytest.mark.resources(allow=[...], block=[...]).
+BLOCKED_RESOURCES: Final = os.getenv(
+    "BLOCKED_RESOURCES", "analytics,widgets,fonts,media"
+)
+
+# Загрузка страниц: стратегия WebDriver ("eager" — до DOMContentLoaded, "none" — не ждать)
+# и условие готовности нового документа, которое проверяется перед первым ожиданием
+# в нём: "domcontentloaded", "load", "networkidle", "none" или "locator:<CSS-селектор>".
+PAGE_LOAD_STRATEGY: Final = os.getenv("PAGE_LOAD_STRATEGY", "eager")
+READINESS: Final = os.getenv("READINESS", "domcontentloaded")
+
+# Таймауты ожиданий (см. tests/utils/timeouts.py). TIMEOUT_PROFILE выбирает профиль
+# окружения: таймаут по умолчанию и интервал проверки условия в секундах, а также
+# таймауты отдельных локаторов по имени в Locators. TIMEOUT_OVERRIDES — JSON с теми же
+# ключами поверх профиля, например '{"default": 20, "locators": {"SELECT_REGION": 30}}'.
+TIMEOUT_PROFILES: Final = {
+    "local": {"default": 10, "poll": 0.05, "locators": {}},
+    "ci": {"default": 20, "poll": 0.1, "locators": {}},
+    "replay": {"default": 5, "poll": 0.05, "locators": {}},
+}
+TIMEOUT_PROFILE: Final = os.getenv("TIMEOUT_PROFILE", "local")
+TIMEOUT_OVERRIDES: Final = os.getenv("TIMEOUT_OVERRIDES", "")
+
+# Адаптивные таймауты: длительности ожиданий локаторов сохраняются в TIMEOUT_HISTORY,
+# и локатор, у которого накопилось TIMEOUT_MIN_SAMPLES замеров, ждётся p99 замеров
+# плюс TIMEOUT_MARGIN секунд (не меньше TIMEOUT_MIN и не больше таймаута профиля).
+TIMEOUT_ADAPTIVE: Final = os.getenv("TIMEOUT_ADAPTIVE", "") == "1"
+TIMEOUT_HISTORY: Final = os.getenv("TIMEOUT_HISTORY", ".wait-durations.json")
+TIMEOUT_MARGIN: Final = float(os.getenv("TIMEOUT_MARGIN", "1"))
+TIMEOUT_MIN: Final = float(os.getenv("TIMEOUT_MIN", "1"))
+TIMEOUT_MIN_SAMPLES: Final = int(os.getenv("TIMEOUT_MIN_SAMPLES", "20"))
+
+# Формат скриншотов, прикрепляемых к отчёту при падении: "webp" или "png" (нужен Pillow).
+ARTIFACT_IMAGE_FORMAT: Final = os.getenv("ARTIFACT_IMAGE_FORMAT", "webp")
+
+# Логирование: уровень вывода в stderr, файл JSON-лога (пусто — без файла)
+# и размер кольцевого буфера записей теста, который прикрепляется к отчёту при падении.
+LOG_LEVEL: Final = os.getenv("LOG_LEVEL", "WARNING")
+LOG_FILE: Final = os.getenv("LOG_FILE", "")
+LOG_BUFFER_SIZE: Final = int(os.getenv("LOG_BUFFER_SIZE", "1000"))
+
+# Сколько вкладок одного браузера одновременно проверяют регионы.
+REGION_TABS: Final = int(os.getenv("REGION_TABS", "4"))
+
+# Сколько раз по умолчанию повторять упавший шаг сценария (см. tests/utils/scenario.py).
+STEP_RETRIES: Final = int(os.getenv("STEP_RETRIES", "1"))
+
+# Визуальные проверки: директория эталонов, допустимое отличие канала пикселя (0–255),
+# допустимая доля отличающихся пикселей, расстояние pHash, после которого изображения
+# считаются разными без попиксельного сравнения, и количество процессов сравнения.
+# Отсутствующий эталон проваливает проверку; VISUAL_UPDATE=1 сохраняет и перезаписывает
+# эталоны текущими снимками.
+VISUAL_BASELINES: Final = os.getenv("VISUAL_BASELINES", "visual-baselines")
+VISUAL_TOLERANCE: Final = int(os.getenv("VISUAL_TOLERANCE", "16"))
+VISUAL_MAX_DIFF: Final = float(os.getenv("VISUAL_MAX_DIFF", "0.002"))
+VISUAL_MAX_DISTANCE: Final = int(os.getenv("VISUAL_MAX_DISTANCE", "10"))
+VISUAL_WORKERS: Final = int(os.getenv("VISUAL_WORKERS", "2"))
+VISUAL_UPDATE: Final = os.getenv("VISUAL_UPDATE", "") == "1"
+
+# Монитор процессов браузеров: интервал замеров CPU, памяти и файлов в секундах
+# (0 — выключен), а также сколько тестов подряд и на сколько МБ должна вырасти память
+# браузера, чтобы он был помечен как растущий.
+RESOURCE_SAMPLE_INTERVAL: Final = float(os.getenv("RESOURCE_SAMPLE_INTERVAL", "0.5"))
+RESOURCE_LEAK_TESTS: Final = int(os.getenv("RESOURCE_LEAK_TESTS", "3"))
+RESOURCE_LEAK_MB: Final = float(os.getenv("RESOURCE_LEAK_MB", "100"))
+
+# Сколько секунд ждать события load страницы перед снятием её метрик (--frontend-perf)
+FRONTEND_PERF_CAP: Final = float(os.getenv("FRONTEND_PERF_CAP", "3"))
+
+# Ожидаемая контрольная сумма SHA-256 загруженного плагина (пусто — не проверяется:
+# плагин обновляется на сайте, и сумму нужно менять вместе с версией).
+PLUGIN_SHA256: Final = os.getenv("PLUGIN_SHA256", "").lower()
@@ -0,0 +1,82 @@
+import json
+
+import allure
+import pytest
+from loguru import logger
+
+from tests.benchmarks.fixture_pages import write_pages
+from tests.pages.base_page import BasePage
+from tests.utils.benchmark import compare, load_baseline, run_benchmark
+
+
+@pytest.fixture(autouse=True)
+def _benchmark_enabled(request):
+    """
+    Замеры запускаются только с опцией `--benchmark`.
+    """
+    if not request.config.getoption("--benchmark"):
+        pytest.skip("замеры запускаются с опцией --benchmark")
+
+
+@pytest.fixture(scope="session")
+def fixture_pages(tmp_path_factory):
+    """
+    Фикстура локальных страниц для замеров: {имя страницы: file:// URL}.
+    """
+    return write_pages(tmp_path_factory.mktemp("benchmark-pages"))
+
+
+@pytest.fixture(scope="session")
+def benchmark_results(request):
+    """
+    Фикстура результатов замеров сессии. После сессии результаты сохраняются
+    как новая база, если указана опция `--benchmark-save-baseline`.
+    """
+    results = {}
+    yield results
+    path = request.config.getoption("--benchmark-save-baseline")
+    if path and results:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+@pytest.fixture
+def page(driver):
+    """
+    Фикстура базовой страницы на браузере из пула.
+    """
+    return BasePage(driver)
+
+
+@pytest.fixture
+def benchmark(request, driver, benchmark_results):
+    """
+    Фикстура замера: benchmark(name, action, setup=None) выполняет действие
+    несколько раз, прикрепляет результат к отчёту и проваливает тест,
+    если примитив замедлился относительно базы из `--benchmark-check`.
+    """
+    config = request.config
+    baseline = load_baseline(config.getoption("--benchmark-check"))
+
+    def run(name: str, action, setup=None):
+        result = run_benchmark(
+            driver, name, action, setup, rounds=config.getoption("--benchmark-rounds")
+        ).as_dict()
+        benchmark_results[name] = result
+        logger.info(
+            f"{name}: медиана {result['median'] * 1000:.1f} мс, "
+            f"p95 {result['p95'] * 1000:.1f} мс, команд WebDriver: {result['round_trips']}"
+        )
+        allure.attach(
+            json.dumps(result, ensure_ascii=False, indent=2),
+            name=f"benchmark-{name}",
+            attachment_type=allure.attachment_type.JSON,
+        )
+        problems = compare(
+            result, baseline.get(name), config.getoption("--benchmark-max-slowdown")
+        )
+        if problems:
+            pytest.fail(f"Регрессия примитива {name}: {'; '.join(problems)}")
+        return result
+
+    return run
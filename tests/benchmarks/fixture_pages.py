@@ -0,0 +1,158 @@
+"""
+Локальные страницы для замеров примитивов BasePage.
+
+Страницы повторяют то, с чем работают сценарии: длинный список партнёров,
+сетку изображений, текст, который появляется с задержкой, и попап выбора региона.
+Все ресурсы встроены в страницы, поэтому замеры не зависят от сети.
+"""
+
+from pathlib import Path
+
+from selenium.webdriver.common.by import By
+
+# Локаторы элементов на локальных страницах (список партнёров совпадает
+# с Locators.LIST_OF_PARTNERS и селектором имени партнёра из сценария 2).
+PARTNER_NAME = "div.sbisru-Contacts-List__name"
+SCROLL_TARGET = (By.ID, "scroll-target")
+IMAGE_GRID = (By.CSS_SELECTOR, "div.s-Grid-container img")
+DELAYED_TEXT = (By.ID, "delayed")
+REGION_CHOOSER = (By.ID, "region-chooser")
+REGION_INPUT = (By.CSS_SELECTOR, "#popup input.region-search")
+REGION_KAMCHATKA = (By.XPATH, "//*[@id='popup']//span[@title='Камчатский край']")
+
+REGIONS = [
+    "Москва",
+    "Санкт-Петербург",
+    "Самарская обл.",
+    "Камчатский край",
+    "Приморский край",
+    "Новосибирская обл.",
+    "Свердловская обл.",
+    "Ярославская обл.",
+    "Республика Татарстан",
+    "Краснодарский край",
+] + [f"Регион {number}" for number in range(11, 90)]
+
+_PAGE = """<!DOCTYPE html>
+<html lang="ru">
+<head><meta charset="utf-8"><title>{title}</title>
+<style>{style}</style></head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+# Изображение 1x1, встроенное в страницу
+_PIXEL = (
+    "data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7"
+)
+
+
+def partners_page(count: int = 200) -> str:
+    """
+    Список партнёров и элемент ниже первого экрана для прокрутки.
+    """
+    items = "\n".join(
+        f'<div class="sbisru-Contacts-List__item">'
+        f'<div class="sbisru-Contacts-List__name">Партнёр {number}</div>'
+        f'<div class="sbisru-Contacts-List__address">ул. Тестовая, {number}</div>'
+        f'<div class="sbisru-Contacts-List__phone">+7 (846) 000-{number:02d}-00</div>'
+        "</div>"
+        for number in range(count)
+    )
+    return _PAGE.format(
+        title="Партнёры",
+        style=".sbisru-Contacts-List__item{padding:8px;border-bottom:1px solid #ddd}",
+        body=f'<div id="contacts_list">{items}</div>'
+        '<div style="height:3000px"></div>'
+        '<div id="scroll-target">Скачать локальные версии</div>'
+        '<div style="height:1000px"></div>',
+    )
+
+
+def images_page(count: int = 48) -> str:
+    """
+    Сетка изображений одинакового размера, как в блоке "Работаем".
+    """
+    images = "\n".join(
+        f'<div class="s-Grid-item"><img src="{_PIXEL}" width="270" height="192" '
+        f'alt="Фото {number}"></div>'
+        for number in range(count)
+    )
+    return _PAGE.format(
+        title="Изображения",
+        style=".s-Grid-container{display:flex;flex-wrap:wrap}.s-Grid-item{margin:4px}",
+        body=f'<div class="s-Grid-container">{images}</div>',
+    )
+
+
+def delayed_text_page() -> str:
+    """
+    Текст появляется через ?delay=<мс> после загрузки страницы (по умолчанию 200 мс).
+    """
+    return _PAGE.format(
+        title="Текст с задержкой",
+        style="",
+        body='<div id="delayed"></div>'
+        "<script>"
+        'const delay = Number(new URLSearchParams(location.search).get("delay") || 200);'
+        "setTimeout(() => {"
+        'document.getElementById("delayed").textContent = "Сила в людях";'
+        "}, delay);"
+        "</script>",
+    )
+
+
+def region_popup_page() -> str:
+    """
+    Кнопка выбора региона открывает попап со списком регионов и поиском.
+    """
+    regions = ",".join(f'"{name}"' for name in REGIONS)
+    return _PAGE.format(
+        title="Выбор региона",
+        style="#popup{position:fixed;top:20%;left:30%;background:#fff;"
+        "border:1px solid #999;padding:16px;max-height:60%;overflow:auto}",
+        body='<span id="region-chooser">Самарская обл.</span>'
+        "<script>"
+        f"const REGIONS = [{regions}];"
+        'document.getElementById("region-chooser").addEventListener("click", () => {'
+        "  setTimeout(() => {"
+        '    const popup = document.createElement("div");'
+        '    popup.id = "popup";'
+        "    popup.innerHTML = '<input class=\"region-search\"><ul></ul>';"
+        "    document.body.appendChild(popup);"
+        '    const list = popup.querySelector("ul");'
+        "    const render = query => {"
+        "      list.innerHTML = REGIONS.filter(name => name.includes(query)).map(name =>"
+        '        `<li><span title="${name}">${name}</span></li>`).join("");'
+        "    };"
+        '    render("");'
+        '    popup.querySelector("input").addEventListener("input", e => render(e.target.value));'
+        "  }, 150);"
+        "});"
+        "</script>",
+    )
+
+
+PAGES = {
+    "partners": partners_page,
+    "images": images_page,
+    "delayed_text": delayed_text_page,
+    "region_popup": region_popup_page,
+}
+
+
+def write_pages(directory: Path) -> dict[str, str]:
+    """
+    Записывает страницы в директорию.
+
+    :param directory: Директория для страниц.
+    :return: Словарь {имя страницы: file:// URL}.
+    """
+    urls = {}
+    for name, render in PAGES.items():
+        path = directory / f"{name}.html"
+        path.write_text(render(), encoding="utf-8")
+        urls[name] = path.resolve().as_uri()
+    return urls
@@ -0,0 +1,95 @@
+from selenium.webdriver.common.by import By
+
+from tests.benchmarks.fixture_pages import (
+    DELAYED_TEXT,
+    IMAGE_GRID,
+    PARTNER_NAME,
+    REGION_CHOOSER,
+    REGION_INPUT,
+    REGION_KAMCHATKA,
+    SCROLL_TARGET,
+)
+from tests.pages.locators import Locators
+from tests.utils.image_diff import BaselineStore
+from tests.utils.visual import VisualComparator
+
+
+class TestBasePageBenchmarks:
+
+    def test_get(self, page, benchmark, fixture_pages):
+        def action():
+            page.get(fixture_pages["partners"])
+            page.wait_for_body_to_load()
+
+        benchmark("get", action)
+
+    def test_find_element(self, page, benchmark, fixture_pages):
+        page.get(fixture_pages["partners"])
+        benchmark("find_element", lambda: page.find_element(Locators.LIST_OF_PARTNERS))
+
+    def test_find_elements(self, page, benchmark, fixture_pages):
+        page.get(fixture_pages["images"])
+        benchmark("find_elements", lambda: page.find_elements(*IMAGE_GRID))
+
+    def test_query_images(self, page, benchmark, fixture_pages):
+        page.get(fixture_pages["images"])
+        benchmark(
+            "query_elements",
+            lambda: page.query_elements(
+                (By.CSS_SELECTOR, "div.s-Grid-container"),
+                item_selector="img",
+                attributes=("width", "height"),
+            ),
+        )
+
+    def test_visual_image_grid(self, page, benchmark, fixture_pages, tmp_path):
+        page.get(fixture_pages["images"])
+        store = BaselineStore(str(tmp_path))
+        grid = (By.CSS_SELECTOR, "div.s-Grid-container")
+        # Эталоны сохраняет сравнитель в режиме обновления, замеряется сравнение с ними
+        seed = VisualComparator(store, workers=0, update=True)
+        page.assert_visual_match("images", grid, item_selector="img", visual=seed)
+        visual = VisualComparator(store)
+        try:
+            benchmark(
+                "visual_image_grid",
+                lambda: page.assert_visual_match(
+                    "images", grid, item_selector="img", visual=visual
+                ),
+            )
+        finally:
+            visual.close()
+
+    def test_scroll_to_element(self, page, benchmark, fixture_pages):
+        page.get(fixture_pages["partners"])
+        benchmark(
+            "scroll_to_element",
+            lambda: page.scroll_to_element(SCROLL_TARGET),
+            setup=lambda: page.driver.execute_script("window.scrollTo(0, 0);"),
+        )
+
+    def test_wait_for_text_in_element(self, page, benchmark, fixture_pages):
+        benchmark(
+            "wait_for_text_in_element",
+            lambda: page.wait_for_text_in_element(DELAYED_TEXT, "Сила в людях"),
+            setup=lambda: page.get(f"{fixture_pages['delayed_text']}?delay=200"),
+        )
+
+    def test_check_partners_list(self, page, benchmark, fixture_pages):
+        page.get(fixture_pages["partners"])
+        benchmark(
+            "check_partners_list",
+            lambda: page.check_partners_list(Locators.LIST_OF_PARTNERS, PARTNER_NAME),
+        )
+
+    def test_region_popup(self, page, benchmark, fixture_pages):
+        def action():
+            page.find_and_click_element(REGION_CHOOSER)
+            page.find_and_send(REGION_INPUT, "Камчатский край")
+            page.wait_for_element(REGION_KAMCHATKA)
+
+        benchmark(
+            "region_popup",
+            action,
+            setup=lambda: page.get(fixture_pages["region_popup"]),
+        )
@@ -1,8 +1,58 @@
+import json
 import os
+import shutil
+import tempfile
+from functools import partial
+import allure
 import pytest
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from config.config import BASE_URL
+from loguru import logger
+from config.config import (
+    ARTIFACT_IMAGE_FORMAT,
+    BASE_URL,
+    BLOCKED_RESOURCES,
+    DRIVER_MAX_USES,
+    DRIVER_POOL_SIZE,
+    FRONTEND_PERF_CAP,
+    LOG_BUFFER_SIZE,
+    LOG_FILE,
+    LOG_LEVEL,
+    NETWORK_ARCHIVE,
+    NETWORK_MODE,
+    REPLAY_PROFILE,
+    RESOURCE_LEAK_MB,
+    RESOURCE_LEAK_TESTS,
+    RESOURCE_SAMPLE_INTERVAL,
+    VISUAL_BASELINES,
+    VISUAL_MAX_DIFF,
+    VISUAL_MAX_DISTANCE,
+    VISUAL_TOLERANCE,
+    VISUAL_UPDATE,
+    VISUAL_WORKERS,
+)
+from tests.utils import artifacts, frontend_perf, profiling, timeouts, visual
+from tests.utils.browser import create_driver
+from tests.utils.driver_pool import DriverPool
+from tests.utils.duration_scheduler import DurationScheduler, parse_shard
+from tests.utils.element_cache import cache_for
+from tests.utils.http_checks import HttpClient
+from tests.utils.image_diff import BaselineStore
+from tests.utils.log_capture import LogCapture
+from tests.utils.network_archive import (
+    PROFILES,
+    ArchiveServer,
+    NetworkArchive,
+    ensure_certificate,
+)
+from tests.utils.readiness import tracker_for
+from tests.utils.resource_monitor import ResourceMonitor
+from tests.utils.resource_policy import (
+    ResourcePolicy,
+    ResourceStats,
+    apply_policy,
+    drain_network_events,
+)
+from tests.utils.run_context import current
+from tests.utils.waits import InPageWait
 
 
 def pytest_addoption(parser):
@@ -14,37 +64,318 @@ def pytest_addoption(parser):
     parser.addoption(
         "--headless", action="store_true", help="run browser in headless mode"
     )
+    parser.addoption(
+        "--profile-webdriver",
+        action="store",
+        nargs="?",
+        const="webdriver-timings",
+        default=None,
+        metavar="DIR",
+        help="time every WebDriver command and save per-test timelines to DIR",
+    )
+    parser.addoption(
+        "--frontend-perf",
+        action="store",
+        nargs="?",
+        const="frontend-perf.jsonl",
+        default=None,
+        metavar="FILE",
+        help="collect page load metrics of every visited page and append them to FILE",
+    )
+    parser.addoption(
+        "--frontend-perf-budgets",
+        action="store",
+        default=None,
+        metavar="FILE",
+        help="JSON file with per-URL metric budgets that fail tests when exceeded",
+    )
+    parser.addoption(
+        "--shard",
+        action="store",
+        default=None,
+        metavar="I/N",
+        help="run only shard I of N, split by historical test duration",
+    )
+    parser.addoption(
+        "--durations-history",
+        action="store",
+        default=".test-durations.json",
+        metavar="FILE",
+        help="file with per-test durations used to order and shard tests",
+    )
+    parser.addoption(
+        "--update-durations",
+        action="store_true",
+        help="record this run's test durations into the durations history file",
+    )
+    parser.addoption(
+        "--benchmark",
+        action="store_true",
+        help="run BasePage micro-benchmarks from tests/benchmarks",
+    )
+    parser.addoption(
+        "--benchmark-rounds",
+        action="store",
+        type=int,
+        default=15,
+        help="measured runs per benchmark",
+    )
+    parser.addoption(
+        "--benchmark-save-baseline",
+        action="store",
+        default=None,
+        metavar="FILE",
+        help="save benchmark results as a JSON baseline",
+    )
+    parser.addoption(
+        "--benchmark-check",
+        action="store",
+        default=None,
+        metavar="FILE",
+        help="fail benchmarks that regressed against a JSON baseline",
+    )
+    parser.addoption(
+        "--benchmark-max-slowdown",
+        action="store",
+        type=float,
+        default=1.5,
+        help="allowed median slowdown factor for --benchmark-check",
+    )
+
+
+def pytest_configure(config):
+    """
+    Регистрирует логирование тестов, планировщик по истории длительностей,
+    историю длительностей ожиданий для адаптивных таймаутов,
+    сборщик артефактов падений, сравнитель визуальных проверок, монитор процессов
+    браузеров, плагин замеров команд WebDriver, если указана опция
+    `--profile-webdriver`, и сборщик метрик страниц, если указана опция
+    `--frontend-perf`.
+    """
+    config.addinivalue_line(
+        "markers",
+        "resources(allow=(), block=()): override resource categories blocked for the test",
+    )
+    config.pluginmanager.register(
+        LogCapture(LOG_BUFFER_SIZE, LOG_LEVEL, LOG_FILE), "log-capture"
+    )
+    shard = config.getoption("--shard")
+    config.pluginmanager.register(
+        DurationScheduler(
+            config.getoption("--durations-history"),
+            parse_shard(shard) if shard else None,
+            config.getoption("--update-durations"),
+        ),
+        "duration-scheduler",
+    )
+    if timeouts.profile.history_path:
+        config.pluginmanager.register(timeouts.profile, "timeout-profile")
+    if NETWORK_MODE and not hasattr(config, "workerinput"):
+        # Сертификат локального сервера создаётся один раз, до запуска воркеров
+        ensure_certificate(NETWORK_ARCHIVE)
+    artifacts.collector = artifacts.FailureArtifacts(ARTIFACT_IMAGE_FORMAT)
+    config.pluginmanager.register(artifacts.collector, "failure-artifacts")
+    visual.comparator = visual.VisualComparator(
+        BaselineStore(VISUAL_BASELINES),
+        VISUAL_TOLERANCE,
+        VISUAL_MAX_DIFF,
+        VISUAL_MAX_DISTANCE,
+        VISUAL_WORKERS,
+        VISUAL_UPDATE,
+    )
+    config.pluginmanager.register(visual.comparator, "visual-regression")
+    if RESOURCE_SAMPLE_INTERVAL > 0:
+        config.pluginmanager.register(
+            ResourceMonitor(
+                RESOURCE_SAMPLE_INTERVAL, RESOURCE_LEAK_TESTS, RESOURCE_LEAK_MB
+            ),
+            "resource-monitor",
+        )
+    output_dir = config.getoption("--profile-webdriver")
+    if output_dir:
+        config.pluginmanager.register(
+            profiling.WebDriverProfiler(output_dir), "webdriver-profiler"
+        )
+    perf_output = config.getoption("--frontend-perf")
+    if perf_output:
+        budgets = config.getoption("--frontend-perf-budgets")
+        if budgets:
+            with open(budgets, encoding="utf-8") as f:
+                budgets = json.load(f)
+        workerinput = getattr(config, "workerinput", {})
+        frontend_perf.collector = frontend_perf.FrontendPerfCollector(
+            perf_output,
+            budgets,
+            workerinput.get("frontend_perf_run"),
+            FRONTEND_PERF_CAP,
+        )
+        config.pluginmanager.register(frontend_perf.collector, "frontend-perf")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    """
+    Запоминает текущий тест в контексте выполнения.
+    """
+    current.start_test(item.nodeid)
+
+
+def pytest_runtest_logfinish(nodeid, location):
+    """
+    Очищает контекст выполнения после завершения теста.
+    """
+    current.end_test()
+
+
+@pytest.fixture(scope="session")
+def worker_id():
+    """
+    Фикстура с идентификатором воркера pytest-xdist ("master" при запуске без xdist).
+    """
+    return os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+
+@pytest.fixture(scope="session")
+def download_root(tmp_path_factory, worker_id):
+    """
+    Фикстура корневой директории загрузок воркера.
+    У каждого воркера своя директория, поэтому параллельные процессы не видят файлы друг друга.
+    """
+    root = tmp_path_factory.mktemp(f"download-{worker_id}")
+    yield str(root)
+    shutil.rmtree(root, ignore_errors=True)
 
 
 @pytest.fixture
-def driver(request):
-    """
-    Фикстура для инициализации веб-драйвера Chrome с переданными опциями.
-    Запускает браузер в режиме инкогнито и разворачивает его на весь экран.
-    """
-    # Определяем путь к директории проекта
-    project_dir = os.path.abspath(os.path.dirname(__file__))
-    download_dir = os.path.join(project_dir, "download")  # Путь к папке для загрузок
-
-    if not os.path.exists(download_dir):
-        os.makedirs(download_dir)
-
-    chrome_options = Options()
-    prefs = {
-        "download.default_directory": download_dir,
-        "download.prompt_for_download": False,
-        "directory_upgrade": True,
-        "safebrowsing.enabled": True,
-        "profile.default_content_setting_values.automatic_downloads": 1,
-    }
-    chrome_options.add_experimental_option("prefs", prefs)
-    chrome_options.add_argument("--incognito")
-    if request.config.getoption("--headless"):
-        chrome_options.add_argument("--headless")
-    driver = webdriver.Chrome(options=chrome_options)
-    driver.set_window_size(1920, 1080)
+def download_dir(request, download_root):
+    """
+    Фикстура директории загрузок для одного теста.
+    Создаётся внутри директории воркера и удаляется после завершения теста.
+    """
+    prefix = "".join(c if c.isalnum() else "_" for c in request.node.name)[:40]
+    path = tempfile.mkdtemp(prefix=f"{prefix}-", dir=download_root)
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def network_server(worker_id):
+    """
+    Фикстура локального сервера записи или воспроизведения сетевого трафика.
+    Включается переменной окружения NETWORK_MODE ("record" или "replay"),
+    иначе браузер работает с живыми сайтами и фикстура возвращает None.
+    """
+    if not NETWORK_MODE:
+        yield None
+        return
+    server = ArchiveServer(
+        NetworkArchive(NETWORK_ARCHIVE, writer_id=worker_id),
+        NETWORK_MODE,
+        PROFILES[REPLAY_PROFILE],
+    ).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope="session")
+def http_client(network_server):
+    """
+    Фикстура HTTP-клиента для проверок без браузера. Ходит на живые сайты
+    или через локальный сервер записи и воспроизведения, как и браузер.
+    """
+    client = HttpClient(network_server)
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def driver_pool(request, download_root, network_server):
+    """
+    Фикстура пула браузеров на всю сессию (на каждый воркер pytest-xdist свой пул).
+    Браузеры запускаются заранее и переиспользуются между тестами; их процессы
+    отслеживает монитор ресурсов, если он включён.
+    """
+    arguments = network_server.chrome_arguments() if network_server else ()
+    factory = partial(
+        create_driver,
+        request.config.getoption("--headless"),
+        download_root,
+        tuple(arguments),
+    )
+    monitor = request.config.pluginmanager.get_plugin("resource-monitor")
+    if monitor is not None:
+        factory = monitor.watching(factory)
+    pool = DriverPool(
+        factory,
+        size=DRIVER_POOL_SIZE,
+        max_uses=DRIVER_MAX_USES,
+    )
+    pool.start()
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def resource_policy(request):
+    """
+    Фикстура политики загрузки ресурсов теста: категории из BLOCKED_RESOURCES
+    с учётом маркера @pytest.mark.resources(allow=[...], block=[...]).
+    """
+    policy = ResourcePolicy.from_string(BLOCKED_RESOURCES)
+    marker = request.node.get_closest_marker("resources")
+    if marker:
+        policy = policy.allow(*marker.kwargs.get("allow", ())).deny(
+            *marker.kwargs.get("block", ())
+        )
+    return policy
+
+
+@pytest.fixture
+def driver(driver_pool, download_dir, resource_policy):
+    """
+    Фикстура, выдающая тесту браузер из пула.
+    Загрузки браузера направляются в директорию текущего теста, лишние ресурсы
+    блокируются по политике теста. После теста в отчёт прикрепляется статистика
+    загруженных и заблокированных запросов и кеша элементов, состояние браузера
+    сбрасывается, и он возвращается в пул.
+    """
+    with profiling.span("driver:acquire"):
+        driver = driver_pool.acquire()
+    if profiling.active_timeline is not None:
+        profiling.instrument(driver)
+    tracker_for(driver).reset()
+    cache_for(driver).reset()
+    driver.execute_cdp_cmd(
+        "Page.setDownloadBehavior",
+        {"behavior": "allow", "downloadPath": download_dir},
+    )
+    drain_network_events(driver)  # события предыдущего теста и сброса браузера
+    apply_policy(driver, resource_policy)
     yield driver
-    driver.quit()
+    report = ResourceStats().report(driver)
+    logger.info(
+        f"Загружено запросов: {report['loaded_requests']} ({report['loaded_bytes'] / 1024:.0f} КБ), "
+        f"заблокировано: {report['blocked_requests']} "
+        f"(~{report['blocked_bytes_estimate'] / 1024:.0f} КБ)"
+    )
+    allure.attach(
+        json.dumps(report, ensure_ascii=False, indent=2),
+        name="network-resources",
+        attachment_type=allure.attachment_type.JSON,
+    )
+    cache_stats = cache_for(driver).stats()
+    if cache_stats["hits"] or cache_stats["misses"]:
+        logger.info(
+            f"Кеш элементов: попаданий {cache_stats['hits']}, "
+            f"промахов {cache_stats['misses']}, устаревших {cache_stats['stale']}"
+        )
+        allure.attach(
+            json.dumps(cache_stats, ensure_ascii=False, indent=2),
+            name="element-cache",
+            attachment_type=allure.attachment_type.JSON,
+        )
+    with profiling.span("driver:release"):
+        driver_pool.release(driver)
 
 
 @pytest.fixture
@@ -53,6 +384,8 @@ def open_website_and_clear(driver):
     Фикстура для открытия сайта, очистки localStorage, sessionStorage и cookies.
     """
     driver.get(BASE_URL)
+    tracker_for(driver).navigated()
+    InPageWait(driver).ready()
     driver.execute_script("window.localStorage.clear();")
     driver.execute_script("window.sessionStorage.clear();")
     driver.delete_all_cookies()
@@ -1,8 +1,27 @@
-import time
+from loguru import logger
 from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+)
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from tests.utils.artifacts import capture_failure
+from tests.utils.dom_query import query_elements
+from tests.utils.element_cache import cache_for
+from tests.utils.readiness import Readiness
+from tests.utils.downloads import DownloadWatcher
+from tests.utils.resource_policy import (
+    ResourcePolicy,
+    apply_policy,
+    current_policy,
+    reapply_policy,
+)
+from tests.utils.scenario import ScenarioRunner, Step
+from tests.utils.snapshot import DomSnapshot
+from tests.utils.visual import VisualComparator, check_region
+from tests.utils.waits import LOCATE_JS, InPageWait
 
 
 class BasePage:
@@ -10,77 +29,224 @@ class BasePage:
     Базовый класс для всех страниц.
 
     Этот класс предоставляет общие методы для взаимодействия с веб-элементами.
+    Все ожидания выполняются внутри страницы (см. InPageWait), без фиксированных
+    пауз и опроса WebDriver. Найденные элементы кешируются в пределах документа
+    (см. ElementCache): повторные действия с тем же локатором не ищут элемент
+    заново, а устаревший элемент перезапрашивается автоматически. Таймауты
+    по умолчанию берутся из профиля таймаутов окружения (см. TimeoutProfile).
     """
 
-    def __init__(self, driver: WebDriver):
+    def __init__(self, driver: WebDriver, download_dir: str | None = None):
         """
         Инициализирует объект BasePage с драйвером.
 
         :param driver: Экземпляр WebDriver.
+        :param download_dir: Директория загрузок текущего теста.
         """
         self.driver = driver
+        self.download_dir = download_dir
+        self.waits = InPageWait(driver)
+        self.elements = cache_for(driver)
 
-    def find_element(self, locator: tuple, timeout=10):
+    def _resolve(self, locator: tuple, timeout, condition: str = "presence"):
+        """
+        Дожидается элемента и кеширует его для следующих действий.
+
+        Элемент из кеша здесь не возвращается: документ мог смениться после
+        клика, о котором трекер ещё не знает, и вызывающий код получил бы
+        устаревший элемент. Элементы из кеша используются только в _with_element,
+        который находит устаревший элемент заново.
+
+        :param locator: Кортеж, содержащий способ поиска элемента и значение для поиска.
+        :param timeout: Максимальное время ожидания в секундах; None — по профилю.
+        :param condition: Условие InPageWait для поиска элемента.
+        :return: Веб-элемент.
+        """
+        element = self.waits.until(locator, condition, timeout)
+        self.elements.put(locator, element)
+        return element
+
+    def _with_element(
+        self,
+        locator: tuple,
+        timeout,
+        action,
+        condition: str = "presence",
+        cached_errors: tuple = (),
+    ):
+        """
+        Выполняет действие с элементом из кеша. Если элемент устарел (или для
+        элемента из кеша возникла одна из ошибок `cached_errors`), элемент
+        находится заново по условию `condition`, и действие повторяется.
+
+        :param locator: Кортеж, содержащий способ поиска элемента и значение для поиска.
+        :param timeout: Максимальное время ожидания в секундах; None — по профилю.
+        :param action: Действие, принимающее веб-элемент.
+        :param condition: Условие InPageWait для поиска элемента.
+        :param cached_errors: Ошибки, после которых элемент из кеша ищется заново
+            (например, элемент из кеша ещё не доступен для клика).
+        :return: Результат действия.
+        """
+        element = self.elements.get(locator)
+        if element is not None:
+            try:
+                return action(element)
+            except (StaleElementReferenceException, *cached_errors) as e:
+                self.elements.invalidate(
+                    locator, stale=isinstance(e, StaleElementReferenceException)
+                )
+        for attempt in range(2):
+            element = self.waits.until(locator, condition, timeout)
+            self.elements.put(locator, element)
+            try:
+                return action(element)
+            except StaleElementReferenceException:
+                # Элемент перерисовали между поиском и действием
+                self.elements.invalidate(locator, stale=True)
+                if attempt:
+                    raise
+
+    def find_element(self, locator: tuple, timeout=None):
         """
         Находит один элемент на странице по указанным параметрам.
 
         :param locator: Кортеж, содержащий способ поиска элемента и значение для поиска.
-        :param timeout: Максимальное время ожидания в секундах.
+        :param timeout: Максимальное время ожидания в секундах; None — по профилю.
         :return: Найденный веб-элемент.
         """
-        by, value = locator
-        wait = WebDriverWait(self.driver, timeout)
-        return wait.until(EC.presence_of_element_located((by, value)))
+        return self._resolve(locator, timeout)
 
-    def find_elements(self, by: By, value: str, timeout=10):
+    def find_elements(self, by: By, value: str, timeout=None):
         """
         Находит несколько элементов на странице по указанным параметрам.
 
         :param by: Способ поиска элемента (например, By.ID, By.XPATH).
         :param value: Значение для поиска.
-        :param timeout: Максимальное время ожидания в секундах.
+        :param timeout: Максимальное время ожидания в секундах; None — по профилю.
         :return: Список найденных веб-элементов.
         """
-        wait = WebDriverWait(self.driver, timeout)
-        return wait.until(EC.presence_of_all_elements_located(by, value))
+        return self.waits.all_present((by, value), timeout)
 
-    def wait_for_body_to_load(self, timeout=10):
+    def wait_for_body_to_load(self, timeout=None):
         """
-        Ожидает, пока элемент <body> не станет полностью загруженным.
+        Ожидает готовности текущего документа по условию Readiness.
+        Если готовность документа уже подтверждена, возвращается сразу.
 
-        :param timeout: Максимальное время ожидания в секундах.
+        :param timeout: Максимальное время ожидания в секундах; None — по профилю.
         """
-        wait = WebDriverWait(self.driver, timeout)
-        wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+        self.waits.ready(timeout)
 
-    def find_and_click_element(self, locator: tuple, timeout=10):
+    def find_and_click_element(self, locator: tuple, timeout=None):
         """
         Находит элемент по локатору, ждет его доступности и кликает по нему.
+        Если документ сменился, ожидание сначала дожидается его готовности.
 
         :param locator: Кортеж, содержащий способ поиска элемента и значение для поиска.
-        :param timeout: Максимальное время ожидания в секундах.
+        :param timeout: Максимальное время ожидания в секундах; None — по профилю.
         """
-        self.wait_for_body_to_load(timeout)
-        by, value = locator
-        wait = WebDriverWait(self.driver, timeout)
-        element = wait.until(EC.element_to_be_clickable((by, value)))
-        element.click()
+        self._with_element(
+            locator,
+            timeout,
+            lambda element: element.click(),
+            "clickable",
+            (ElementNotInteractableException, ElementClickInterceptedException),
+        )
 
-    def scroll_to_element(self, locator: tuple, timeout=10):
+    def scroll_to_element(self, locator: tuple, timeout=None):
         """
-        Прокручивает страницу до элемента, чтобы он оказался в видимой области.
+        Прокручивает страницу до элемента, чтобы он оказался в видимой области,
+        и ждёт окончания плавной прокрутки.
 
         :param locator: Кортеж, содержащий способ поиска элемента и значение для поиска.
-        :param timeout: Максимальное время ожидания в секундах.
+        :param timeout: Максимальное время ожидания в секундах; None — по профилю.
         """
-        by, value = locator
-        wait = WebDriverWait(self.driver, timeout)
-        element = wait.until(EC.presence_of_element_located((by, value)))
-        self.driver.execute_script(
-            "arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});",
-            element,
+        self._with_element(locator, timeout, self.waits.scroll_into_view)
+
+    def query_elements(
+        self,
+        locator: tuple,
+        item_selector: str = None,
+        attributes: tuple = (),
+        properties: tuple = (),
+    ) -> dict:
+        """
+        Считывает атрибуты и свойства всех подходящих элементов за один запрос к браузеру.
+
+        :param locator: Кортеж, содержащий способ поиска элемента и значение для поиска.
+        :param item_selector: CSS-селектор элементов внутри первого найденного контейнера.
+        :param attributes: Имена HTML-атрибутов (например, "width", "height").
+        :param properties: Имена свойств элемента (например, "naturalWidth") или
+            вычисляемые свойства "rect", "visible", "text".
+        :return: Словарь {"container": ..., "items": [...]}, см. query_elements.
+        """
+        return query_elements(
+            self.driver, locator, item_selector, attributes, properties
+        )
+
+    def snapshot(self, locator: tuple = None) -> DomSnapshot:
+        """
+        Снимает DOM документа или поддерева одним запросом к браузеру.
+
+        По снимку можно локально проверять локаторы из Locators, не обращаясь к браузеру.
+
+        :param locator: Локатор корня поддерева. Если не указан, снимается весь документ.
+        :return: Снимок DOM.
+        :raises NoSuchElementException: Если корень поддерева не найден.
+        """
+        by, value = locator or (None, None)
+        html, url = self.driver.execute_script(
+            LOCATE_JS
+            + """
+            const [by, value] = arguments;
+            const root = by ? locate(by, value)[0] : document.documentElement;
+            return [root ? root.outerHTML : null, document.URL];
+            """,
+            by,
+            value,
+        )
+        if html is None:
+            raise NoSuchElementException(f"Элемент для снимка DOM не найден: {locator}")
+        return DomSnapshot(html, url, fragment=locator is not None)
+
+    def assert_visual_match(
+        self,
+        name: str,
+        locator: tuple,
+        item_selector: str = None,
+        masks: tuple = (),
+        visual: VisualComparator = None,
+    ):
+        """
+        Сравнивает область страницы (или каждый элемент внутри неё) с эталоном.
+
+        Область снимается одним скриншотом, элементы вырезаются из него локально
+        и сравниваются с эталонами в пуле процессов. Если эталона нет, проверка
+        проваливается; эталоны сохраняются только с VISUAL_UPDATE=1.
+
+        :param name: Имя проверки (префикс имён эталонов).
+        :param locator: Кортеж, содержащий способ поиска области и значение для поиска.
+        :param item_selector: CSS-селектор элементов внутри области.
+        :param masks: CSS-селекторы областей, которые не сравниваются.
+        :param visual: Сравнитель; по умолчанию — сравнитель сессии.
+        :raises AssertionError: Если изображение не загрузилось или отличается
+            от эталона.
+        """
+        comparisons = check_region(
+            self.driver, name, locator, item_selector, masks, visual
+        )
+        mismatches = [c for c in comparisons if not c.passed]
+        assert not mismatches, "Отличия от эталона: " + "; ".join(
+            f"{c.name}: {c.reason}" for c in mismatches
         )
-        time.sleep(0.5)
+        logger.debug(f"Визуальная проверка '{name}': {len(comparisons)} изображений")
+
+    def attach_failure_artifacts(self):
+        """
+        Снимает скриншот и DOM текущей страницы для обрабатываемого исключения.
+        Артефакты снимаются один раз на падение, даже если вызов повторяется
+        во вложенных шагах, и прикрепляются к отчёту Allure после завершения теста.
+        """
+        capture_failure(self.driver)
 
     def get_current_url(self):
         """
@@ -97,6 +263,59 @@ class BasePage:
         :param url: URL для открытия.
         """
         self.driver.get(url)
+        self.waits.tracker.navigated()
+
+    def start_navigation(self, url: str):
+        """
+        Начинает переход по URL, не дожидаясь загрузки страницы. Следующее ожидание
+        на этой вкладке выполнится уже в новом документе после его готовности.
+
+        :param url: URL для открытия.
+        """
+        self.driver.execute_script(
+            "window.__autotestLeaving = true; window.location.href = arguments[0];",
+            url,
+        )
+        self.waits.tracker.navigated()
+
+    def set_readiness(self, readiness: str | tuple | Readiness):
+        """
+        Переопределяет условие готовности новых документов в браузере.
+
+        :param readiness: Условие Readiness, его имя ("networkidle") или локатор
+            элемента, появление которого означает готовность страницы.
+        """
+        if isinstance(readiness, str):
+            readiness = Readiness.from_string(readiness)
+        elif not isinstance(readiness, Readiness):
+            readiness = Readiness.for_locator(readiness)
+        self.waits.tracker.readiness = readiness
+
+    @property
+    def resource_policy(self) -> ResourcePolicy:
+        """
+        Политика загрузки ресурсов, действующая для браузера.
+        """
+        return current_policy(self.driver) or ResourcePolicy()
+
+    def set_resource_policy(self, policy: ResourcePolicy):
+        """
+        Переопределяет политику загрузки ресурсов для текущей и следующих вкладок.
+
+        :param policy: Политика загрузки ресурсов.
+        """
+        apply_policy(self.driver, policy)
+
+    def watch_downloads(self, poll_interval: float = 0.1) -> DownloadWatcher:
+        """
+        Создаёт наблюдатель за директорией загрузок текущего теста.
+
+        :param poll_interval: Интервал опроса директории, если inotify недоступен.
+        :return: DownloadWatcher, который нужно открыть до начала загрузки.
+        """
+        if not self.download_dir:
+            raise ValueError("Директория загрузок не передана в страницу")
+        return DownloadWatcher(self.download_dir, poll_interval)
 
     def switch_to_last_tab(self):
         """
@@ -104,17 +323,19 @@ class BasePage:
         """
         all_tabs = self.driver.window_handles
         self.driver.switch_to.window(all_tabs[-1])
+        self.waits.tracker.navigated()
+        # Правила блокировки ресурсов действуют в пределах вкладки
+        reapply_policy(self.driver)
 
-    def wait_for_text_in_element(self, locator: tuple, text: str, timeout=10):
+    def wait_for_text_in_element(self, locator: tuple, text: str, timeout=None):
         """
         Ожидает появления текста в указанном элементе.
 
         :param locator: Кортеж, содержащий способ поиска элемента и значение для поиска.
         :param text: Текст, который должен появиться в элементе.
-        :param timeout: Максимальное время ожидания в секундах.
+        :param timeout: Максимальное время ожидания в секундах; None — по профилю.
         """
-        wait = WebDriverWait(self.driver, timeout)
-        wait.until(EC.text_to_be_present_in_element(locator, text))
+        self.elements.put(locator, self.waits.text_present(locator, text, timeout))
 
     def assert_url_is_equal(self, expected_url: str):
         """
@@ -128,51 +349,66 @@ class BasePage:
             expected_url == current_url
         ), f"Ожидали url {expected_url}, получили {current_url}"
 
-    def find_and_send(self, locator: tuple, key: str, timeout=10):
+    def find_and_send(self, locator: tuple, key: str, timeout=None):
         """
         Находит элемент по локатору и отправляет в него текст.
 
         :param locator: Кортеж, содержащий способ поиска элемента и значение для поиска.
         :param key: Текст для отправки в элемент.
-        :param timeout: Максимальное время ожидания в секундах.
+        :param timeout: Максимальное время ожидания в секундах; None — по профилю.
         """
-        by, value = locator
-        wait = WebDriverWait(self.driver, timeout)
-        element = wait.until(EC.presence_of_element_located((by, value)))
-        element.send_keys(key)
+        self._with_element(locator, timeout, lambda element: element.send_keys(key))
 
-    def check_partners_list(self, list_locator: tuple, item_selector: str, timeout=10):
+    def check_partners_list(
+        self, list_locator: tuple, item_selector: str, timeout=None
+    ):
         """
         Проверяет отображение списка партнёров и наличие элементов.
 
         :param list_locator: Кортеж, содержащий способ поиска элемента списка и значение для поиска.
         :param item_selector: Селектор для поиска элементов внутри списка.
-        :param timeout: Максимальное время ожидания в секундах.
+        :param timeout: Максимальное время ожидания в секундах; None — по профилю.
         :raises AssertionError: Если элемент списка не отображается или в списке нет элементов.
         """
-        by, value = list_locator
-        wait = WebDriverWait(self.driver, timeout)
-        partners_list = wait.until(EC.presence_of_element_located((by, value)))
+        cached = self.elements.get(list_locator) is not None
+        if not cached:
+            self.elements.put(list_locator, self.waits.presence(list_locator, timeout))
+        result = self.query_elements(
+            list_locator, item_selector=item_selector, properties=("visible",)
+        )
+        if cached and result["container"] is None:
+            # Список перерисован после того, как элемент попал в кеш
+            self.elements.invalidate(list_locator, stale=True)
+            self.elements.put(list_locator, self.waits.presence(list_locator, timeout))
+            result = self.query_elements(
+                list_locator, item_selector=item_selector, properties=("visible",)
+            )
+        partners_list = result["container"]
         assert (
-            partners_list.is_displayed()
+            partners_list and partners_list["properties"]["visible"]
         ), "LIST_OF_PARTNERS элемент не отображается на странице"
-        elements = partners_list.find_elements(By.CSS_SELECTOR, item_selector)
-        count = len(elements)
+        count = len(result["items"])
         assert count > 0, "Нет элементов с классом 'sbisru-Contacts-List__name'"
-        print(f"Количество элементов с классом '{item_selector}': {count}")
+        logger.debug(f"Количество элементов с классом '{item_selector}': {count}")
 
-    def wait_for_element(self, locator, timeout=10):
+    def wait_for_element(self, locator, timeout=None):
         """
         Ожидание загрузки элемента на странице.
 
         :param driver: Экземпляр WebDriver.
         :param locator: Кортеж, содержащий стратегию поиска (например, By.ID) и значение поиска (например, 'element_id').
-        :param timeout: Максимальное время ожидания в секундах. По умолчанию 10 секунд.
+        :param timeout: Максимальное время ожидания в секундах; None — по профилю.
         :return: Найденный элемент.
         :raises TimeoutException: Если элемент не найден в течение времени ожидания.
         """
-        time.sleep(1)
-        element = WebDriverWait(self.driver, timeout).until(
-            EC.presence_of_element_located(locator)
-        )
-        return element
+        return self._resolve(locator, timeout)
+
+    def run_steps(self, steps: list[Step]) -> dict[str, int]:
+        """
+        Выполняет сценарий по шагам: упавший шаг повторяется с последней
+        контрольной точки (URL и вкладка), пока не закончатся его попытки.
+
+        :param steps: Шаги сценария по порядку.
+        :return: Количество повторов каждого шага.
+        """
+        return ScenarioRunner(self).run(steps)
@@ -1,6 +1,39 @@
 from selenium.webdriver.common.by import By
 
 
+def xpath_literal(text: str) -> str:
+    """
+    Строковый литерал XPath для произвольного текста. В XPath 1.0 нет
+    экранирования кавычек, поэтому текст с обоими видами кавычек собирается
+    через concat().
+    """
+    if "'" not in text:
+        return f"'{text}'"
+    if '"' not in text:
+        return f'"{text}"'
+    parts = ', "\'", '.join(f"'{part}'" for part in text.split("'"))
+    return f"concat({parts})"
+
+
+class Locator(tuple):
+    """
+    Локатор из реестра Locators: кортеж (способ поиска, значение), который знает
+    своё имя в реестре. По имени настраиваются таймауты (см. TimeoutProfile),
+    поэтому одинаковые селекторы под разными именами не смешиваются.
+    """
+
+    name: str | None = None
+
+    def __new__(cls, by: str, value: str):
+        return super().__new__(cls, (by, value))
+
+    def __getnewargs__(self):
+        return tuple(self)
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+
 class Locators:
     """
     Класс для хранения локаторов веб-элементов.
@@ -9,61 +42,71 @@ class Locators:
     будут использованы на различных страницах веб-приложения.
     """
 
-    CONTACTS_BUTTON = (
+    CONTACTS_BUTTON = Locator(
         By.CSS_SELECTOR,
         "li.sbisru-Header__menu-item.sbisru-Header__menu-item-1 a.sbisru-Header__menu-link",
     )
-    CLIENT_BANNER = (
+    CLIENT_BANNER = Locator(
         By.XPATH,
         '//*[@id="contacts_clients"]/div[1]/div/div/div[2]/div/a',
     )
-    MAIN_CONTENT_BLOCK = (
+    MAIN_CONTENT_BLOCK = Locator(
         By.CSS_SELECTOR,
         "#container > div.tensor_ru-content_wrapper > div > div.tensor_ru-Index__block4-bg",
     )
-    DETAILS_BUTTON = (
+    DETAILS_BUTTON = Locator(
         By.CSS_SELECTOR,
         "#container > div.tensor_ru-content_wrapper > div > div.tensor_ru-Index__block4-bg > div > div > div:nth-child(1) > div > p:nth-child(4) > a",
     )
-    WORK_BLOCK = (
+    WORK_BLOCK = Locator(
         By.CSS_SELECTOR,
         "#container > div.tensor_ru-content_wrapper > div > div.tensor_ru-container.tensor_ru-section.tensor_ru-About__block3",
     )
-    IMAGES_BLOCK = (
+    IMAGES_BLOCK = Locator(
         By.CSS_SELECTOR,
         "#container > div.tensor_ru-content_wrapper > div > div.tensor_ru-container.tensor_ru-section.tensor_ru-About__block3 > div.s-Grid-container",
     )
-    LOCATION_DEFINE = (
+    LOCATION_DEFINE = Locator(
         By.CSS_SELECTOR,
         "#container > div.sbis_ru-content_wrapper.ws-flexbox.ws-flex-column > div > div.sbis_ru-container.sbisru-Contacts__relative > div.s-Grid-container.s-Grid-container--space.s-Grid-container--alignEnd.s-Grid-container--noGutter.sbisru-Contacts__underline > div:nth-child(1) > div > div:nth-child(2) > span > span",
     )
-    CITY_LOCATION_DEFINE = (By.NAME, "itemsContainer")
-    LIST_OF_PARTNERS = (By.ID, "contacts_list")
-    SELECT_REGION = (
+    CITY_LOCATION_DEFINE = Locator(By.NAME, "itemsContainer")
+    LIST_OF_PARTNERS = Locator(By.ID, "contacts_list")
+    SELECT_REGION = Locator(
         By.CSS_SELECTOR,
         "#container > div.sbis_ru-content_wrapper.ws-flexbox.ws-flex-column > div > div.sbis_ru-container.sbisru-Contacts__relative > div.s-Grid-container.s-Grid-container--space.s-Grid-container--alignEnd.s-Grid-container--noGutter.sbisru-Contacts__underline > div:nth-child(1) > div > div:nth-child(2) > span > span",
     )
-    INPUT_NAME_REGION = (
+    INPUT_NAME_REGION = Locator(
         By.CSS_SELECTOR,
         "#popup > div.controls-Popup.ws-float-area-show-complete.controls-Popup_shown.controls_themes__wrapper.controls-Scroll_webkitOverflowScrollingTouch.controls-Popup__lastItem > div > div.controls-Scroll-ContainerBase.controls_scroll_theme-sbisru.controls-Scroll__content.controls-Scroll__content_hideNativeScrollbar.controls-Scroll__content_hideNativeScrollbar_ff-ie-edge.controls-Scroll-ContainerBase__scroll_vertical.controls-Scroll-ContainerBase__scrollPosition-regular.controls-Scroll-Container__base.controls-BlockLayout__blockGroup.undefined > div > div > div.sbis_ru-Region-Panel.sbis_ru-Region-Panel-l > div > div > div.ws-flexbox.ws-align-items-baseline > div.controls-Render.js-controls-Render.controls-Render_background-same.controls-Render_textAlign-left.controls-Render_search_borderRadius.controls-Render_state-search-valid.controls-fontsize-xl.controls-fontsize-xl.controls-fontweight-default.controls-Render-fontsize-xl.controls-text-default.controls-Render_state-search-valid_caretEmpty.controls-inlineheight-l.controls-Render-inlineheight-l.controls-search.controls_search_theme-sbisru.controls-notFocusOnEnter.sbis_ru-Region-Panel__search.ws-flex-grow-1.s-Grid--hide-sm > div > div.controls-InputBase__field.controls-Search__field_margin-null.controls-Search__field_theme_sbisru_margin-null.controls-Render__field.controls-Render__field_textAlign_left.ws-ellipsis.controls-Render__field_zIndex > input",
     )
-    BUTTON_REGION_KAMCHATKA = (
-        By.CSS_SELECTOR,
-        "#popup > div.controls-Popup.ws-float-area-show-complete.controls-Popup_shown.controls_themes__wrapper.controls-Scroll_webkitOverflowScrollingTouch.controls-Popup__lastItem > div > div > div > div > div.sbis_ru-Region-Panel.sbis_ru-Region-Panel-l > div > ul > li > span > span > span",
-    )
-    BUTTON_DOWNLOAD_LOCAL_VERSIONS = (
+    BUTTON_DOWNLOAD_LOCAL_VERSIONS = Locator(
         By.CSS_SELECTOR,
         "#container > div.sbisru-Footer.sbisru-Footer__scheme--default > div.sbis_ru-container > div.sbisru-Footer__container > div:nth-child(3) > ul > li:nth-child(8)",
     )
-    SBIS_PLAGIN = (
+    SBIS_PLAGIN = Locator(
         By.CSS_SELECTOR,
         "#ws-us19b255351722193577389 > div.controls-TabButton__inner",
     )
-    BUTTON_WINDOWS = (
+    BUTTON_WINDOWS = Locator(
         By.CSS_SELECTOR,
         "#ws-qabb5gn2eni1722193577415 > div.controls-TabButton__inner > div > div > span",
     )
-    DOWNLOAD_FILE = (
+    DOWNLOAD_FILE = Locator(
         By.XPATH,
         "//div[@class='sbis_ru-DownloadNew-loadLink']//a[@class='sbis_ru-DownloadNew-loadLink__link js-link']",
     )
+
+    @staticmethod
+    def region_button(name: str) -> tuple:
+        """
+        Локатор кнопки региона в попапе выбора региона.
+
+        :param name: Название региона, например "Камчатский край".
+        :return: Кортеж (By.XPATH, выражение).
+        """
+        return (
+            By.XPATH,
+            "//*[@id='popup']//div[contains(@class, 'sbis_ru-Region-Panel')]"
+            f"//li//span[not(span)][contains(normalize-space(.), {xpath_literal(name)})]",
+        )
@@ -0,0 +1,72 @@
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class Region:
+    """
+    Регион для проверки страницы контактов.
+
+    :param name: Название региона в списке выбора региона.
+    :param city: Город, который сайт показывает для региона.
+    :param slug: Часть URL страницы контактов региона.
+    :param code: Код региона в URL страницы контактов.
+    """
+
+    name: str
+    city: str
+    slug: str
+    code: int
+
+    @property
+    def contacts_path(self) -> str:
+        """
+        Путь страницы контактов региона, например "/contacts/41-kamchatskij-kraj".
+        """
+        return f"/contacts/{self.code:02d}-{self.slug}"
+
+
+@dataclass
+class RegionResult:
+    """
+    Результат проверки одного региона.
+
+    :param region: Проверенный регион.
+    :param passed: Прошла ли проверка.
+    :param duration: Время от начала до конца проверки региона в секундах.
+    :param error: Текст ошибки, если проверка не прошла.
+    :param details: Собранные данные (URL, количество партнёров).
+    """
+
+    region: Region
+    passed: bool
+    duration: float
+    error: str | None = None
+    details: dict = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        return {
+            "region": self.region.name,
+            "passed": self.passed,
+            "duration": round(self.duration, 3),
+            "error": self.error,
+            **self.details,
+        }
+
+
+KAMCHATKA = Region(
+    "Камчатский край", "Петропавловск-Камчатский", "kamchatskij-kraj", 41
+)
+
+# Матрица регионов для проверки списков партнёров
+REGIONS = (
+    KAMCHATKA,
+    Region("Ярославская обл.", "Ярославль", "yaroslavskaya-oblast", 76),
+    Region("Новосибирская обл.", "Новосибирск", "novosibirskaya-oblast", 54),
+    Region("Свердловская обл.", "Екатеринбург", "sverdlovskaya-oblast", 66),
+    Region("Краснодарский край", "Краснодар", "krasnodarskij-kraj", 23),
+    Region("Приморский край", "Владивосток", "primorskij-kraj", 25),
+    Region("Республика Татарстан", "Казань", "respublika-tatarstan", 16),
+    Region("Нижегородская обл.", "Нижний Новгород", "nizhegorodskaya-oblast", 52),
+    Region("Самарская обл.", "Самара", "samarskaya-oblast", 63),
+    Region("Калининградская обл.", "Калининград", "kaliningradskaya-oblast", 39),
+)
@@ -0,0 +1,102 @@
+import json
+from urllib.parse import urljoin
+
+import allure
+from loguru import logger
+
+from config.config import BASE_URL
+from tests.pages.locators import Locators
+from tests.pages.regions import Region
+from tests.pages.sbis_site import PLUGIN_SIZE_MB, PLUGIN_SIZE_TOLERANCE_MB
+from tests.utils.http_checks import CheckResult, HttpClient, run_checks
+
+
+class SbisHttp:
+    """
+    Проверки сайта СБИС, которым не нужен браузер: URL и заголовки страниц регионов,
+    доступность tensor.ru/about и размер файла плагина.
+
+    Страницы загружаются по HTTP и разбираются локально, а проверки выполняются
+    одновременно в пуле потоков. Браузер остаётся только для интерактивных сценариев.
+    """
+
+    def __init__(self, client: HttpClient, base_url: str = BASE_URL):
+        """
+        :param client: HTTP-клиент.
+        :param base_url: Адрес сайта СБИС.
+        """
+        self.client = client
+        self.base_url = base_url
+
+    def check_region_page(self, region: Region) -> dict:
+        """
+        Проверяет, что страница контактов региона открывается без перенаправления
+        на другую страницу (сайт знает регион), а её заголовок, который формирует
+        сервер, содержит название региона.
+        """
+        url = f"{self.base_url}{region.contacts_path}"
+        page = self.client.page(url)
+        assert page.status == 200, f"Страница {page.url} вернула {page.status}"
+        assert page.url == url, f"Ожидали url {url}, получили {page.url}"
+        assert (
+            region.name in page.title
+        ), f"Заголовок страницы не '{region.name}': {page.title}"
+        return {"url": page.url, "title": page.title}
+
+    def check_tensor_about(self) -> dict:
+        """
+        Проверяет, что страница https://tensor.ru/about доступна.
+        """
+        page = self.client.page("https://tensor.ru/about")
+        assert page.status == 200, f"Страница {page.url} вернула {page.status}"
+        assert (
+            page.url == "https://tensor.ru/about"
+        ), f"Ожидали url https://tensor.ru/about, получили {page.url}"
+        return {"url": page.url, "title": page.title}
+
+    def plugin_url(self) -> str:
+        """
+        Находит ссылку на файл плагина на странице загрузок.
+        """
+        page = self.client.page(f"{self.base_url}/download")
+        href = page.snapshot.attribute(Locators.DOWNLOAD_FILE, "href")
+        return urljoin(page.url, href)
+
+    def check_plugin_size(self) -> dict:
+        """
+        Проверяет размер файла плагина по заголовкам ответа, не скачивая файл.
+        """
+        url = self.plugin_url()
+        size_mb = self.client.file_size(url) / (1024 * 1024)
+        assert abs(size_mb - PLUGIN_SIZE_MB) <= PLUGIN_SIZE_TOLERANCE_MB, (
+            f"Размер файла ({size_mb:.2f} МБ) не соответствует ожидаемому значению "
+            f"({PLUGIN_SIZE_MB} МБ)."
+        )
+        return {"url": url, "size_mb": round(size_mb, 2)}
+
+    @allure.step("Проверяем сайт СБИС по HTTP")
+    def run_checks(self, regions: tuple = ()) -> list[CheckResult]:
+        """
+        Выполняет все проверки одновременно.
+
+        :param regions: Регионы, страницы контактов которых нужно проверить.
+        :return: Результаты проверок.
+        """
+        checks = {
+            f"region: {region.name}": (
+                lambda region=region: self.check_region_page(region)
+            )
+            for region in regions
+        }
+        checks["tensor.ru/about"] = self.check_tensor_about
+        checks["plugin size"] = self.check_plugin_size
+        results = run_checks(checks)
+        logger.info(
+            f"HTTP-проверок: {len(results)}, успешно: {sum(r.passed for r in results)}"
+        )
+        allure.attach(
+            json.dumps([vars(r) for r in results], ensure_ascii=False, indent=2),
+            name="http-checks",
+            attachment_type=allure.attachment_type.JSON,
+        )
+        return results
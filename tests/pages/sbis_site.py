@@ -1,11 +1,20 @@
+import json
 import os
-import time
 import allure
 from loguru import logger
 import pytest
-from selenium.webdriver.common.by import By
 from tests.pages.base_page import BasePage
+from config.config import BASE_URL, PLUGIN_SHA256, REGION_TABS
 from tests.pages.locators import Locators
+from tests.pages.regions import KAMCHATKA, Region, RegionResult
+from tests.utils.downloads import DownloadResult, verify_file
+from tests.utils.scenario import Step
+from tests.utils.tab_scheduler import TabScheduler, WaitFor
+from tests.utils.visual import baselines_missing
+
+# Ожидаемый размер файла плагина и допустимая погрешность
+PLUGIN_SIZE_MB = 11.05
+PLUGIN_SIZE_TOLERANCE_MB = 0.01
 
 
 class SbisSite(BasePage):
@@ -24,89 +33,105 @@ class SbisSite(BasePage):
         Проверка, что все изображения в указанном блоке имеют одинаковую ширину и высоту.
 
         Эта функция находит все изображения в блоке, определенном локатором IMAGES_BLOCK,
-        и проверяет, что их ширина и высота одинаковы. Если изображения не найдены,
-        тест завершается с ошибкой. Если размеры изображений различаются, тест также
-        завершается с ошибкой, выводя информацию о несоответствии.
+        и проверяет, что их ширина и высота одинаковы, а затем сравнивает каждое
+        изображение с эталоном (см. assert_visual_match), чтобы найти незагруженные,
+        переставленные или искажённые изображения. Если изображения не найдены,
+        тест завершается с ошибкой. Если размеры изображений различаются или
+        изображение отличается от эталона, тест также завершается с ошибкой,
+        выводя информацию о несоответствии.
         """
         try:
             logger.info("Находим блок с изображениями")
-            block = self.find_element(Locators.IMAGES_BLOCK)
-            images = block.find_elements(By.CSS_SELECTOR, "img")
+            self.find_element(Locators.IMAGES_BLOCK)
+            images = self.query_elements(
+                Locators.IMAGES_BLOCK,
+                item_selector="img",
+                attributes=("width", "height"),
+            )["items"]
 
             if not images:
                 logger.error("Изображения не найдены")
                 pytest.fail("Изображения не найдены")
 
-            first_width = images[0].get_attribute("width")
-            first_height = images[0].get_attribute("height")
+            sizes = [
+                (img["attributes"]["width"], img["attributes"]["height"])
+                for img in images
+            ]
+            first_width, first_height = sizes[0]
 
             logger.info(
                 f"Ожидаемая ширина: {first_width}, Ожидаемая высота: {first_height}"
             )
 
-            for img in images:
-                width = img.get_attribute("width")
-                height = img.get_attribute("height")
-                print(f"Width: {width}, Height: {height}")
-                logger.info(f"Текущее изображение - Ширина: {width}, Высота: {height}")
+            for index, (width, height) in enumerate(sizes):
                 assert (
                     width == first_width
-                ), f"Несоответствие ширины: {width} != {first_width}"
+                ), f"Несоответствие ширины изображения {index}: {width} != {first_width}"
                 assert (
                     height == first_height
-                ), f"Несоответствие высоты: {height} != {first_height}"
-                logger.info("Все изображения имеют одинаковую ширину и высоту")
+                ), f"Несоответствие высоты изображения {index}: {height} != {first_height}"
+            logger.info(
+                f"Все изображения ({len(sizes)}) имеют одинаковую ширину и высоту"
+            )
+            if baselines_missing("tensor-about-work"):
+                # Без эталонов проверка всегда проваливалась бы
+                message = (
+                    "Эталонов tensor-about-work нет, сравнение с эталонами пропущено: "
+                    "сохраните их с VISUAL_UPDATE=1 и закоммитьте"
+                )
+                logger.warning(message)
+                allure.attach(message, name="visual-skipped")
+            else:
+                logger.info("Сравниваем изображения блока с эталонами")
+                self.assert_visual_match(
+                    "tensor-about-work", Locators.IMAGES_BLOCK, item_selector="img"
+                )
         except Exception as e:
             logger.error(f"Ошибка теста проверки изображения: {e}")
-            allure.attach(
-                self.driver.get_screenshot_as_png(),
-                name="screenshot",
-                attachment_type=allure.attachment_type.PNG,
-            )
+            self.attach_failure_artifacts()
             pytest.fail(f"Ошибка теста проверки изображения: {e}")
 
     @allure.step(
         "Загрузка и проверка файла на соответствие его размеру, очищение директории"
     )
-    def download_and_verify_file_size_and_clear_directory(self):
+    def download_and_verify_file_size_and_clear_directory(
+        self, download: DownloadResult
+    ):
+        """
+        Проверка загруженного файла на соответствие ожидаемому размеру и очищение директории.
+
+        Размер и контрольная сумма файла считаются за одно потоковое чтение.
+        Контрольная сумма сравнивается с PLUGIN_SHA256, если она задана.
+
+        :param download: Результат загрузки, полученный от DownloadWatcher.
+        """
         try:
-            # Получение пути к директории проекта и определение пути к директории загрузок
-            project_dir = os.path.abspath(os.path.dirname(__file__))
-            download_dir = os.path.join(project_dir, "..\download")
-            logger.info(f"Путь к директории загрузок: {download_dir}")
-            # Проверка наличия директории загрузок
-            if not os.path.exists(download_dir):
-                logger.error(f"Не удалось найти директорию: {download_dir}")
-                pytest.fail(f"Директория не найдена: {download_dir}")
-            # Получение списка файлов в директории загрузок
-            files = os.listdir(download_dir)
-            if not files:
-                logger.error("В директории нет файлов.")
-                pytest.fail("В директории нет файлов.")
-            # Нахождение последнего загруженного файла по времени модификации
-            latest_file = max(
-                files, key=lambda f: os.path.getmtime(os.path.join(download_dir, f))
-            )
-            latest_file_path = os.path.join(download_dir, latest_file)
-            logger.info(f"Последний загруженный файл: {latest_file}")
-            # Получение размера последнего загруженного файла в мегабайтах
-            file_size = os.path.getsize(latest_file_path)
-            file_size_mb = file_size / (1024 * 1024)
+            logger.info(f"Загруженный файл: {download.path}")
+            # Размер и SHA-256 за один проход по файлу
+            verification = verify_file(download.path)
+            file_size_mb = verification.size_mb
             logger.info(
-                f"Размер последнего скачанного файла '{latest_file}': {file_size_mb:.2f} МБ"
+                f"Размер скачанного файла '{download.name}': {file_size_mb:.2f} МБ, "
+                f"SHA-256: {verification.sha256}"
             )
-            # Ожидаемый размер файла и допустимая погрешность
-            expected_size_mb = 11.05
-            tolerance_mb = 0.01  # Допустимая погрешность
             # Проверка соответствия размера файла ожидаемому значению
-            assert abs(file_size_mb - expected_size_mb) <= tolerance_mb, (
+            assert abs(file_size_mb - PLUGIN_SIZE_MB) <= PLUGIN_SIZE_TOLERANCE_MB, (
                 f"Размер файла ({file_size_mb:.2f} МБ) не соответствует ожидаемому значению "
-                f"({expected_size_mb} МБ)."
+                f"({PLUGIN_SIZE_MB} МБ)."
             )
+            assert (
+                verification.size == download.size
+            ), f"Файл изменился после загрузки: {verification.size} != {download.size} байт"
             logger.info("Размер файла соответствует ожидаемому значению")
-            # Удаление всех файлов из директории загрузок
-            for file_name in files:
-                file_path = os.path.join(download_dir, file_name)
+            if PLUGIN_SHA256:
+                assert verification.sha256 == PLUGIN_SHA256, (
+                    f"SHA-256 файла {verification.sha256} не совпадает "
+                    f"с ожидаемой {PLUGIN_SHA256}"
+                )
+                logger.info("Контрольная сумма файла совпадает с ожидаемой")
+            # Удаление всех файлов из директории загрузок текущего теста
+            for file_name in os.listdir(self.download_dir):
+                file_path = os.path.join(self.download_dir, file_name)
                 try:
                     os.remove(file_path)
                     logger.info(f"Удалён файл: {file_path}")
@@ -114,11 +139,7 @@ class SbisSite(BasePage):
                     logger.error(f"Не удалось удалить файл {file_path}: {e}")
         except Exception as e:
             logger.error(f"Ошибка при загрузке и проверке файла: {e}")
-            allure.attach(
-                self.driver.get_screenshot_as_png(),
-                name="screenshot",
-                attachment_type=allure.attachment_type.PNG,
-            )
+            self.attach_failure_artifacts()
             pytest.fail(
                 f"Загрузка и проверка файла на соответствие его размеру, очищение директории: {e}"
             )
@@ -139,34 +160,90 @@ class SbisSite(BasePage):
         8. Прокрутка к блоку "Работа".
         9. Проверка, что все изображения в блоке имеют одинаковую ширину и высоту.
 
-        Если какой-либо из шагов завершится неудачно, тест зафиксирует ошибку.
+        Упавший шаг повторяется с последней контрольной точки (см. ScenarioRunner).
+        Если у шага закончились попытки, тест зафиксирует ошибку.
         """
         try:
-            logger.info("Нажимаем на кнопку 'Контакты'.")
-            self.find_and_click_element(Locators.CONTACTS_BUTTON)
-            logger.info("Нажимаем на баннер клиента.")
-            self.wait_for_element(Locators.CLIENT_BANNER)
-            self.find_and_click_element(Locators.CLIENT_BANNER)
-            logger.info("Переключаемся на последнюю вкладку.")
-            self.switch_to_last_tab()
-            logger.info("Прокручиваем к основному блоку контента.")
-            self.scroll_to_element(Locators.MAIN_CONTENT_BLOCK)
-            self.wait_for_text_in_element(Locators.MAIN_CONTENT_BLOCK, "Сила в людях")
-            logger.info("Нажимаем на кнопку 'Подробнее'.")
-            self.find_and_click_element(Locators.DETAILS_BUTTON)
-            self.assert_url_is_equal("https://tensor.ru/about")
-            logger.info("Прокручиваем к блоку 'Работаем'.")
-            self.scroll_to_element(Locators.WORK_BLOCK)
-            self.assert_all_images_equal()
+            # Изображения нужны для проверки блока "Работаем"
+            self.set_resource_policy(self.resource_policy.allow("images"))
+            self.run_steps(
+                [
+                    Step(
+                        "Нажатие на кнопку 'Контакты'",
+                        lambda: self.find_and_click_element(Locators.CONTACTS_BUTTON),
+                        navigates=True,
+                    ),
+                    Step(
+                        "Нажатие на баннер клиента",
+                        lambda: self.find_and_click_element(Locators.CLIENT_BANNER),
+                    ),
+                    Step(
+                        "Переключение на новую вкладку",
+                        self.switch_to_last_tab,
+                        opens_tab=True,
+                    ),
+                    Step(
+                        "Прокрутка к основному блоку контента",
+                        lambda: self.scroll_to_element(Locators.MAIN_CONTENT_BLOCK),
+                    ),
+                    Step(
+                        "Ожидание текста 'Сила в людях'",
+                        lambda: self.wait_for_text_in_element(
+                            Locators.MAIN_CONTENT_BLOCK, "Сила в людях"
+                        ),
+                    ),
+                    Step(
+                        "Нажатие на кнопку 'Подробнее'",
+                        lambda: self.find_and_click_element(Locators.DETAILS_BUTTON),
+                        navigates=True,
+                    ),
+                    Step(
+                        "Проверка URL страницы 'О компании'",
+                        lambda: self.assert_url_is_equal("https://tensor.ru/about"),
+                        retries=0,
+                    ),
+                    Step(
+                        "Прокрутка к блоку 'Работаем'",
+                        lambda: self.scroll_to_element(Locators.WORK_BLOCK),
+                    ),
+                    Step(
+                        "Проверка размеров изображений",
+                        self.assert_all_images_equal,
+                        retries=0,
+                    ),
+                ]
+            )
         except Exception as e:
+            logger.error(f"Ошибка теста сценария 1: {e}")
+            self.attach_failure_artifacts()
+            pytest.fail(f"Ошибка теста сценария 1: {e}")
 
-            allure.attach(
-                self.driver.get_screenshot_as_png(),
-                name="screenshot",
-                attachment_type=allure.attachment_type.PNG,
-            )
+    def select_region(self, region: Region):
+        """
+        Выбирает регион в попапе выбора региона на странице контактов.
 
-            pytest.fail(f"Ошибка теста сценария 1: {e}")
+        :param region: Регион для выбора.
+        """
+        self.find_and_click_element(Locators.SELECT_REGION)
+        self.find_and_send(Locators.INPUT_NAME_REGION, region.name)
+        self.wait_for_element(Locators.region_button(region.name))
+        self.find_and_click_element(Locators.region_button(region.name))
+
+    def assert_region_page(self, region: Region):
+        """
+        Проверяет, что URL и заголовок страницы соответствуют региону.
+
+        :param region: Ожидаемый регион.
+        :raises AssertionError: Если URL или заголовок не соответствуют региону.
+        """
+        current_url = self.get_current_url()
+        logger.info(f"Текущий URL: {current_url}")
+        assert (
+            region.slug in current_url
+        ), f"Текущий URL не совпадает с '{region.slug}': {current_url}"
+        title = self.driver.title
+        logger.info(f"Текущий заголовок страницы: {title}")
+        assert region.name in title, f"Заголовок страницы не '{region.name}': {title}"
 
     @allure.step("Запускаем второй сценарий")
     def test_second_scenario(self):
@@ -185,81 +262,202 @@ class SbisSite(BasePage):
         9. Проверка, что текущий URL содержит "kamchatskij-kraj".
         10. Проверка, что заголовок страницы содержит "Камчатский край".
 
-        Если какой-либо из шагов завершится неудачно, тест зафиксирует ошибку.
+        Упавший шаг повторяется с последней контрольной точки (см. ScenarioRunner).
+        Если у шага закончились попытки, тест зафиксирует ошибку.
         """
+        partner_selector = "div.sbisru-Contacts-List__name"
         try:
-            logger.info("Нажимаем на кнопку 'Контакты'")
-            self.find_and_click_element(Locators.CONTACTS_BUTTON)
-            logger.info("Проверяем, что местоположение определено как 'Самарская обл.'")
-            self.wait_for_text_in_element(
-                Locators.LOCATION_DEFINE, "Самарская обл."
-            )  # можно заменить на любой регион
-            logger.info("Проверяем, что город определен как 'Самара'")
-            self.wait_for_text_in_element(
-                Locators.CITY_LOCATION_DEFINE, "Самара"
-            )  # можно заменить на любой город
-            logger.info("Проверяем список партнеров для Самарской области")
-            self.check_partners_list(
-                Locators.LIST_OF_PARTNERS, "div.sbisru-Contacts-List__name"
-            )
-            logger.info("Открываем выбор региона")
-            self.find_and_click_element(Locators.SELECT_REGION)
-            logger.info("Вводим 'Камчатский край' в поле выбора региона")
-            self.find_and_send(Locators.INPUT_NAME_REGION, "Камчатский край")
-            logger.info("Ожидаем элемент кнопки выбора региона 'Камчатский край'")
-            self.wait_for_element(Locators.BUTTON_REGION_KAMCHATKA)
-            logger.info("Нажимаем кнопку выбора региона 'Камчатский край'")
-            self.find_and_click_element(Locators.BUTTON_REGION_KAMCHATKA)
-            logger.info("Проверяем, что местоположение изменено на 'Камчатский край'")
-            self.wait_for_text_in_element(Locators.LOCATION_DEFINE, "Камчатский край")
-            logger.info("Проверяем, что город изменен на 'Петропавловск-Камчатский'")
-            self.wait_for_text_in_element(
-                Locators.CITY_LOCATION_DEFINE, "Петропавловск-Камчатский"
+            self.run_steps(
+                [
+                    Step(
+                        "Нажатие на кнопку 'Контакты'",
+                        lambda: self.find_and_click_element(Locators.CONTACTS_BUTTON),
+                        navigates=True,
+                    ),
+                    # можно заменить на любой регион и город
+                    Step(
+                        "Ожидание региона 'Самарская обл.'",
+                        lambda: self.wait_for_text_in_element(
+                            Locators.LOCATION_DEFINE, "Самарская обл."
+                        ),
+                    ),
+                    Step(
+                        "Ожидание города 'Самара'",
+                        lambda: self.wait_for_text_in_element(
+                            Locators.CITY_LOCATION_DEFINE, "Самара"
+                        ),
+                    ),
+                    Step(
+                        "Проверка списка партнёров Самарской области",
+                        lambda: self.check_partners_list(
+                            Locators.LIST_OF_PARTNERS, partner_selector
+                        ),
+                    ),
+                    Step(
+                        f"Выбор региона '{KAMCHATKA.name}'",
+                        lambda: self.select_region(KAMCHATKA),
+                        navigates=True,
+                        restore=True,
+                    ),
+                    Step(
+                        f"Ожидание региона '{KAMCHATKA.name}'",
+                        lambda: self.wait_for_text_in_element(
+                            Locators.LOCATION_DEFINE, KAMCHATKA.name
+                        ),
+                    ),
+                    Step(
+                        f"Ожидание города '{KAMCHATKA.city}'",
+                        lambda: self.wait_for_text_in_element(
+                            Locators.CITY_LOCATION_DEFINE, KAMCHATKA.city
+                        ),
+                    ),
+                    Step(
+                        "Проверка списка партнёров Камчатского края",
+                        lambda: self.check_partners_list(
+                            Locators.LIST_OF_PARTNERS, partner_selector
+                        ),
+                    ),
+                    Step(
+                        "Проверка URL и заголовка страницы региона",
+                        lambda: self.assert_region_page(KAMCHATKA),
+                        retries=0,
+                    ),
+                ]
             )
-            logger.info("Проверяем список партнеров для Камчатского края")
-            self.check_partners_list(
-                Locators.LIST_OF_PARTNERS, "div.sbisru-Contacts-List__name"
-            )
-            current_url = self.get_current_url()
-            logger.info(f"Текущий URL: {current_url}")
-            assert (
-                "kamchatskij-kraj" in current_url
-            ), f"Текущий URL не совпадает с 'kamchatskij-kraj': {current_url}"
-            title = self.driver.title
-            logger.info(f"Текущий заголовок страницы: {title}")
-            assert (
-                "Камчатский край" in title
-            ), f"Заголовок страницы не 'Камчатский край': {title}"
         except Exception as e:
             logger.error(f"Ошибка теста сценария 2: {e}")
-            allure.attach(
-                self.driver.get_screenshot_as_png(),
-                name="screenshot",
-                attachment_type=allure.attachment_type.PNG,
-            )
+            self.attach_failure_artifacts()
             pytest.fail(f"Ошибка теста сценария 2: {e}")
 
+    def download_plugin(self) -> DownloadResult:
+        """
+        Скачивает файл плагина со страницы загрузок.
+
+        :return: Результат загрузки.
+        """
+        with self.watch_downloads() as watcher:
+            self.find_and_click_element(Locators.DOWNLOAD_FILE)
+            return watcher.wait_for_download()
+
     @allure.step("Запускаем третий сценарий")
     def test_third_scenario(self):
-        try:
-            logger.info("Скроллим до кнопки 'Скачать локальные версии'")
-            self.scroll_to_element(Locators.BUTTON_DOWNLOAD_LOCAL_VERSIONS)
-            logger.info("Нажимаем кнопку 'Скачать локальные версии'")
-            self.find_and_click_element(Locators.BUTTON_DOWNLOAD_LOCAL_VERSIONS)
-            logger.info("Ожидаем загрузку страницы")
-            self.driver.implicitly_wait(5)
-            logger.info("Нажимаем на элемент для скачивания файла")
-            self.find_and_click_element(Locators.DOWNLOAD_FILE)
-            logger.info("Ожидаем завершение загрузки файла")
-            time.sleep(3)  # ожидание окончания загрузки файла
-            logger.info("Проверяем размер загруженного файла и очищаем директорию")
-            self.download_and_verify_file_size_and_clear_directory()
+        """
+        Третий сценарий тестирования.
+
+        Этот тестовый сценарий включает следующие шаги:
+        1. Прокрутка к кнопке "Скачать локальные версии".
+        2. Нажатие на кнопку "Скачать локальные версии".
+        3. Скачивание файла плагина.
+        4. Проверка размера загруженного файла и очищение директории.
 
+        Упавший шаг повторяется с последней контрольной точки (см. ScenarioRunner).
+        Если у шага закончились попытки, тест зафиксирует ошибку.
+        """
+        downloads = []
+        try:
+            self.run_steps(
+                [
+                    Step(
+                        "Прокрутка к кнопке 'Скачать локальные версии'",
+                        lambda: self.scroll_to_element(
+                            Locators.BUTTON_DOWNLOAD_LOCAL_VERSIONS
+                        ),
+                    ),
+                    Step(
+                        "Нажатие на кнопку 'Скачать локальные версии'",
+                        lambda: self.find_and_click_element(
+                            Locators.BUTTON_DOWNLOAD_LOCAL_VERSIONS
+                        ),
+                        navigates=True,
+                    ),
+                    Step(
+                        "Скачивание файла плагина",
+                        lambda: downloads.append(self.download_plugin()),
+                    ),
+                    Step(
+                        "Проверка размера файла и очищение директории",
+                        lambda: self.download_and_verify_file_size_and_clear_directory(
+                            downloads[-1]
+                        ),
+                        retries=0,
+                    ),
+                ]
+            )
         except Exception as e:
             logger.error(f"Ошибка теста сценария 3: {e}")
-            allure.attach(
-                self.driver.get_screenshot_as_png(),
-                name="screenshot",
-                attachment_type=allure.attachment_type.PNG,
-            )
+            self.attach_failure_artifacts()
             pytest.fail(f"Ошибка теста сценария 3: {e}")
+
+    def _check_region(self, region: Region):
+        """
+        Проверка страницы контактов одного региона для TabScheduler.
+        Выполняется в своей вкладке и уступает браузер на каждом ожидании.
+
+        :param region: Проверяемый регион.
+        :return: URL страницы региона и количество партнёров.
+        """
+        self.start_navigation(f"{BASE_URL}/contacts")
+        chooser = yield WaitFor(Locators.SELECT_REGION, "clickable")
+        chooser.click()
+        search = yield WaitFor(Locators.INPUT_NAME_REGION, "clickable")
+        search.send_keys(region.name)
+        button = yield WaitFor(Locators.region_button(region.name), "clickable")
+        button.click()
+        yield WaitFor(Locators.LOCATION_DEFINE, "text", region.name)
+        yield WaitFor(Locators.CITY_LOCATION_DEFINE, "text", region.city)
+        yield WaitFor(Locators.LIST_OF_PARTNERS)
+        partners = self.query_elements(
+            Locators.LIST_OF_PARTNERS, item_selector="div.sbisru-Contacts-List__name"
+        )["items"]
+        assert partners, f"Нет партнёров в регионе '{region.name}'"
+        url = self.get_current_url()
+        assert region.slug in url, f"URL не содержит '{region.slug}': {url}"
+        title = self.driver.title
+        assert region.name in title, f"Заголовок страницы не '{region.name}': {title}"
+        return {"url": url, "partners": len(partners)}
+
+    @allure.step("Проверяем списки партнёров в регионах")
+    def check_regions(
+        self, regions: tuple, tabs: int = REGION_TABS
+    ) -> list[RegionResult]:
+        """
+        Проверяет страницы контактов регионов одновременно в нескольких вкладках.
+
+        Для каждого региона выбирается регион в попапе, проверяются регион, город,
+        список партнёров, URL и заголовок страницы. Ошибка в одном регионе
+        не останавливает проверку остальных.
+
+        :param regions: Регионы для проверки.
+        :param tabs: Сколько вкладок браузера использовать одновременно.
+        :return: Результаты по регионам в порядке из `regions`.
+        """
+        by_name = {region.name: region for region in regions}
+        tasks = TabScheduler(self.driver, tabs).run(
+            {
+                region.name: (lambda region=region: self._check_region(region))
+                for region in regions
+            }
+        )
+        finished = {
+            task.name: RegionResult(
+                by_name[task.name],
+                passed=task.error is None,
+                duration=task.duration,
+                error=(
+                    None
+                    if task.error is None
+                    else f"{type(task.error).__name__}: {task.error}"
+                ),
+                details=task.result or {},
+            )
+            for task in tasks
+        }
+        results = [finished[region.name] for region in regions]
+        passed = sum(result.passed for result in results)
+        logger.info(f"Проверено регионов: {len(results)}, успешно: {passed}")
+        allure.attach(
+            json.dumps([r.as_dict() for r in results], ensure_ascii=False, indent=2),
+            name="regions",
+            attachment_type=allure.attachment_type.JSON,
+        )
+        return results
@@ -0,0 +1,12 @@
+from tests.pages.regions import REGIONS
+from tests.pages.sbis_http import SbisHttp
+
+
+class TestSbisHttp:
+
+    def test_region_pages_about_page_and_plugin_size(self, http_client):
+        results = SbisHttp(http_client).run_checks(REGIONS)
+        failed = [result for result in results if not result.passed]
+        assert not failed, "\n".join(
+            f"{result.name}: {result.error}" for result in failed
+        )
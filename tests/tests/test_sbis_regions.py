@@ -0,0 +1,14 @@
+from config.config import REGION_TABS
+from tests.pages.regions import REGIONS
+from tests.pages.sbis_site import SbisSite
+
+
+class TestSbisRegions:
+
+    def test_partners_in_all_regions(self, open_website_and_clear):
+        page = SbisSite(open_website_and_clear)
+        results = page.check_regions(REGIONS, tabs=REGION_TABS)
+        failed = [result for result in results if not result.passed]
+        assert not failed, "\n".join(
+            f"{result.region.name}: {result.error}" for result in failed
+        )
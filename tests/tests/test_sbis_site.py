@@ -1,3 +1,5 @@
+import pytest
+
 from tests.pages.sbis_site import SbisSite
 
 
@@ -11,6 +13,9 @@ class TestSbisSite:
         page = SbisSite(open_website_and_clear)
         page.test_second_scenario()
 
-    def test_download_and_verify_sbis_plugin(self, open_website_and_clear):
-        page = SbisSite(open_website_and_clear)
+    @pytest.mark.resources(block=["images"])
+    def test_download_and_verify_sbis_plugin(
+        self, open_website_and_clear, download_dir
+    ):
+        page = SbisSite(open_website_and_clear, download_dir)
         page.test_third_scenario()
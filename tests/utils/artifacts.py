@@ -0,0 +1,192 @@
+import base64
+import io
+import os
+import re
+import shutil
+import sys
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+
+import allure
+import pytest
+from loguru import logger
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from tests.utils.run_context import current
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - зависит от окружения
+    Image = None
+
+# Отметка на исключении, для которого артефакты уже сняты.
+_CAPTURED_MARK = "_failure_artifacts_captured"
+
+# Сборщик артефактов сессии pytest (регистрируется в conftest.py).
+# None вне pytest: в этом случае capture_failure ничего не делает.
+collector = None
+
+
+@dataclass
+class Artifact:
+    """
+    Готовый к прикреплению файл.
+
+    :param name: Имя вложения в Allure.
+    :param path: Путь к файлу.
+    :param mime_type: MIME-тип вложения.
+    :param extension: Расширение файла во вложении.
+    """
+
+    name: str
+    path: str
+    mime_type: str
+    extension: str
+
+
+def _already_captured(error: BaseException | None) -> bool:
+    """
+    Проверяет, сняты ли артефакты для исключения или любой его причины.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if getattr(error, _CAPTURED_MARK, False):
+            return True
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def encode_screenshot(png: bytes, image_format: str) -> tuple[bytes, str, str]:
+    """
+    Сжимает скриншот. Без Pillow скриншот сохраняется как есть.
+
+    :param png: Скриншот в PNG от WebDriver.
+    :param image_format: "webp" или "png".
+    :return: Данные, MIME-тип и расширение.
+    """
+    if Image is None:
+        return png, "image/png", "png"
+    image = Image.open(io.BytesIO(png))
+    output = io.BytesIO()
+    if image_format == "webp":
+        image.save(output, format="WEBP", quality=80, method=4)
+        return output.getvalue(), "image/webp", "webp"
+    image.save(output, format="PNG", optimize=True)
+    return output.getvalue(), "image/png", "png"
+
+
+class FailureArtifacts:
+    """
+    Сборщик артефактов падения (скриншот и DOM страницы).
+
+    Артефакты снимаются один раз на падение, на какой бы глубине вложенных шагов
+    оно ни произошло: исключение помечается, и повторные вызовы для него
+    или для исключений, вызванных им, ничего не делают. В потоке теста выполняются
+    только две команды WebDriver, а сжатие и запись файлов — в фоновом пуле.
+    Вложения добавляются в Allure после завершения teardown теста, поэтому
+    ни завершение фикстур, ни возврат браузера в пул их не ждут.
+    """
+
+    def __init__(self, image_format: str = "webp", workers: int = 2):
+        """
+        :param image_format: Формат скриншотов: "webp" или "png".
+        :param workers: Количество фоновых потоков.
+        """
+        self.image_format = image_format
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="artifacts")
+        self._directory = tempfile.mkdtemp(prefix="failure-artifacts-")
+        self._pending: dict[str, list[Future]] = {}
+
+    def capture(self, driver: WebDriver, error: BaseException | None = None):
+        """
+        Снимает артефакты текущего падения.
+
+        :param driver: Экземпляр WebDriver.
+        :param error: Исключение падения. По умолчанию — обрабатываемое исключение.
+        """
+        if error is None:
+            error = sys.exc_info()[1]
+        if _already_captured(error):
+            return
+        if error is not None:
+            setattr(error, _CAPTURED_MARK, True)
+        try:
+            screenshot = driver.get_screenshot_as_base64()
+            html = driver.execute_script(
+                "return document.documentElement ? document.documentElement.outerHTML : '';"
+            )
+        except WebDriverException as e:
+            logger.warning(f"Не удалось снять артефакты падения: {e.msg}")
+            return
+        test_id = current.test_id or "session"
+        name = re.sub(r"[^\w.-]+", "_", test_id)
+        prefix = os.path.join(self._directory, f"{name}-{id(error)}")
+        self._pending.setdefault(test_id, []).extend(
+            [
+                self._executor.submit(self._write_screenshot, prefix, screenshot),
+                self._executor.submit(self._write_dom, prefix, html),
+            ]
+        )
+
+    def _write_screenshot(self, prefix: str, screenshot: str) -> Artifact:
+        data, mime_type, extension = encode_screenshot(
+            base64.b64decode(screenshot), self.image_format
+        )
+        path = f"{prefix}-screenshot.{extension}"
+        with open(path, "wb") as f:
+            f.write(data)
+        return Artifact("screenshot", path, mime_type, extension)
+
+    @staticmethod
+    def _write_dom(prefix: str, html: str) -> Artifact:
+        path = f"{prefix}-dom.html"
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+        return Artifact("dom", path, "text/html", "html")
+
+    def attach(self, test_id: str):
+        """
+        Прикрепляет к отчёту Allure артефакты теста и удаляет временные файлы.
+        """
+        for future in self._pending.pop(test_id, []):
+            try:
+                artifact = future.result()
+            except Exception as e:
+                logger.warning(f"Не удалось сохранить артефакт падения: {e}")
+                continue
+            allure.attach.file(
+                artifact.path,
+                name=artifact.name,
+                attachment_type=artifact.mime_type,
+                extension=artifact.extension,
+            )
+            os.remove(artifact.path)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        report = outcome.get_result()
+        if report.failed and call.when == "call":
+            # Падение вне объектов страниц (например, assert в самом тесте)
+            driver = item.funcargs.get("driver")
+            if driver is not None:
+                self.capture(driver, call.excinfo.value)
+        if call.when == "teardown":
+            self.attach(item.nodeid)
+
+    def pytest_unconfigure(self, config):
+        self._executor.shutdown(wait=True)
+        shutil.rmtree(self._directory, ignore_errors=True)
+
+
+def capture_failure(driver: WebDriver):
+    """
+    Снимает артефакты обрабатываемого исключения сборщиком сессии.
+
+    :param driver: Экземпляр WebDriver.
+    """
+    if collector is not None:
+        collector.capture(driver)
@@ -0,0 +1,121 @@
+import json
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from tests.utils import profiling
+
+# Разница во времени меньше этого порога (в секундах) считается шумом.
+NOISE_FLOOR = 0.005
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    Результат замера одного примитива.
+
+    :param name: Название замера.
+    :param samples: Длительность каждого прогона в секундах.
+    :param round_trips: Количество команд WebDriver в каждом прогоне.
+    """
+
+    name: str
+    samples: list[float] = field(default_factory=list)
+    round_trips: list[int] = field(default_factory=list)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.samples)
+
+    @property
+    def p95(self) -> float:
+        return profiling.percentile(self.samples, 95)
+
+    def as_dict(self) -> dict:
+        return {
+            "rounds": len(self.samples),
+            "median": round(self.median, 6),
+            "p95": round(self.p95, 6),
+            "min": round(min(self.samples), 6),
+            "round_trips": max(self.round_trips),
+        }
+
+
+def run_benchmark(
+    driver: WebDriver,
+    name: str,
+    action: Callable[[], object],
+    setup: Callable[[], object] = None,
+    rounds: int = 15,
+    warmup: int = 2,
+) -> BenchmarkResult:
+    """
+    Многократно выполняет действие и замеряет его длительность и количество
+    команд WebDriver. Подготовка (setup) в замер не входит.
+
+    :param driver: Экземпляр WebDriver.
+    :param name: Название замера.
+    :param action: Замеряемое действие.
+    :param setup: Подготовка перед каждым прогоном (например, открыть страницу заново).
+    :param rounds: Количество замеряемых прогонов.
+    :param warmup: Количество прогонов для прогрева, которые не учитываются.
+    :return: Результат замера.
+    """
+    profiling.instrument(driver)
+    previous = profiling.active_timeline
+    result = BenchmarkResult(name)
+    try:
+        for index in range(warmup + rounds):
+            if setup is not None:
+                setup()
+            timeline = profiling.active_timeline = profiling.Timeline(name)
+            started = time.perf_counter()
+            action()
+            elapsed = time.perf_counter() - started
+            profiling.active_timeline = previous
+            if index >= warmup:
+                result.samples.append(elapsed)
+                result.round_trips.append(len(timeline.commands))
+    finally:
+        profiling.active_timeline = previous
+    return result
+
+
+def compare(result: dict, baseline: dict | None, max_slowdown: float) -> list[str]:
+    """
+    Сравнивает результат замера с базовым.
+
+    Регрессией считается медиана, выросшая больше чем в `max_slowdown` раз
+    (и больше чем на NOISE_FLOOR), или выросшее количество команд WebDriver.
+
+    :return: Список описаний регрессий.
+    """
+    if not baseline:
+        return []
+    problems = []
+    if result["median"] > max(
+        baseline["median"] * max_slowdown, baseline["median"] + NOISE_FLOOR
+    ):
+        problems.append(
+            f"медиана выросла с {baseline['median'] * 1000:.1f} "
+            f"до {result['median'] * 1000:.1f} мс"
+        )
+    if result["round_trips"] > baseline["round_trips"]:
+        problems.append(
+            f"команд WebDriver стало {result['round_trips']} "
+            f"вместо {baseline['round_trips']}"
+        )
+    return problems
+
+
+def load_baseline(path: str | None) -> dict:
+    """
+    Загружает базовые результаты {название: результат} или пустой словарь.
+    """
+    if not path:
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
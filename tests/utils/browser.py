@@ -0,0 +1,48 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from config.config import PAGE_LOAD_STRATEGY
+
+
+def create_driver(
+    headless: bool,
+    download_dir: str,
+    arguments: tuple = (),
+    page_load_strategy: str = PAGE_LOAD_STRATEGY,
+):
+    """
+    Создаёт веб-драйвер Chrome с переданными опциями.
+    Запускает браузер в режиме инкогнито и разворачивает его на весь экран.
+
+    :param headless: Запускать ли браузер в headless режиме.
+    :param download_dir: Директория загрузок по умолчанию.
+    :param arguments: Дополнительные аргументы командной строки Chrome.
+    :param page_load_strategy: Стратегия загрузки страниц ("normal", "eager" или "none").
+        Готовность документа дожидаются ожидания InPageWait (см. readiness.py).
+    :return: Экземпляр WebDriver.
+    """
+    chrome_options = Options()
+    chrome_options.page_load_strategy = page_load_strategy
+    prefs = {
+        "download.default_directory": download_dir,
+        "download.prompt_for_download": False,
+        "directory_upgrade": True,
+        "safebrowsing.enabled": True,
+        "profile.default_content_setting_values.automatic_downloads": 1,
+    }
+    chrome_options.add_experimental_option("prefs", prefs)
+    # Сетевые события DevTools для статистики загруженных и заблокированных ресурсов
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    chrome_options.add_experimental_option(
+        "perfLoggingPrefs", {"enableNetwork": True, "enablePage": False}
+    )
+    chrome_options.add_argument("--incognito")
+    if headless:
+        chrome_options.add_argument("--headless")
+    for argument in arguments:
+        chrome_options.add_argument(argument)
+    if "--ignore-certificate-errors" in arguments:
+        chrome_options.accept_insecure_certs = True
+    driver = webdriver.Chrome(options=chrome_options)
+    driver.set_window_size(1920, 1080)
+    return driver
@@ -0,0 +1,75 @@
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from tests.utils.waits import LOCATE_JS
+
+# Пакетное чтение данных элементов: все атрибуты и свойства всех найденных
+# элементов собираются в браузере и возвращаются одним ответом.
+_QUERY_SCRIPT = (
+    LOCATE_JS
+    + """
+const [by, value, itemSelector, attributes, properties] = arguments;
+
+function describe(el) {
+    const info = {attributes: {}, properties: {}};
+    for (const name of attributes) {
+        info.attributes[name] = el.getAttribute(name);
+    }
+    for (const name of properties) {
+        if (name === "rect") {
+            const r = el.getBoundingClientRect();
+            info.properties.rect = {x: r.x, y: r.y, width: r.width, height: r.height};
+        } else if (name === "visible") {
+            info.properties.visible = visible(el);
+        } else if (name === "text") {
+            info.properties.text = el.innerText;
+        } else {
+            // Возвращаем только примитивы: объекты DOM не сериализуются в ответ.
+            const prop = el[name];
+            const primitive = prop === null || typeof prop !== "object" && prop !== undefined;
+            info.properties[name] = primitive ? prop : null;
+        }
+    }
+    return info;
+}
+
+const matches = locate(by, value);
+if (!itemSelector) {
+    return {container: null, items: matches.map(describe)};
+}
+const container = matches[0];
+if (!container) {
+    return {container: null, items: []};
+}
+return {
+    container: describe(container),
+    items: Array.from(container.querySelectorAll(itemSelector)).map(describe),
+};
+"""
+)
+
+
+def query_elements(
+    driver: WebDriver,
+    locator: tuple,
+    item_selector: str = None,
+    attributes: tuple = (),
+    properties: tuple = (),
+) -> dict:
+    """
+    Собирает атрибуты и свойства всех подходящих элементов за один вызов execute_script.
+
+    Помимо обычных свойств DOM (например, naturalWidth, complete) поддерживаются
+    вычисляемые свойства: "rect" (getBoundingClientRect), "visible" и "text".
+
+    :param driver: Экземпляр WebDriver.
+    :param locator: Кортеж, содержащий способ поиска элемента и значение для поиска.
+    :param item_selector: CSS-селектор элементов внутри первого найденного контейнера.
+    :param attributes: Имена HTML-атрибутов.
+    :param properties: Имена свойств элемента.
+    :return: Словарь {"container": данные контейнера или None, "items": [данные элементов]},
+        где данные элемента — {"attributes": {...}, "properties": {...}}.
+    """
+    by, value = locator
+    return driver.execute_script(
+        _QUERY_SCRIPT, by, value, item_selector, list(attributes), list(properties)
+    )
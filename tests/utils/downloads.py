@@ -0,0 +1,257 @@
+import ctypes
+import ctypes.util
+import fnmatch
+import hashlib
+import os
+import select
+import struct
+import time
+from dataclasses import dataclass
+
+from loguru import logger
+
+from tests.utils.profiling import span
+
+# Суффиксы незавершённых загрузок: Chrome пишет файл в "<имя>.crdownload"
+# и переименовывает его в конечное имя после завершения.
+PARTIAL_SUFFIXES = (".crdownload", ".tmp", ".part")
+
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+@dataclass
+class DownloadResult:
+    """
+    Результат завершённой загрузки.
+
+    :param path: Путь к загруженному файлу.
+    :param size: Размер файла в байтах.
+    :param elapsed: Время загрузки в секундах.
+    """
+
+    path: str
+    size: int
+    elapsed: float
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path)
+
+    @property
+    def throughput_mb(self) -> float:
+        """
+        Скорость загрузки в МБ/с.
+        """
+        return self.size / (1024 * 1024) / self.elapsed if self.elapsed else 0.0
+
+
+@dataclass
+class FileVerification:
+    """
+    Результат проверки файла.
+
+    :param path: Путь к файлу.
+    :param size: Размер файла в байтах, посчитанный при чтении.
+    :param sha256: Контрольная сумма SHA-256.
+    """
+
+    path: str
+    size: int
+    sha256: str
+
+    @property
+    def size_mb(self) -> float:
+        return self.size / (1024 * 1024)
+
+
+def is_partial(name: str) -> bool:
+    """
+    Проверяет, является ли файл незавершённой загрузкой.
+
+    :param name: Имя файла.
+    :return: True, если файл ещё загружается.
+    """
+    return name.endswith(PARTIAL_SUFFIXES)
+
+
+def verify_file(path: str, chunk_size: int = 1024 * 1024) -> FileVerification:
+    """
+    Считает размер и контрольную сумму файла за одно потоковое чтение.
+
+    :param path: Путь к файлу.
+    :param chunk_size: Размер читаемого блока в байтах.
+    :return: Результат проверки файла.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+            size += len(chunk)
+    return FileVerification(path=path, size=size, sha256=digest.hexdigest())
+
+
+class _Inotify:
+    """
+    Минимальная обёртка над inotify (Linux) через ctypes.
+    """
+
+    def __init__(self, directory: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = (
+            _IN_CREATE
+            | _IN_MODIFY
+            | _IN_CLOSE_WRITE
+            | _IN_MOVED_FROM
+            | _IN_MOVED_TO
+            | _IN_DELETE
+        )
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def read(self, timeout: float) -> list[tuple[int, str]]:
+        """
+        Ждёт события не дольше `timeout` секунд.
+
+        :param timeout: Время ожидания в секундах.
+        :return: Список пар (маска события, имя файла).
+        """
+        ready, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not ready:
+            return []
+        data = os.read(self.fd, 64 * 1024)
+        events, offset = [], 0
+        while offset < len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            events.append((mask, os.fsdecode(name)))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class DownloadWatcher:
+    """
+    Отслеживает появление загруженного файла в директории.
+
+    На Linux использует inotify и реагирует на событие переименования
+    `.crdownload` в конечный файл сразу, без повторного сканирования директории.
+    На других платформах (или если inotify недоступен) опрашивает директорию.
+    Наблюдение нужно запускать до начала загрузки::
+
+        with DownloadWatcher(download_dir) as watcher:
+            page.find_and_click_element(Locators.DOWNLOAD_FILE)
+            result = watcher.wait_for_download()
+    """
+
+    def __init__(self, directory: str, poll_interval: float = 0.1):
+        """
+        :param directory: Директория загрузок.
+        :param poll_interval: Интервал опроса директории в режиме без inotify.
+        """
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self._inotify = None
+        self._existing: set[str] = set()
+        self._started = 0.0
+
+    def __enter__(self):
+        self._existing = set(os.listdir(self.directory))
+        try:
+            self._inotify = _Inotify(self.directory)
+        except (OSError, AttributeError) as e:
+            logger.info(f"inotify недоступен, используем опрос директории: {e}")
+            self._inotify = None
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def wait_for_download(
+        self, timeout: float = 120, pattern: str = "*"
+    ) -> DownloadResult:
+        """
+        Ждёт завершения загрузки файла, подходящего под шаблон.
+
+        :param timeout: Максимальное время ожидания в секундах.
+        :param pattern: Шаблон имени ожидаемого файла (fnmatch).
+        :return: Результат загрузки.
+        :raises TimeoutError: Если загрузка не завершилась за время ожидания.
+        """
+        deadline = self._started + timeout
+        with span("wait:download"):
+            if self._inotify is not None:
+                name = self._wait_inotify(deadline, pattern)
+            else:
+                name = self._wait_polling(deadline, pattern)
+        path = os.path.join(self.directory, name)
+        result = DownloadResult(
+            path=path,
+            size=os.path.getsize(path),
+            elapsed=time.perf_counter() - self._started,
+        )
+        logger.info(
+            f"Файл '{result.name}' загружен за {result.elapsed:.2f} с "
+            f"({result.throughput_mb:.2f} МБ/с)"
+        )
+        return result
+
+    def _wait_inotify(self, deadline: float, pattern: str) -> str:
+        partial: set[str] = set()
+        completed = None
+        while (remaining := deadline - time.perf_counter()) > 0:
+            for mask, name in self._inotify.read(remaining):
+                if is_partial(name):
+                    if mask & (_IN_MOVED_FROM | _IN_DELETE):
+                        partial.discard(name)
+                    elif mask & (_IN_CREATE | _IN_MODIFY | _IN_MOVED_TO):
+                        partial.add(name)
+                elif (
+                    mask & (_IN_MOVED_TO | _IN_CLOSE_WRITE)
+                    and name not in self._existing
+                    and fnmatch.fnmatch(name, pattern)
+                ):
+                    completed = name
+            # Chrome может заранее создать пустой файл с конечным именем,
+            # поэтому загрузка завершена, только когда не осталось .crdownload.
+            if (
+                completed
+                and not partial
+                and os.path.getsize(os.path.join(self.directory, completed))
+            ):
+                return completed
+        raise TimeoutError(f"Загрузка не завершилась в директории {self.directory}")
+
+    def _wait_polling(self, deadline: float, pattern: str) -> str:
+        sizes: dict[str, int] = {}
+        while time.perf_counter() < deadline:
+            names = set(os.listdir(self.directory)) - self._existing
+            if names and not any(is_partial(name) for name in names):
+                for name in sorted(names):
+                    if not fnmatch.fnmatch(name, pattern):
+                        continue
+                    size = os.path.getsize(os.path.join(self.directory, name))
+                    if size and sizes.get(name) == size:
+                        return name
+                    sizes[name] = size
+            time.sleep(self.poll_interval)
+        raise TimeoutError(f"Загрузка не завершилась в директории {self.directory}")
@@ -0,0 +1,204 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable
+from urllib.parse import urlsplit
+
+from loguru import logger
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+@dataclass
+class PooledDriver:
+    """
+    Браузер из пула вместе с его служебным состоянием.
+
+    :param driver: Экземпляр WebDriver.
+    :param uses: Сколько тестов уже выполнено в этом браузере.
+    :param origins: Источники (origin), которые браузер успел посетить.
+    """
+
+    driver: WebDriver
+    uses: int = 0
+    origins: set = field(default_factory=set)
+
+
+class DriverPool:
+    """
+    Пул заранее запущенных браузеров.
+
+    Браузеры выдаются тестам по одному и между тестами возвращаются в исходное
+    состояние: закрываются лишние вкладки, очищаются localStorage, sessionStorage
+    и cookies. Браузер пересоздаётся после `max_uses` тестов или если его не
+    удалось сбросить. Замена для браузера, который будет выведен из пула после
+    текущего теста, запускается в фоне, пока этот тест ещё выполняется.
+    """
+
+    def __init__(
+        self, factory: Callable[[], WebDriver], size: int = 1, max_uses: int = 20
+    ):
+        """
+        Инициализирует пул.
+
+        :param factory: Функция, создающая новый экземпляр WebDriver.
+        :param size: Количество браузеров, запускаемых заранее.
+        :param max_uses: Количество тестов, после которого браузер пересоздаётся.
+        """
+        self._factory = factory
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.size + 1, thread_name_prefix="driver-pool"
+        )
+        self._lock = threading.Lock()
+        self._idle: list[PooledDriver] = []
+        self._pending: list[Future] = []
+        self._in_use: dict[int, PooledDriver] = {}
+
+    def start(self):
+        """
+        Запускает `size` браузеров в фоне, не дожидаясь их готовности.
+        """
+        with self._lock:
+            for _ in range(self.size):
+                self._launch_in_background()
+
+    def acquire(self) -> WebDriver:
+        """
+        Выдаёт браузер из пула. Если свободных браузеров нет, дожидается
+        запускаемого в фоне или запускает новый.
+
+        :return: Экземпляр WebDriver.
+        """
+        with self._lock:
+            entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                if not self._pending:
+                    self._launch_in_background()
+                future = self._pending.pop(0)
+        if entry is None:
+            entry = PooledDriver(future.result())
+        entry.uses += 1
+        with self._lock:
+            self._in_use[id(entry.driver)] = entry
+            if entry.uses >= self.max_uses:
+                # Браузер уйдёт на пересоздание после этого теста:
+                # готовим замену, пока тест выполняется.
+                self._launch_in_background()
+        return entry.driver
+
+    def release(self, driver: WebDriver):
+        """
+        Возвращает браузер в пул, предварительно сбросив его состояние.
+        Браузер пересоздаётся, если лимит использований исчерпан или сброс не удался.
+
+        :param driver: Экземпляр WebDriver, полученный через `acquire`.
+        """
+        with self._lock:
+            entry = self._in_use.pop(id(driver))
+        if entry.uses >= self.max_uses:
+            logger.info(f"Браузер выполнил {entry.uses} тестов, пересоздаём его")
+            self._retire(entry)
+            return
+        try:
+            self._reset(entry)
+        except WebDriverException as e:
+            logger.warning(
+                f"Не удалось сбросить состояние браузера, пересоздаём его: {e}"
+            )
+            self._retire(entry)
+            with self._lock:
+                self._launch_in_background()
+            return
+        with self._lock:
+            self._idle.append(entry)
+
+    def close(self):
+        """
+        Закрывает все браузеры пула, включая запускаемые в фоне.
+        """
+        with self._lock:
+            entries = self._idle + list(self._in_use.values())
+            pending = self._pending
+            self._idle, self._in_use, self._pending = [], {}, []
+        for future in pending:
+            try:
+                entries.append(PooledDriver(future.result()))
+            except Exception as e:
+                logger.warning(f"Браузер не был запущен: {e}")
+        for entry in entries:
+            self._quit(entry.driver)
+        self._executor.shutdown(wait=True)
+
+    def _launch_in_background(self):
+        """
+        Ставит запуск нового браузера в фоновый поток. Вызывается под блокировкой.
+        """
+        self._pending.append(self._executor.submit(self._launch))
+
+    def _launch(self) -> WebDriver:
+        """
+        Запускает браузер и замеряет время запуска.
+
+        :return: Экземпляр WebDriver.
+        """
+        started = time.perf_counter()
+        driver = self._factory()
+        logger.info(f"Браузер запущен за {time.perf_counter() - started:.2f} с")
+        return driver
+
+    def _retire(self, entry: PooledDriver):
+        """
+        Закрывает браузер в фоне, не задерживая завершение теста.
+
+        :param entry: Браузер из пула.
+        """
+        self._executor.submit(self._quit, entry.driver)
+
+    @staticmethod
+    def _quit(driver: WebDriver):
+        """
+        Закрывает браузер, игнорируя ошибки уже завершённой сессии.
+
+        :param driver: Экземпляр WebDriver.
+        """
+        try:
+            driver.quit()
+        except WebDriverException as e:
+            logger.warning(f"Ошибка при закрытии браузера: {e}")
+
+    @staticmethod
+    def _reset(entry: PooledDriver):
+        """
+        Возвращает браузер в исходное состояние: закрывает вкладки, открытые
+        во время теста (например, через `switch_to_last_tab`), очищает
+        localStorage, sessionStorage и cookies всех посещённых источников.
+
+        :param entry: Браузер из пула.
+        """
+        driver = entry.driver
+        handles = driver.window_handles
+        for handle in reversed(handles):
+            driver.switch_to.window(handle)
+            parts = urlsplit(driver.current_url)
+            if parts.scheme in ("http", "https"):
+                entry.origins.add(f"{parts.scheme}://{parts.netloc}")
+                driver.execute_script(
+                    "window.localStorage.clear(); window.sessionStorage.clear();"
+                )
+            if handle != handles[0]:
+                driver.close()
+        driver.switch_to.window(handles[0])
+        driver.delete_all_cookies()
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        for origin in entry.origins:
+            driver.execute_cdp_cmd(
+                "Storage.clearDataForOrigin",
+                {
+                    "origin": origin,
+                    "storageTypes": "local_storage,session_storage,indexeddb,cache_storage,service_workers",
+                },
+            )
+        driver.get("about:blank")
@@ -0,0 +1,151 @@
+import json
+import os
+import statistics
+from collections import defaultdict
+
+import pytest
+
+# Вес нового замера при обновлении истории: история сглаживается,
+# чтобы один медленный прогон не перестраивал порядок тестов.
+SMOOTHING = 0.5
+
+# Длительность теста без истории, если в истории нет ни одного теста.
+DEFAULT_DURATION = 1.0
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """
+    Разбирает значение опции `--shard` вида "i/n" (i от 1 до n).
+
+    :return: Номер шарда (с единицы) и количество шардов.
+    """
+    try:
+        index, total = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise pytest.UsageError(f"--shard ожидает значение вида i/n, получено: {value}")
+    if not 1 <= index <= total:
+        raise pytest.UsageError(f"--shard: номер шарда должен быть от 1 до {total}")
+    return index, total
+
+
+def split_by_duration(durations: dict[str, float], total: int) -> list[list[str]]:
+    """
+    Делит тесты на шарды с близким суммарным временем: самый долгий
+    из оставшихся тестов попадает в шард с наименьшей суммой (жадный LPT).
+    Результат детерминирован для одинаковых входных данных.
+
+    :param durations: Ожидаемая длительность каждого теста {nodeid: секунды}.
+    :param total: Количество шардов.
+    :return: Идентификаторы тестов каждого шарда.
+    """
+    shards = [[] for _ in range(total)]
+    loads = [0.0] * total
+    for nodeid in sorted(durations, key=lambda n: (-durations[n], n)):
+        target = min(range(total), key=lambda i: (loads[i], i))
+        shards[target].append(nodeid)
+        loads[target] += durations[nodeid]
+    return shards
+
+
+class DurationScheduler:
+    """
+    Плагин pytest, распределяющий тесты по истории их длительности.
+
+    Длительности тестов (setup + call + teardown) сохраняются в файл истории только
+    по запросу (`update`): файл хранится в репозитории, чтобы все машины CI делили
+    тесты по одной и той же истории. При сборке тесты сортируются от самых долгих к самым коротким, чтобы
+    воркеры pytest-xdist начинали с долгих тестов и заканчивали одновременно.
+    С опцией `--shard i/n` остаются только тесты i-го шарда из n, где шарды
+    подобраны по суммарному времени по истории, а не по количеству тестов.
+    """
+
+    def __init__(
+        self,
+        history_path: str,
+        shard: tuple[int, int] | None = None,
+        update: bool = False,
+    ):
+        """
+        :param history_path: Путь к JSON-файлу истории длительностей.
+        :param shard: Номер шарда (с единицы) и количество шардов.
+        :param update: Записать длительности прогона в историю. Шард не обновляет
+            историю: он знает длительности только своих тестов, и история машин
+            разошлась бы, а с ней и разбиение на шарды.
+        """
+        if shard is not None and update:
+            raise pytest.UsageError("--update-durations нельзя использовать с --shard")
+        self.history_path = history_path
+        self.shard = shard
+        self.update = update
+        self.history = self._load()
+        self._durations: dict[str, float] = defaultdict(float)
+        self._skipped: set[str] = set()
+        self._expected = None
+
+    def _load(self) -> dict[str, float]:
+        if not os.path.exists(self.history_path):
+            return {}
+        with open(self.history_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def expected_durations(self, nodeids: list[str]) -> dict[str, float]:
+        """
+        Ожидаемые длительности тестов. Тестам без истории назначается
+        медиана известных длительностей.
+        """
+        known = [self.history[n] for n in nodeids if n in self.history]
+        fallback = statistics.median(known) if known else DEFAULT_DURATION
+        return {nodeid: self.history.get(nodeid, fallback) for nodeid in nodeids}
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, config, items):
+        durations = self.expected_durations([item.nodeid for item in items])
+        items.sort(key=lambda item: -durations[item.nodeid])
+        if self.shard is None:
+            return
+        index, total = self.shard
+        selected = set(split_by_duration(durations, total)[index - 1])
+        deselected = [item for item in items if item.nodeid not in selected]
+        items[:] = [item for item in items if item.nodeid in selected]
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+        self._expected = sum(durations[item.nodeid] for item in items)
+
+    def pytest_runtest_logreport(self, report):
+        # Пропущенный тест не попадает в историю: его отчёт teardown не пропущен,
+        # но длительность около нуля занизила бы историю настоящего прогона.
+        if report.skipped:
+            self._skipped.add(report.nodeid)
+        else:
+            self._durations[report.nodeid] += report.duration
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.shard is not None and self._expected is not None:
+            index, total = self.shard
+            terminalreporter.write_line(
+                f"Шард {index}/{total}: ожидалось {self._expected:.1f} с по истории"
+            )
+
+    def pytest_sessionfinish(self, session):
+        # Историю записывает только главный процесс: ему приходят отчёты всех воркеров.
+        if not self.update or hasattr(session.config, "workerinput"):
+            return
+        if not set(self._durations) - self._skipped:
+            return
+        history = dict(self._load())
+        for nodeid, duration in self._durations.items():
+            if nodeid in self._skipped:
+                continue
+            previous = history.get(nodeid)
+            history[nodeid] = round(
+                (
+                    duration
+                    if previous is None
+                    else previous + SMOOTHING * (duration - previous)
+                ),
+                3,
+            )
+        temporary = f"{self.history_path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(history, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(temporary, self.history_path)
@@ -0,0 +1,110 @@
+import weakref
+from collections import OrderedDict
+
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+from tests.utils.readiness import NavigationTracker, tracker_for
+
+
+class ElementCache:
+    """
+    Кеш найденных элементов в пределах документа.
+
+    Ключ — номер документа из NavigationTracker и локатор. Номера документов
+    не повторяются между вкладками, поэтому после перехода по URL или
+    переключения вкладки (tracker.navigated()) кеш не выдаёт элементы, пока
+    скрипт ожидания не подтвердит новый документ. Если документ сменился
+    без ведома трекера (например, после клика по ссылке), элемент из кеша
+    окажется устаревшим, и объект страницы найдёт его заново
+    (StaleElementReferenceException).
+    """
+
+    def __init__(self, tracker: NavigationTracker, documents: int = 8):
+        """
+        :param tracker: Учёт документов драйвера.
+        :param documents: Для скольких последних документов хранить элементы
+            (при возврате на вкладку её документ сохраняет свой номер).
+        """
+        self.tracker = tracker
+        self.documents = documents
+        self._elements: "OrderedDict[int, dict[tuple, WebElement]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def get(self, locator: tuple) -> WebElement | None:
+        """
+        Возвращает элемент текущего документа из кеша.
+
+        :param locator: Кортеж, содержащий способ поиска элемента и значение для поиска.
+        :return: Элемент или None, если его нет в кеше или документ не подтверждён.
+        """
+        document = self.tracker.document
+        elements = self._elements.get(document) if document is not None else None
+        element = elements.get(locator) if elements else None
+        if element is None:
+            self.misses += 1
+            return None
+        self._elements.move_to_end(document)
+        self.hits += 1
+        return element
+
+    def put(self, locator: tuple, element: WebElement):
+        """
+        Запоминает элемент, найденный в текущем документе.
+        """
+        document = self.tracker.document
+        if document is None or not isinstance(element, WebElement):
+            return
+        self._elements.setdefault(document, {})[locator] = element
+        self._elements.move_to_end(document)
+        while len(self._elements) > self.documents:
+            self._elements.popitem(last=False)
+
+    def invalidate(self, locator: tuple, stale: bool = False):
+        """
+        Удаляет элемент текущего документа из кеша.
+
+        :param locator: Кортеж, содержащий способ поиска элемента и значение для поиска.
+        :param stale: Элемент удалён, потому что устарел (учитывается в статистике).
+        """
+        elements = self._elements.get(self.tracker.document)
+        if elements:
+            elements.pop(locator, None)
+        if stale:
+            self.stale += 1
+
+    def reset(self):
+        """
+        Очищает кеш и статистику (браузер передаётся следующему тесту).
+        """
+        self._elements.clear()
+        self.hits = self.misses = self.stale = 0
+
+    def stats(self) -> dict:
+        """
+        Статистика обращений: попадания, промахи и устаревшие элементы.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+
+_caches: "weakref.WeakKeyDictionary[WebDriver, ElementCache]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def cache_for(driver: WebDriver) -> ElementCache:
+    """
+    Возвращает кеш элементов драйвера, общий для всех объектов страниц.
+    """
+    cache = _caches.get(driver)
+    if cache is None:
+        cache = _caches[driver] = ElementCache(tracker_for(driver))
+    return cache
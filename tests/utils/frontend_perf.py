@@ -0,0 +1,291 @@
+import csv
+import fnmatch
+import io
+import json
+import os
+import statistics
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import allure
+import pytest
+from loguru import logger
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from tests.utils.run_context import current
+
+# Метрики страницы из браузера. Скрипт дожидается события load (не дольше capMs),
+# затем читает Navigation Timing, а LCP и CLS — через PerformanceObserver
+# с buffered: true, который отдаёт и записи, появившиеся до его создания.
+_COLLECT_SCRIPT = """
+const [capMs] = arguments;
+const callback = arguments[arguments.length - 1];
+let started = false;
+
+function collect() {
+    if (started) {
+        return;
+    }
+    started = true;
+    const result = {url: location.href};
+    const nav = performance.getEntriesByType("navigation")[0];
+    if (nav) {
+        result.ttfb_ms = nav.responseStart;
+        result.dcl_ms = nav.domContentLoadedEventEnd;
+        result.load_ms = nav.loadEventEnd || null;
+        result.transfer_bytes = nav.transferSize;
+    }
+    let lcp = null, cls = 0, pending = 2;
+    const done = () => {
+        if (--pending === 0) {
+            result.lcp_ms = lcp;
+            result.cls = cls;
+            callback(result);
+        }
+    };
+    const observe = (type, handle) => {
+        try {
+            const observer = new PerformanceObserver(
+                list => list.getEntries().forEach(handle));
+            observer.observe({type, buffered: true});
+            setTimeout(() => {
+                observer.takeRecords().forEach(handle);
+                observer.disconnect();
+                done();
+            }, 50);
+        } catch (e) {
+            done();
+        }
+    };
+    observe("largest-contentful-paint", entry => { lcp = entry.startTime; });
+    // Сумма сдвигов без недавнего ввода пользователя
+    observe("layout-shift", entry => { if (!entry.hadRecentInput) cls += entry.value; });
+}
+
+if (document.readyState === "complete") {
+    collect();
+} else {
+    setTimeout(collect, capMs);
+    window.addEventListener("load", () => setTimeout(collect, 0), {once: true});
+}
+"""
+
+# Метрики DevTools Performance.getMetrics, которые сохраняются в ряд.
+CDP_METRICS = (
+    "Nodes",
+    "JSEventListeners",
+    "LayoutCount",
+    "RecalcStyleCount",
+    "LayoutDuration",
+    "RecalcStyleDuration",
+    "ScriptDuration",
+    "TaskDuration",
+    "JSHeapUsedSize",
+)
+
+# Метрики, по которым строятся тренды в отчёте.
+TREND_METRICS = ("ttfb_ms", "dcl_ms", "load_ms", "lcp_ms", "cls", "JSHeapUsedSize")
+
+# Сборщик метрик сессии pytest (регистрируется в conftest.py).
+# None, если сбор выключен: в этом случае ожидания ничего не собирают.
+collector = None
+
+
+def url_key(url: str) -> str:
+    """
+    URL страницы без параметров запроса и фрагмента — ключ ряда метрик.
+    """
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}{parts.path}"
+
+
+def load_history(path: str) -> list[dict]:
+    """
+    Загружает ряд метрик из JSONL-файла (одна запись на посещённую страницу).
+    """
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class FrontendPerfCollector:
+    """
+    Плагин pytest, собирающий метрики каждой страницы, которую открывают сценарии.
+
+    Метрики снимаются, когда скрипт ожидания впервые подтверждает новый документ:
+    после BasePage.get, switch_to_last_tab и кликов, которые привели к переходу.
+    Для каждой страницы сохраняются Navigation Timing, LCP, CLS и метрики DevTools
+    Performance.getMetrics. Записи дописываются в JSONL-файл в конце сессии,
+    так что файл хранит ряд по всем прогонам. Бюджеты задаются для шаблонов URL
+    (fnmatch): абсолютные пределы метрик и допустимый рост относительно медианы
+    прошлых прогонов ("regression"). Превышение бюджета проваливает тест,
+    в котором была открыта страница. К отчёту Allure прикрепляются метрики
+    страниц теста и тренд по прошлым прогонам.
+    """
+
+    def __init__(
+        self,
+        output: str,
+        budgets: dict | None = None,
+        run_id: str | None = None,
+        cap: float = 3,
+        trend_runs: int = 10,
+    ):
+        """
+        :param output: Путь к JSONL-файлу ряда метрик.
+        :param budgets: Бюджеты {шаблон URL: {метрика: предел, "regression": k}}.
+        :param run_id: Идентификатор прогона (общий для воркеров pytest-xdist).
+        :param cap: Сколько секунд ждать события load перед снятием метрик.
+        :param trend_runs: Сколько прошлых прогонов показывать в тренде.
+        """
+        self.output = output
+        self.budgets = budgets or {}
+        self.run_id = run_id or time.strftime("%Y%m%dT%H%M%S")
+        self.cap = cap
+        self.trend_runs = trend_runs
+        self.history = load_history(output)
+        self._records: list[dict] = []
+        self._by_test: dict[str, list[dict]] = defaultdict(list)
+
+    def collect(self, driver: WebDriver) -> dict | None:
+        """
+        Снимает метрики текущего документа.
+
+        :param driver: Экземпляр WebDriver.
+        :return: Запись ряда или None, если документ сменился во время замера.
+        """
+        try:
+            page = driver.execute_async_script(_COLLECT_SCRIPT, int(self.cap * 1000))
+            driver.execute_cdp_cmd("Performance.enable", {})
+            metrics = driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+        except WebDriverException as e:
+            logger.debug(f"Метрики страницы не сняты: {e.msg}")
+            return None
+        if not page or not page["url"].startswith("http"):
+            return None
+        cdp = {m["name"]: m["value"] for m in metrics if m["name"] in CDP_METRICS}
+        record = {
+            "run": self.run_id,
+            "time": round(time.time(), 3),
+            "test": current.test_id,
+            "url": url_key(page.pop("url")),
+            **{
+                name: round(value, 4) if isinstance(value, float) else value
+                for name, value in {**page, **cdp}.items()
+            },
+        }
+        self._records.append(record)
+        if current.test_id is not None:
+            self._by_test[current.test_id].append(record)
+        logger.debug(
+            f"Метрики {record['url']}: LCP {record.get('lcp_ms')} мс, "
+            f"CLS {record.get('cls')}, load {record.get('load_ms')} мс"
+        )
+        return record
+
+    def violations(self, record: dict) -> list[str]:
+        """
+        Проверяет запись по бюджетам всех подходящих шаблонов URL.
+
+        :return: Описания превышений.
+        """
+        problems = []
+        for pattern, budget in self.budgets.items():
+            if not fnmatch.fnmatch(record["url"], pattern):
+                continue
+            factor = budget.get("regression")
+            for metric, limit in budget.items():
+                value = record.get(metric)
+                if metric == "regression" or value is None:
+                    continue
+                if value > limit:
+                    problems.append(f"{record['url']}: {metric} {value} > {limit}")
+            if factor:
+                for metric in TREND_METRICS:
+                    baseline = self._baseline(record["url"], metric)
+                    value = record.get(metric)
+                    if baseline and value is not None and value > baseline * factor:
+                        problems.append(
+                            f"{record['url']}: {metric} {value} больше медианы "
+                            f"прошлых прогонов {baseline} в {value / baseline:.2f} раза"
+                        )
+        return problems
+
+    def _baseline(self, url: str, metric: str) -> float | None:
+        values = [
+            r[metric]
+            for r in self.history
+            if r["url"] == url and r.get(metric) is not None
+        ]
+        return statistics.median(values) if values else None
+
+    def trend(self, url: str) -> str:
+        """
+        Тренд метрик страницы в CSV: медианы прошлых прогонов и текущий прогон.
+        """
+        runs = defaultdict(lambda: defaultdict(list))
+        for record in self.history + self._records:
+            if record["url"] == url:
+                for metric in TREND_METRICS:
+                    if record.get(metric) is not None:
+                        runs[record["run"]][metric].append(record[metric])
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(("run", *TREND_METRICS))
+        for run in sorted(runs)[-(self.trend_runs + 1) :]:
+            values = runs[run]
+            writer.writerow(
+                (
+                    run,
+                    *(
+                        round(statistics.median(values[m]), 4) if values[m] else ""
+                        for m in TREND_METRICS
+                    ),
+                )
+            )
+        return output.getvalue()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        if call.when != "teardown":
+            return
+        records = self._by_test.pop(item.nodeid, [])
+        if not records:
+            return
+        allure.attach(
+            json.dumps(records, ensure_ascii=False, indent=2),
+            name="frontend-perf",
+            attachment_type=allure.attachment_type.JSON,
+        )
+        for url in dict.fromkeys(record["url"] for record in records):
+            allure.attach(
+                self.trend(url),
+                name=f"frontend-perf-trend {url}",
+                attachment_type=allure.attachment_type.CSV,
+            )
+        problems = [p for record in records for p in self.violations(record)]
+        if problems:
+            report = outcome.get_result()
+            if report.passed:
+                # Превышение бюджета проваливает тест на этапе teardown
+                report.outcome = "failed"
+                report.longrepr = "Превышены бюджеты страниц:\n" + "\n".join(problems)
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_configure_node(self, node):
+        # Воркеры pytest-xdist пишут записи с идентификатором прогона главного процесса
+        node.workerinput["frontend_perf_run"] = self.run_id
+
+    def pytest_sessionfinish(self, session):
+        if not self._records:
+            return
+        lines = "".join(
+            json.dumps(record, ensure_ascii=False) + "\n" for record in self._records
+        )
+        # Одна запись в режиме добавления: воркеры дописывают файл независимо
+        with open(self.output, "a", encoding="utf-8") as f:
+            f.write(lines)
@@ -0,0 +1,193 @@
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+from urllib.parse import urljoin, urlsplit
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from selenium.webdriver.common.by import By
+
+from tests.utils.snapshot import DomSnapshot
+
+_USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36"
+)
+
+
+@dataclass
+class HttpPage:
+    """
+    Страница, загруженная без браузера.
+
+    :param url: Итоговый URL после перенаправлений.
+    :param status: Код ответа.
+    :param snapshot: Разобранный HTML страницы.
+    """
+
+    url: str
+    status: int
+    snapshot: DomSnapshot
+
+    @property
+    def title(self) -> str:
+        """
+        Заголовок страницы (<title>).
+        """
+        if not self.snapshot.exists((By.TAG_NAME, "title")):
+            return ""
+        return self.snapshot.text((By.TAG_NAME, "title"))
+
+
+@dataclass
+class CheckResult:
+    """
+    Результат HTTP-проверки.
+
+    :param name: Название проверки.
+    :param passed: Прошла ли проверка.
+    :param duration: Время выполнения в секундах.
+    :param value: Значение, которое вернула проверка.
+    :param error: Текст ошибки, если проверка не прошла.
+    """
+
+    name: str
+    passed: bool
+    duration: float
+    value: object = None
+    error: str | None = None
+
+
+class HttpClient:
+    """
+    Клиент для проверок, которым не нужен JavaScript: URL, заголовок страницы,
+    доступность и размер файлов.
+
+    Соединения переиспользуются (keep-alive) из общего пула, поэтому клиент можно
+    вызывать из нескольких потоков. Если передан локальный сервер ArchiveServer,
+    запросы идут через него так же, как запросы браузера: в режиме "record"
+    через прокси, в режиме "replay" напрямую на локальный сервер.
+    """
+
+    def __init__(self, server=None, pool_size: int = 8, timeout: float = 30):
+        """
+        :param server: Локальный сервер ArchiveServer или None для живых сайтов.
+        :param pool_size: Размер пула соединений на хост.
+        :param timeout: Таймаут запроса в секундах.
+        """
+        self.server = server
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["User-Agent"] = _USER_AGENT
+        if server is not None:
+            # Локальный сервер подписан самоподписанным сертификатом
+            self.session.verify = False
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+            if server.mode == "record":
+                proxy = f"http://127.0.0.1:{server.port}"
+                self.session.proxies = {"http": proxy, "https": proxy}
+
+    def close(self):
+        self.session.close()
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Выполняет запрос, следуя перенаправлениям (не больше 10).
+
+        :param method: HTTP-метод.
+        :param url: URL запроса.
+        :return: Последний ответ; его атрибут url — итоговый URL.
+        """
+        for _ in range(10):
+            response = self._send(method, url, **kwargs)
+            location = response.headers.get("Location")
+            if not (response.is_redirect and location):
+                response.url = url
+                return response
+            response.close()
+            url = urljoin(url, location)
+            if response.status_code in (301, 302, 303) and method != "HEAD":
+                method = "GET"
+        raise requests.TooManyRedirects(f"Слишком много перенаправлений: {url}")
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        headers = kwargs.pop("headers", {})
+        if self.server is not None and self.server.mode == "replay":
+            # Локальный сервер определяет сайт по заголовку Host
+            parts = urlsplit(url)
+            headers = {**headers, "Host": parts.netloc}
+            url = parts._replace(netloc=f"127.0.0.1:{self.server.port}").geturl()
+            url = re.sub(r"^http://", "https://", url)
+        return self.session.request(
+            method,
+            url,
+            headers=headers,
+            allow_redirects=False,
+            timeout=self.timeout,
+            **kwargs,
+        )
+
+    def page(self, url: str) -> HttpPage:
+        """
+        Загружает страницу и разбирает её HTML.
+
+        :param url: URL страницы.
+        :return: Страница с итоговым URL, кодом ответа и снимком DOM.
+        """
+        response = self.request("GET", url)
+        snapshot = DomSnapshot(response.text, response.url)
+        return HttpPage(response.url, response.status_code, snapshot)
+
+    def file_size(self, url: str) -> int:
+        """
+        Возвращает размер файла без его загрузки: по Content-Length ответа на HEAD,
+        а если сервер его не отдаёт — по Content-Range ответа на запрос первого байта.
+
+        :param url: URL файла.
+        :return: Размер файла в байтах.
+        """
+        response = self.request("HEAD", url)
+        length = response.headers.get("Content-Length")
+        if response.ok and length and int(length) > 0:
+            return int(length)
+        response = self.request("GET", url, headers={"Range": "bytes=0-0"}, stream=True)
+        response.close()
+        content_range = response.headers.get("Content-Range", "")
+        if response.status_code == 206 and "/" in content_range:
+            return int(content_range.rsplit("/", 1)[1])
+        raise ValueError(
+            f"Сервер не сообщил размер файла {url}: {response.status_code}"
+        )
+
+
+def run_checks(
+    checks: dict[str, Callable[[], object]], workers: int = 8
+) -> list[CheckResult]:
+    """
+    Выполняет проверки одновременно в пуле потоков.
+    Ошибка одной проверки не влияет на остальные.
+
+    :param checks: Словарь {название: функция проверки}. Функция возвращает значение
+        для отчёта или выбрасывает исключение (например, AssertionError).
+    :param workers: Количество потоков.
+    :return: Результаты в порядке `checks`.
+    """
+
+    def run(name: str, check: Callable[[], object]) -> CheckResult:
+        started = time.perf_counter()
+        try:
+            value = check()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            return CheckResult(name, False, time.perf_counter() - started, error=error)
+        return CheckResult(name, True, time.perf_counter() - started, value)
+
+    with ThreadPoolExecutor(workers, thread_name_prefix="http-checks") as executor:
+        futures = [executor.submit(run, name, check) for name, check in checks.items()]
+        return [future.result() for future in futures]
@@ -0,0 +1,345 @@
+"""
+Сравнение изображений с эталонами.
+
+Модуль не зависит от WebDriver: сравнения выполняются в процессах пула
+(см. tests/utils/visual.py), поэтому здесь только NumPy и Pillow.
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image
+
+# Размер уменьшенного изображения для pHash и размер блока низких частот DCT.
+_HASH_SIZE = 32
+_HASH_BLOCK = 8
+
+
+def _dct_matrix(size: int) -> np.ndarray:
+    """
+    Матрица DCT-II: DCT изображения X считается как D @ X @ D.T.
+    """
+    k = np.arange(size)[:, None]
+    i = np.arange(size)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * size)) * np.sqrt(2 / size)
+    matrix[0] /= np.sqrt(2)
+    return matrix.astype(np.float32)
+
+
+_DCT = _dct_matrix(_HASH_SIZE)
+
+
+def digest(pixels: np.ndarray) -> str:
+    """
+    Адрес изображения в хранилище: SHA-256 размеров и пикселей
+    (не PNG-файла, чтобы адрес не зависел от сжатия).
+
+    :param pixels: Изображение HxWx3 uint8.
+    :return: SHA-256 в hex.
+    """
+    sha = hashlib.sha256(f"{pixels.shape}".encode())
+    sha.update(np.ascontiguousarray(pixels).data)
+    return sha.hexdigest()
+
+
+def phash(images: list[np.ndarray]) -> list[int]:
+    """
+    Перцептивные хеши (64 бита) изображений: знаки низких частот DCT
+    уменьшенного изображения в оттенках серого относительно медианы.
+    DCT считается одним матричным умножением для всех изображений.
+
+    :param images: Изображения HxWx3 uint8.
+    :return: Хеши в порядке `images`.
+    """
+    if not images:
+        return []
+    gray = np.stack(
+        [
+            np.asarray(
+                Image.fromarray(image)
+                .convert("L")
+                .resize((_HASH_SIZE, _HASH_SIZE), Image.Resampling.BILINEAR),
+                dtype=np.float32,
+            )
+            for image in images
+        ]
+    )
+    coefficients = _DCT @ gray @ _DCT.T
+    low = coefficients[:, :_HASH_BLOCK, :_HASH_BLOCK].reshape(len(images), -1)
+    # Постоянная составляющая (яркость) в медиану не входит
+    median = np.median(low[:, 1:], axis=1, keepdims=True)
+    packed = np.packbits(low > median, axis=1)
+    return [int.from_bytes(row.tobytes(), "big") for row in packed]
+
+
+def hamming(first: int, second: int) -> int:
+    """
+    Количество отличающихся бит двух хешей.
+    """
+    return (first ^ second).bit_count()
+
+
+def pixel_diff(
+    actual: np.ndarray,
+    expected: np.ndarray,
+    tolerance: int,
+    mask: np.ndarray | None = None,
+) -> tuple[float, np.ndarray]:
+    """
+    Попиксельное сравнение изображений одинакового размера.
+
+    :param actual: Текущее изображение HxWx3 uint8.
+    :param expected: Эталон HxWx3 uint8.
+    :param tolerance: Допустимое отличие канала (0–255), например из-за сглаживания.
+    :param mask: Маска HxW: True — пиксель не сравнивается.
+    :return: Доля отличающихся пикселей среди сравниваемых и маска отличий HxW.
+    """
+    delta = np.abs(actual.astype(np.int16) - expected.astype(np.int16)).max(axis=2)
+    changed = delta > tolerance
+    considered = changed.size
+    if mask is not None:
+        changed &= ~mask
+        considered -= int(mask.sum())
+    if considered <= 0:
+        return 0.0, changed
+    return float(changed.sum()) / considered, changed
+
+
+def diff_image(
+    actual: np.ndarray, expected: np.ndarray | None, changed: np.ndarray | None
+) -> bytes:
+    """
+    Изображение для отчёта: эталон, текущий снимок и отличия (красным
+    на приглушённом текущем снимке), расположенные рядом.
+
+    :return: PNG.
+    """
+    panels = [] if expected is None else [expected]
+    panels.append(actual)
+    highlight = (actual.astype(np.float32) * 0.3 + 178).astype(np.uint8)
+    if changed is not None:
+        highlight[changed] = (255, 0, 0)
+        panels.append(highlight)
+    height = max(panel.shape[0] for panel in panels)
+    separator = np.full((height, 4, 3), 255, dtype=np.uint8)
+    padded = []
+    for panel in panels:
+        padding = ((0, height - panel.shape[0]), (0, 0), (0, 0))
+        padded += [np.pad(panel, padding, constant_values=255), separator]
+    output = io.BytesIO()
+    Image.fromarray(np.hstack(padded[:-1])).save(output, format="PNG")
+    return output.getvalue()
+
+
+class BaselineStore:
+    """
+    Хранилище эталонов с адресацией по содержимому.
+
+    Изображения лежат в objects/<xx>/<sha256>.png, а ссылки refs/<имя>.json указывают
+    на изображение и хранят его pHash. Одинаковые изображения (например, повторы
+    в сетке или неизменившиеся эталоны после обновления) хранятся один раз.
+    Каждая ссылка — отдельный файл, поэтому воркеры pytest-xdist могут
+    записывать эталоны одновременно.
+    """
+
+    def __init__(self, directory: str):
+        """
+        :param directory: Директория хранилища.
+        """
+        self.directory = directory
+
+    def _ref_path(self, name: str) -> str:
+        safe = re.sub(r"[^\w.-]+", "_", name)
+        return os.path.join(self.directory, "refs", f"{safe}.json")
+
+    def object_path(self, sha256: str) -> str:
+        return os.path.join(self.directory, "objects", sha256[:2], f"{sha256}.png")
+
+    def ref(self, name: str) -> dict | None:
+        """
+        Ссылка на эталон: {"sha256", "phash", "width", "height"} или None.
+        """
+        path = self._ref_path(name)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def has_refs(self, name: str) -> bool:
+        """
+        Есть ли эталон `name` или эталоны его элементов "<name>/<номер>".
+        """
+        if os.path.exists(self._ref_path(name)):
+            return True
+        prefix = os.path.basename(self._ref_path(f"{name}/"))[: -len(".json")]
+        refs = os.path.join(self.directory, "refs")
+        return os.path.isdir(refs) and any(
+            file_name.startswith(prefix) for file_name in os.listdir(refs)
+        )
+
+    def load(self, sha256: str) -> np.ndarray:
+        """
+        Загружает изображение эталона.
+        """
+        with Image.open(self.object_path(sha256)) as image:
+            return np.asarray(image.convert("RGB"))
+
+    def write_object(self, sha256: str, pixels: np.ndarray):
+        """
+        Сохраняет изображение, если его ещё нет в хранилище.
+        """
+        path = self.object_path(sha256)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        Image.fromarray(pixels).save(temporary, format="PNG", optimize=True)
+        os.replace(temporary, path)
+
+    def save_ref(self, name: str, sha256: str, hash_value: int, shape: tuple):
+        """
+        Указывает эталону `name` на изображение `sha256`.
+        """
+        path = self._ref_path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "sha256": sha256,
+                    "phash": f"{hash_value:016x}",
+                    "width": shape[1],
+                    "height": shape[0],
+                },
+                f,
+                indent=1,
+            )
+        os.replace(temporary, path)
+
+
+@dataclass
+class ComparisonJob:
+    """
+    Задание на сравнение одного изображения с эталоном.
+
+    :param name: Имя эталона.
+    :param pixels: Текущее изображение HxWx3 uint8.
+    :param mask: Маска игнорируемых пикселей HxW или None.
+    :param ref: Ссылка на эталон из хранилища или None.
+    :param store_directory: Директория хранилища эталонов.
+    :param tolerance: Допустимое отличие канала пикселя.
+    :param max_diff: Допустимая доля отличающихся пикселей.
+    :param max_distance: Расстояние pHash, после которого изображения
+        считаются разными без попиксельного сравнения.
+    :param update: Записать текущее изображение как эталон.
+    """
+
+    name: str
+    pixels: np.ndarray
+    mask: np.ndarray | None
+    ref: dict | None
+    store_directory: str
+    tolerance: int
+    max_diff: float
+    max_distance: int
+    update: bool = False
+
+
+@dataclass
+class Comparison:
+    """
+    Результат сравнения изображения с эталоном.
+
+    :param name: Имя эталона.
+    :param status: "match", "mismatch", "missing" (эталона нет), "new" (эталона
+        не было, сохранён с VISUAL_UPDATE) или "updated".
+    :param sha256: Адрес текущего изображения в хранилище.
+    :param phash: pHash текущего изображения.
+    :param shape: Размер текущего изображения (высота, ширина).
+    :param distance: Расстояние pHash до эталона.
+    :param diff_ratio: Доля отличающихся пикселей.
+    :param reason: Причина несовпадения.
+    :param diff_png: Изображение отличий для отчёта (только при несовпадении).
+    """
+
+    name: str
+    status: str
+    sha256: str
+    phash: int
+    shape: tuple
+    distance: int | None = None
+    diff_ratio: float | None = None
+    reason: str | None = None
+    diff_png: bytes | None = None
+
+    @property
+    def passed(self) -> bool:
+        return self.status not in ("mismatch", "missing")
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "status": self.status,
+            "distance": self.distance,
+            "diff_ratio": self.diff_ratio,
+            "reason": self.reason,
+        }
+
+
+def compare_job(job: ComparisonJob) -> Comparison:
+    """
+    Сравнивает изображение с эталоном (выполняется в процессе пула).
+
+    Отсутствующий эталон — ошибка проверки: эталоны сохраняются только
+    в режиме обновления (`update`), иначе проверка без эталона всегда проходила бы.
+    Совпадение адресов означает идентичные пиксели. Иначе сначала сравниваются
+    размер и pHash из ссылки на эталон: если размер другой или расстояние больше
+    `max_distance`, изображение отклоняется без попиксельного сравнения,
+    а PNG эталона загружается только для изображения отличий. С маской pHash не используется — он считается
+    по всему изображению, включая игнорируемые области.
+    """
+    pixels = job.pixels
+    sha256 = digest(pixels)
+    (hash_value,) = phash([pixels])
+    result = Comparison(job.name, "match", sha256, hash_value, pixels.shape[:2])
+    if job.ref is None and not job.update:
+        result.status = "missing"
+        result.reason = "нет эталона (сохраните его, запустив тесты с VISUAL_UPDATE=1)"
+        result.diff_png = diff_image(pixels, None, None)
+        return result
+    if job.update:
+        BaselineStore(job.store_directory).write_object(sha256, pixels)
+        result.status = "new" if job.ref is None else "updated"
+        return result
+    if sha256 == job.ref["sha256"]:
+        result.distance, result.diff_ratio = 0, 0.0
+        return result
+    store = BaselineStore(job.store_directory)
+    result.distance = hamming(hash_value, int(job.ref["phash"], 16))
+    width, height = job.ref["width"], job.ref["height"]
+    if (height, width) != pixels.shape[:2]:
+        result.status = "mismatch"
+        result.reason = (
+            f"размер {pixels.shape[1]}x{pixels.shape[0]}, у эталона {width}x{height}"
+        )
+    elif job.mask is None and result.distance > job.max_distance:
+        result.status = "mismatch"
+        result.reason = f"расстояние pHash {result.distance} > {job.max_distance}"
+    if result.status == "mismatch":
+        result.diff_png = diff_image(pixels, store.load(job.ref["sha256"]), None)
+        return result
+    expected = store.load(job.ref["sha256"])
+    result.diff_ratio, changed = pixel_diff(pixels, expected, job.tolerance, job.mask)
+    if result.diff_ratio > job.max_diff:
+        result.status = "mismatch"
+        result.reason = (
+            f"отличается {result.diff_ratio:.2%} пикселей "
+            f"(допустимо {job.max_diff:.2%})"
+        )
+        result.diff_png = diff_image(pixels, expected, changed)
+    return result
@@ -0,0 +1,386 @@
+"""
+Профилировщик локаторов из реестра Locators.
+
+Открывает страницы, которые посещают сценарии (или их сохранённые снимки DOM),
+замеряет в браузере, сколько времени занимает поиск по каждому локатору,
+проверяет, что локатор находит ровно один элемент, и предлагает самый короткий
+устойчивый селектор для того же элемента.
+
+Запуск::
+
+    python -m tests.utils.locator_profiler --headless
+    python -m tests.utils.locator_profiler --save-baseline locator-baseline.json
+    python -m tests.utils.locator_profiler --check locator-baseline.json
+    python -m tests.utils.locator_profiler --snapshots snapshots/ --save-snapshots snapshots/
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from config.config import BASE_URL
+from tests.pages.base_page import BasePage
+from tests.pages.locators import Locators
+from tests.pages.regions import KAMCHATKA
+from tests.utils.browser import create_driver
+from tests.utils.snapshot import DomSnapshot
+from tests.utils.waits import LOCATE_JS
+
+# Замер поиска и подбор короткого селектора выполняются одним скриптом на страницу.
+_PROFILE_SCRIPT = (
+    LOCATE_JS
+    + """
+const [entries, iterations] = arguments;
+// Идентификаторы и классы, похожие на сгенерированные, считаем неустойчивыми.
+const GENERATED = /\\d{4,}|^ws-|[0-9a-f]{8,}/i;
+
+function measure(by, value) {
+    const samples = [];
+    for (let batch = 0; batch < 5; batch++) {
+        const started = performance.now();
+        for (let i = 0; i < iterations; i++) locate(by, value);
+        samples.push((performance.now() - started) / iterations);
+    }
+    samples.sort((a, b) => a - b);
+    return samples[2];
+}
+
+function countCss(selector) {
+    try { return document.querySelectorAll(selector).length; } catch (e) { return -1; }
+}
+
+function ownSelectors(el) {
+    const tag = el.tagName.toLowerCase();
+    const selectors = [];
+    if (el.id && !GENERATED.test(el.id)) selectors.push("#" + CSS.escape(el.id));
+    for (const attr of ["data-qa", "data-name", "name", "title", "aria-label"]) {
+        const value = el.getAttribute(attr);
+        if (value && !GENERATED.test(value) && value.length < 60) {
+            selectors.push(tag + "[" + attr + '="' + value.replace(/"/g, '\\\\"') + '"]');
+        }
+    }
+    const classes = Array.from(el.classList).filter(c => !GENERATED.test(c)).slice(0, 6);
+    for (const c of classes) {
+        selectors.push("." + CSS.escape(c), tag + "." + CSS.escape(c));
+    }
+    for (let i = 0; i < classes.length; i++) {
+        for (let j = i + 1; j < classes.length; j++) {
+            selectors.push("." + CSS.escape(classes[i]) + "." + CSS.escape(classes[j]));
+        }
+    }
+    selectors.push(tag);
+    return selectors;
+}
+
+function suggest(target) {
+    const unique = selector => {
+        try {
+            const found = document.querySelectorAll(selector);
+            return found.length === 1 && found[0] === target;
+        } catch (e) {
+            return false;
+        }
+    };
+    const own = ownSelectors(target);
+    const candidates = own.filter(unique).map(value => ({by: "css selector", value}));
+    if (!candidates.length) {
+        let ancestor = target.parentElement;
+        for (let depth = 0; ancestor && depth < 6; depth++, ancestor = ancestor.parentElement) {
+            for (const anchor of ownSelectors(ancestor)) {
+                if (countCss(anchor) !== 1) continue;
+                for (const tail of own) {
+                    const selector = anchor + " " + tail;
+                    if (unique(selector)) candidates.push({by: "css selector", value: selector});
+                }
+            }
+            if (candidates.length) break;
+        }
+    }
+    const text = (target.innerText || "").trim();
+    if (text && text.length < 40 && !text.includes('"')) {
+        const xpath = "//" + target.tagName.toLowerCase() + '[normalize-space()="' + text + '"]';
+        const found = locate("xpath", xpath);
+        if (found.length === 1 && found[0] === target) candidates.push({by: "xpath", value: xpath});
+    }
+    candidates.sort((a, b) => a.value.length - b.value.length);
+    return candidates[0] || null;
+}
+
+const results = [];
+for (const entry of entries) {
+    let matches;
+    try {
+        matches = locate(entry.by, entry.value);
+    } catch (e) {
+        results.push({name: entry.name, error: String(e), count: 0});
+        continue;
+    }
+    const result = {
+        name: entry.name,
+        count: matches.length,
+        time_ms: measure(entry.by, entry.value),
+        suggestion: null,
+    };
+    if (matches.length) {
+        const suggestion = suggest(matches[0]);
+        if (suggestion) {
+            suggestion.time_ms = measure(suggestion.by, suggestion.value);
+            result.suggestion = suggestion;
+        }
+    }
+    results.push(result);
+}
+return results;
+"""
+)
+
+
+# Теги <script> снимка и запрет остальных скриптов (обработчиков в атрибутах)
+# через CSP: скрипты WebDriver политика не затрагивает.
+_SCRIPT_TAG = re.compile(r"<script\b.*?</script\s*>", re.IGNORECASE | re.DOTALL)
+_NO_SCRIPTS = (
+    '<meta http-equiv="Content-Security-Policy" content="script-src \'none\'">'
+)
+
+
+def static_html(html: str) -> str:
+    """
+    HTML снимка без скриптов страницы: при воспроизведении снимка они выполнились
+    бы заново и меняли DOM во время замеров.
+    """
+    html = _SCRIPT_TAG.sub("", html)
+    html, found = re.subn(
+        r"<head\b[^>]*>",
+        lambda match: match.group(0) + _NO_SCRIPTS,
+        html,
+        count=1,
+        flags=re.IGNORECASE,
+    )
+    return html if found else _NO_SCRIPTS + html
+
+
+@dataclass
+class ProfiledPage:
+    """
+    Страница, на которой проверяются локаторы.
+
+    :param url: Функция, возвращающая URL страницы.
+    :param locators: Имена локаторов из Locators, которые есть на странице.
+    :param setup: Действия, приводящие страницу в нужное состояние (например, открыть попап).
+    """
+
+    url: Callable[[], str]
+    locators: tuple
+    setup: Callable[[BasePage], None] = None
+
+
+def _open_region_popup(page: BasePage):
+    page.find_and_click_element(Locators.SELECT_REGION)
+    page.find_and_send(Locators.INPUT_NAME_REGION, KAMCHATKA.name)
+    page.wait_for_element(Locators.region_button(KAMCHATKA.name))
+
+
+PAGES = {
+    "main": ProfiledPage(
+        lambda: BASE_URL, ("CONTACTS_BUTTON", "BUTTON_DOWNLOAD_LOCAL_VERSIONS")
+    ),
+    "contacts": ProfiledPage(
+        lambda: f"{BASE_URL}/contacts",
+        (
+            "CLIENT_BANNER",
+            "LOCATION_DEFINE",
+            "CITY_LOCATION_DEFINE",
+            "LIST_OF_PARTNERS",
+            "SELECT_REGION",
+        ),
+    ),
+    "region_popup": ProfiledPage(
+        lambda: f"{BASE_URL}/contacts",
+        ("INPUT_NAME_REGION", "region_button"),
+        _open_region_popup,
+    ),
+    "tensor": ProfiledPage(
+        lambda: "https://tensor.ru", ("MAIN_CONTENT_BLOCK", "DETAILS_BUTTON")
+    ),
+    "tensor_about": ProfiledPage(
+        lambda: "https://tensor.ru/about", ("WORK_BLOCK", "IMAGES_BLOCK")
+    ),
+    "download": ProfiledPage(
+        lambda: f"{BASE_URL}/download",
+        ("SBIS_PLAGIN", "BUTTON_WINDOWS", "DOWNLOAD_FILE"),
+    ),
+}
+
+
+def registry() -> dict:
+    """
+    Все локаторы из реестра Locators (генераторы локаторов — на примере одного значения).
+
+    :return: Словарь {имя: локатор}.
+    """
+    locators = {
+        name: value
+        for name, value in vars(Locators).items()
+        if name.isupper() and isinstance(value, tuple)
+    }
+    # Сгенерированные локаторы проверяются на примере одного региона
+    locators["region_button"] = Locators.region_button(KAMCHATKA.name)
+    return locators
+
+
+def profile_page(
+    page: BasePage,
+    profiled: ProfiledPage,
+    iterations: int = 50,
+    snapshot: Path = None,
+) -> list[dict]:
+    """
+    Открывает страницу (или её снимок) и профилирует её локаторы.
+
+    :param page: Объект страницы с драйвером.
+    :param profiled: Описание страницы.
+    :param iterations: Количество повторов поиска в одном замере.
+    :param snapshot: Путь к сохранённому снимку DOM страницы.
+    :return: Результаты по каждому локатору.
+    """
+    if snapshot is not None:
+        # Снимки, сохранённые со скриптами, воспроизводятся из статической копии
+        static = Path(tempfile.mkdtemp(prefix="locator-snapshot-")) / snapshot.name
+        static.write_text(
+            static_html(snapshot.read_text(encoding="utf-8")), encoding="utf-8"
+        )
+        page.get(static.as_uri())
+    else:
+        page.get(profiled.url())
+        page.wait_for_body_to_load()
+        if profiled.setup:
+            profiled.setup(page)
+    locators = registry()
+    entries = [
+        {"name": name, "by": locators[name][0], "value": locators[name][1]}
+        for name in profiled.locators
+    ]
+    results = page.driver.execute_script(_PROFILE_SCRIPT, entries, iterations)
+    for result in results:
+        result["url"] = page.get_current_url()
+    return results
+
+
+def check(results: list[dict], baseline: dict, max_slowdown: float) -> list[str]:
+    """
+    Сравнивает результаты с сохранённой базой.
+
+    Ошибкой считается локатор, который находит не ровно один элемент,
+    или поиск по которому стал медленнее базового больше чем в `max_slowdown` раз
+    (с учётом порога 0.05 мс, ниже которого разница считается шумом).
+
+    :return: Список описаний ошибок.
+    """
+    problems = []
+    for result in results:
+        name = result["name"]
+        if result.get("error"):
+            problems.append(f"{name}: ошибка поиска: {result['error']}")
+            continue
+        if result["count"] != 1:
+            problems.append(
+                f"{name}: найдено элементов: {result['count']} (ожидался 1)"
+            )
+        base = baseline.get(name)
+        if base and result["time_ms"] > max(base["time_ms"] * max_slowdown, 0.05):
+            problems.append(
+                f"{name}: поиск замедлился с {base['time_ms']:.4f} до "
+                f"{result['time_ms']:.4f} мс"
+            )
+    return problems
+
+
+def write_report(results: list[dict], output_dir: Path):
+    """
+    Сохраняет отчёт в JSON и Markdown.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    (output_dir / "locator-report.json").write_text(
+        json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    locators = registry()
+    lines = [
+        "| Локатор | Найдено | Время, мс | Длина | Предложение | Время, мс |",
+        "|---|---|---|---|---|---|",
+    ]
+    for result in sorted(results, key=lambda r: -r.get("time_ms", 0)):
+        suggestion = result.get("suggestion") or {}
+        lines.append(
+            f"| {result['name']} | {result['count']} | {result.get('time_ms', 0):.4f} "
+            f"| {len(locators[result['name']][1])} "
+            f"| `{suggestion.get('value', '—')}` | {suggestion.get('time_ms', 0):.4f} |"
+        )
+    (output_dir / "locator-report.md").write_text(
+        "\n".join(lines) + "\n", encoding="utf-8"
+    )
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--pages", nargs="+", choices=list(PAGES), default=list(PAGES), help="страницы"
+    )
+    parser.add_argument(
+        "--snapshots", type=Path, help="директория со снимками <страница>.html"
+    )
+    parser.add_argument(
+        "--save-snapshots", type=Path, help="сохранить снимки DOM страниц"
+    )
+    parser.add_argument("--report", type=Path, default=Path("locator-report"))
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--save-baseline", type=Path)
+    parser.add_argument("--check", type=Path, help="файл базы для проверки регрессий")
+    parser.add_argument("--max-slowdown", type=float, default=2.0)
+    parser.add_argument("--headless", action="store_true")
+    args = parser.parse_args(argv)
+
+    driver = create_driver(args.headless, tempfile.mkdtemp(prefix="locator-profiler-"))
+    page = BasePage(driver)
+    results = []
+    try:
+        for key in args.pages:
+            snapshot = args.snapshots / f"{key}.html" if args.snapshots else None
+            if snapshot is not None and not snapshot.exists():
+                print(f"Нет снимка для страницы '{key}', пропускаем", file=sys.stderr)
+                continue
+            results.extend(profile_page(page, PAGES[key], args.iterations, snapshot))
+            if args.save_snapshots and snapshot is None:
+                args.save_snapshots.mkdir(parents=True, exist_ok=True)
+                snapshot = page.snapshot()
+                DomSnapshot(static_html(snapshot.html), snapshot.url).save(
+                    os.fspath(args.save_snapshots / f"{key}.html")
+                )
+    finally:
+        driver.quit()
+
+    write_report(results, args.report)
+    profiled = {result["name"] for result in results}
+    for name in sorted(set(registry()) - profiled):
+        print(f"Локатор {name} не проверялся ни на одной странице", file=sys.stderr)
+    if args.save_baseline:
+        args.save_baseline.write_text(
+            json.dumps({r["name"]: r for r in results}, ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+    if args.check:
+        baseline = json.loads(args.check.read_text(encoding="utf-8"))
+        problems = check(results, baseline, args.max_slowdown)
+        for problem in problems:
+            print(problem, file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
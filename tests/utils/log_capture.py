@@ -0,0 +1,112 @@
+import json
+import sys
+from collections import deque
+
+import allure
+import pytest
+from loguru import logger
+
+from tests.utils.run_context import current
+
+
+def _patch(record):
+    """
+    Добавляет к записи контекст выполнения. Выполняется в потоке, который пишет в лог.
+    """
+    record["extra"].setdefault("test", current.test_id)
+    record["extra"].setdefault("worker", current.worker)
+    record["extra"].setdefault("step", current.step)
+
+
+def _json_format(record) -> str:
+    """
+    Формат записи в одну строку JSON.
+    """
+    record["extra"]["json"] = json.dumps(
+        {
+            "time": record["time"].isoformat(),
+            "level": record["level"].name,
+            "message": record["message"],
+            "test": record["extra"].get("test"),
+            "worker": record["extra"].get("worker"),
+            "step": record["extra"].get("step"),
+            "where": f"{record['name']}:{record['function']}:{record['line']}",
+        },
+        ensure_ascii=False,
+    )
+    return "{extra[json]}\n"
+
+
+class LogCapture:
+    """
+    Плагин pytest, настраивающий логирование тестов.
+
+    Все записи loguru получают тест, воркер и шаг Allure и попадают в кольцевой буфер
+    текущего теста. Буфер прикрепляется к отчёту Allure только при падении теста,
+    а при успехе просто перезаписывается следующим тестом. В stderr выводятся
+    только записи не ниже `console_level`, в файл (если задан) — все записи в JSON.
+    Вывод выполняется из фонового потока loguru (enqueue=True), поэтому тест
+    не ждёт записи в поток или файл.
+    """
+
+    def __init__(
+        self, buffer_size: int, console_level: str = "WARNING", log_file: str = ""
+    ):
+        """
+        :param buffer_size: Сколько последних записей теста хранить в памяти.
+        :param console_level: Минимальный уровень записей для stderr.
+        :param log_file: Путь к файлу JSON-лога (пустая строка — без файла).
+        """
+        self._buffer: deque = deque(maxlen=buffer_size)
+        self._buffer_test = None
+        self._failed: set[str] = set()
+        logger.remove()
+        logger.configure(patcher=_patch)
+        self._sink_ids = [
+            logger.add(
+                self._to_buffer, format=_json_format, level="DEBUG", enqueue=True
+            ),
+            logger.add(sys.stderr, level=console_level, enqueue=True),
+        ]
+        if log_file:
+            self._sink_ids.append(
+                logger.add(log_file, format=_json_format, level="DEBUG", enqueue=True)
+            )
+
+    def _to_buffer(self, message):
+        # Тесты в процессе идут последовательно: запись нового теста начинает новый буфер.
+        test = message.record["extra"].get("test")
+        if test != self._buffer_test:
+            self._buffer.clear()
+            self._buffer_test = test
+        self._buffer.append(message.rstrip("\n"))
+
+    def records(self, test_id: str) -> list[str]:
+        """
+        Записи теста из кольцевого буфера (в формате JSON Lines).
+        """
+        logger.complete()
+        if self._buffer_test != test_id:
+            return []
+        return list(self._buffer)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        report = outcome.get_result()
+        if report.failed:
+            self._failed.add(item.nodeid)
+        if call.when == "teardown" and item.nodeid in self._failed:
+            self._failed.discard(item.nodeid)
+            allure.attach(
+                "\n".join(self.records(item.nodeid)),
+                name="log",
+                attachment_type=allure.attachment_type.TEXT,
+            )
+
+    def pytest_unconfigure(self, config):
+        logger.complete()
+        for sink_id in self._sink_ids:
+            logger.remove(sink_id)
+        logger.configure(patcher=None)
+        logger.add(sys.stderr)
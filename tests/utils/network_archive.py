@@ -0,0 +1,450 @@
+import hashlib
+import json
+import os
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from glob import glob
+from http.cookiejar import DefaultCookiePolicy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from loguru import logger
+
+# Заголовки, которые нельзя воспроизводить как есть: тело хранится уже
+# распакованным, а HSTS и Alt-Svc заставили бы браузер обходить локальный сервер.
+_SKIPPED_HEADERS = {
+    "connection",
+    "keep-alive",
+    "transfer-encoding",
+    "content-encoding",
+    "content-length",
+    "strict-transport-security",
+    "alt-svc",
+    "public-key-pins",
+    "proxy-connection",
+    "proxy-authorization",
+    "upgrade",
+}
+
+
+@dataclass(frozen=True)
+class NetworkProfile:
+    """
+    Профиль сети для воспроизведения.
+
+    :param latency: Задержка перед ответом в секундах.
+    :param bandwidth: Пропускная способность в байтах в секунду (None — без ограничения).
+    """
+
+    latency: float = 0.0
+    bandwidth: int | None = None
+
+
+PROFILES = {
+    "none": NetworkProfile(),
+    "lan": NetworkProfile(0.002, 100 * 1024 * 1024),
+    "broadband": NetworkProfile(0.02, 20 * 1024 * 1024 // 8),
+    "4g": NetworkProfile(0.05, 12 * 1024 * 1024 // 8),
+    "3g": NetworkProfile(0.15, 1600 * 1024 // 8),
+}
+
+
+class NetworkArchive:
+    """
+    Архив HTTP-ответов на диске.
+
+    Тела ответов хранятся по SHA-256 в `bodies/`, метаданные — в `index-<писатель>.json`,
+    поэтому несколько процессов (воркеров xdist) могут записывать архив одновременно.
+    Запросы части файла (заголовок Range) хранятся отдельно от запросов целого файла.
+    """
+
+    def __init__(self, path: str, writer_id: str = "master"):
+        """
+        :param path: Директория архива.
+        :param writer_id: Идентификатор процесса, записывающего архив.
+        """
+        self.path = path
+        self.writer_id = writer_id
+        self._entries: dict[str, dict] = {}
+        self._by_path: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(path, "bodies"), exist_ok=True)
+
+    @staticmethod
+    def _key(method: str, url: str, range_: str | None = None) -> str:
+        key = f"{method.upper()} {url}"
+        return f"{key} [{range_}]" if range_ else key
+
+    @classmethod
+    def _path_key(cls, method: str, url: str, range_: str | None = None) -> str:
+        parts = urlsplit(url)
+        return cls._key(
+            method, urlunsplit(parts._replace(query="", fragment="")), range_
+        )
+
+    @property
+    def hosts(self) -> set:
+        """
+        Хосты, ответы которых есть в архиве.
+        """
+        return {urlsplit(entry["url"]).hostname for entry in self._entries.values()}
+
+    def load(self):
+        """
+        Загружает индексы всех писателей архива.
+        """
+        for index in sorted(glob(os.path.join(self.path, "index-*.json"))):
+            with open(index, encoding="utf-8") as f:
+                for entry in json.load(f):
+                    self._add(entry)
+        logger.info(f"Загружено {len(self._entries)} ответов из архива {self.path}")
+        return self
+
+    def _add(self, entry: dict):
+        method, url, range_ = entry["method"], entry["url"], entry.get("range")
+        self._entries[self._key(method, url, range_)] = entry
+        self._by_path.setdefault(self._path_key(method, url, range_), entry)
+
+    def lookup(self, method: str, url: str, range_: str | None = None) -> dict | None:
+        """
+        Ищет ответ по методу, URL и заголовку Range. Если точного совпадения нет,
+        берётся ответ на тот же путь с другими параметрами запроса (метки времени,
+        кеш-бастеры).
+
+        :return: Запись архива или None.
+        """
+        return self._entries.get(self._key(method, url, range_)) or self._by_path.get(
+            self._path_key(method, url, range_)
+        )
+
+    def body(self, entry: dict) -> bytes:
+        """
+        Читает тело ответа из архива.
+        """
+        if not entry.get("body"):
+            return b""
+        with open(os.path.join(self.path, "bodies", entry["body"]), "rb") as f:
+            return f.read()
+
+    def store(
+        self,
+        method: str,
+        url: str,
+        status: int,
+        headers: list,
+        body: bytes,
+        range_: str | None = None,
+        length: int | None = None,
+    ):
+        """
+        Сохраняет ответ в архив.
+
+        :param method: HTTP-метод.
+        :param url: URL запроса.
+        :param status: Код ответа.
+        :param headers: Список пар (заголовок, значение).
+        :param body: Тело ответа (без сжатия).
+        :param range_: Заголовок Range запроса.
+        :param length: Content-Length ответа, если он не равен длине тела
+            (ответ на HEAD).
+        """
+        digest = hashlib.sha256(body).hexdigest() if body else None
+        if digest:
+            path = os.path.join(self.path, "bodies", digest)
+            if not os.path.exists(path):
+                with open(path, "wb") as f:
+                    f.write(body)
+        entry = {
+            "method": method.upper(),
+            "url": url,
+            "status": status,
+            "headers": [
+                [k, v] for k, v in headers if k.lower() not in _SKIPPED_HEADERS
+            ],
+            "body": digest,
+        }
+        if range_:
+            entry["range"] = range_
+        if length is not None:
+            entry["length"] = length
+        with self._lock:
+            self._add(entry)
+
+    def save(self):
+        """
+        Записывает индекс текущего писателя.
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+        index = os.path.join(self.path, f"index-{self.writer_id}.json")
+        with open(index, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False, indent=1)
+        logger.info(f"В архив {self.path} записано {len(entries)} ответов")
+
+
+def ensure_certificate(directory: str) -> str:
+    """
+    Возвращает самоподписанный сертификат для локального сервера, создавая его через openssl.
+    Браузер запускается с `--ignore-certificate-errors`, поэтому имя в сертификате не важно.
+
+    Ключ и сертификат хранятся в одном PEM-файле, который записывается через временную
+    директорию и os.replace: процесс, читающий файл, видит либо готовую пару, либо
+    её отсутствие. Сертификат создаёт главный процесс pytest до запуска воркеров
+    (см. conftest.py), поэтому воркеры xdist его только читают.
+
+    :param directory: Директория для сертификата.
+    :return: Путь к PEM-файлу с ключом и сертификатом.
+    """
+    pem = os.path.join(directory, "replay.pem")
+    if os.path.exists(pem):
+        return pem
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=directory) as temporary:
+        key = os.path.join(temporary, "key.pem")
+        cert = os.path.join(temporary, "cert.pem")
+        subprocess.run(
+            [
+                "openssl",
+                "req",
+                "-x509",
+                "-newkey",
+                "rsa:2048",
+                "-nodes",
+                "-keyout",
+                key,
+                "-out",
+                cert,
+                "-days",
+                "365",
+                "-subj",
+                "/CN=autotests-replay",
+            ],
+            check=True,
+            capture_output=True,
+        )
+        combined = os.path.join(temporary, "replay.pem")
+        with open(combined, "wb") as f:
+            for part in (key, cert):
+                with open(part, "rb") as source:
+                    f.write(source.read())
+        os.replace(combined, pem)
+    return pem
+
+
+class _ArchiveHandler(BaseHTTPRequestHandler):
+    """
+    Обработчик запросов: в режиме записи проксирует их на настоящие сайты
+    и сохраняет ответы, в режиме воспроизведения отдаёт ответы из архива.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server: "ArchiveServer"
+
+    def setup(self):
+        if isinstance(self.request, ssl.SSLSocket):
+            self.request.do_handshake()
+        super().setup()
+        self.tunnel_host = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_CONNECT(self):
+        """
+        HTTPS через прокси: подтверждаем туннель и расшифровываем его своим сертификатом.
+        """
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        self.tunnel_host = self.path.rsplit(":", 1)[0]
+        self.connection = self.server.ssl_context.wrap_socket(
+            self.connection, server_side=True
+        )
+        self.rfile = self.connection.makefile("rb", self.rbufsize)
+        self.wfile = self.connection.makefile("wb")
+        self.close_connection = False
+
+    def _url(self) -> str:
+        if self.path.startswith(("http://", "https://")):
+            return self.path
+        host = self.tunnel_host or self.headers.get("Host", "").split(":")[0]
+        scheme = "https" if isinstance(self.connection, ssl.SSLSocket) else "http"
+        return f"{scheme}://{host}{self.path}"
+
+    def _handle(self):
+        url = self._url()
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        if self.server.mode == "record":
+            status, headers, content, length = self.server.forward(
+                self.command, url, self.headers, body
+            )
+        else:
+            status, headers, content, length = self.server.replay(
+                self.command, url, self.headers.get("Range")
+            )
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        # Ответ на HEAD без тела сообщает длину, которую отдал настоящий сайт
+        if length is None:
+            length = len(content)
+        self.send_header("Content-Length", str(length))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.server.write_throttled(self.wfile, content)
+
+    do_GET = do_POST = do_HEAD = do_PUT = do_PATCH = do_DELETE = do_OPTIONS = _handle
+
+
+class ArchiveServer(ThreadingHTTPServer):
+    """
+    Локальный сервер для записи и воспроизведения сетевого трафика сценариев.
+
+    В режиме "record" это HTTP(S)-прокси: браузер ходит через него на настоящие сайты,
+    а все ответы (включая переход на tensor.ru и загрузку плагина) сохраняются в архив.
+    В режиме "replay" это HTTPS-сервер, на который браузер направляет все хосты
+    правилом `--host-resolver-rules`, поэтому BASE_URL и https://tensor.ru/about
+    открываются локально, без сети. Задержку и скорость ответов задаёт профиль сети.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, archive: NetworkArchive, mode: str, profile: NetworkProfile):
+        """
+        :param archive: Архив ответов.
+        :param mode: "record" или "replay".
+        :param profile: Профиль сети для воспроизведения.
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Неизвестный режим сети: {mode}")
+        super().__init__(("127.0.0.1", 0), _ArchiveHandler)
+        self.archive = archive
+        self.mode = mode
+        self.profile = profile
+        self.ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.ssl_context.load_cert_chain(ensure_certificate(archive.path))
+        # Cookie передаёт сам браузер; общая банка сессии смешала бы cookie
+        # разных вкладок и тестов, и архив зависел бы от порядка тестов.
+        self._session = requests.Session()
+        self._session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        self._thread = None
+        if mode == "replay":
+            self.archive.load()
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def get_request(self):
+        sock, address = super().get_request()
+        if self.mode == "replay":
+            # Рукопожатие TLS выполняется в потоке обработчика, а не в потоке accept.
+            sock = self.ssl_context.wrap_socket(
+                sock, server_side=True, do_handshake_on_connect=False
+            )
+        return sock, address
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self.serve_forever, name="archive-server", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Сервер сети в режиме '{self.mode}' запущен на порту {self.port}")
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self.mode == "record":
+            self.archive.save()
+
+    def chrome_arguments(self) -> list[str]:
+        """
+        Аргументы Chrome, направляющие трафик браузера на этот сервер.
+        """
+        arguments = ["--ignore-certificate-errors", "--disable-quic"]
+        if self.mode == "record":
+            arguments.append(f"--proxy-server=http://127.0.0.1:{self.port}")
+        else:
+            arguments.append(
+                f"--host-resolver-rules=MAP * 127.0.0.1:{self.port}, EXCLUDE localhost"
+            )
+        return arguments
+
+    def forward(self, method: str, url: str, headers, body: bytes | None):
+        """
+        Выполняет запрос к настоящему сайту и сохраняет ответ в архив.
+
+        :return: Код ответа, заголовки, тело и Content-Length для ответа на HEAD.
+        """
+        outgoing = {
+            name: value
+            for name, value in headers.items()
+            if name.lower() not in _SKIPPED_HEADERS and name.lower() != "host"
+        }
+        # Для HEAD длина нужна несжатая: тело в архиве хранится распакованным
+        outgoing["Accept-Encoding"] = (
+            "identity" if method == "HEAD" else "gzip, deflate"
+        )
+        response = self._session.request(
+            method, url, headers=outgoing, data=body, allow_redirects=False, timeout=120
+        )
+        content = response.content
+        response_headers = [
+            (name, value)
+            for name, value in response.raw.headers.items()
+            if name.lower() not in _SKIPPED_HEADERS
+        ]
+        length = None
+        if method == "HEAD" and response.headers.get("Content-Length"):
+            length = int(response.headers["Content-Length"])
+        self.archive.store(
+            method,
+            url,
+            response.status_code,
+            response_headers,
+            content,
+            headers.get("Range"),
+            length,
+        )
+        return response.status_code, response_headers, content, length
+
+    def replay(self, method: str, url: str, range_: str | None = None):
+        """
+        Возвращает записанный ответ с задержкой из профиля сети.
+
+        :return: Код ответа, заголовки, тело и Content-Length для ответа на HEAD.
+        """
+        entry = self.archive.lookup(method, url, range_)
+        if entry is None:
+            logger.warning(f"Ответ не найден в архиве: {method} {url}")
+            return 404, [("Content-Type", "text/plain")], b"Not recorded", None
+        if self.profile.latency:
+            time.sleep(self.profile.latency)
+        return (
+            entry["status"],
+            entry["headers"],
+            self.archive.body(entry),
+            entry.get("length"),
+        )
+
+    def write_throttled(self, stream, content: bytes):
+        """
+        Отправляет тело ответа с ограничением скорости из профиля сети.
+        """
+        bandwidth = self.profile.bandwidth if self.mode == "replay" else None
+        if not bandwidth:
+            stream.write(content)
+            return
+        chunk = max(1024, bandwidth // 20)
+        for offset in range(0, len(content), chunk):
+            started = time.monotonic()
+            stream.write(content[offset : offset + chunk])
+            stream.flush()
+            delay = len(content[offset : offset + chunk]) / bandwidth
+            time.sleep(max(0.0, delay - (time.monotonic() - started)))
@@ -0,0 +1,233 @@
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+import allure
+import pytest
+from loguru import logger
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from tests.utils.run_context import current, step_listener
+
+# Таймлайн текущего теста. None, если замеры выключены: в этом случае драйвер
+# не оборачивается, а span() возвращает пустой контекстный менеджер.
+active_timeline = None
+
+
+class Timeline:
+    """
+    Таймлайн одного теста: команды WebDriver, шаги Allure и произвольные интервалы
+    (получение браузера, ожидания, загрузка файла).
+    """
+
+    def __init__(self, test_id: str):
+        self.test_id = test_id
+        self.started = time.perf_counter()
+        self.commands: list[dict] = []
+        self.spans: list[dict] = []
+        self.steps: list[dict] = []
+
+    def _offset(self, moment: float) -> float:
+        return round(moment - self.started, 6)
+
+    def add_command(self, command: str, start: float, duration: float):
+        self.commands.append(
+            {
+                "command": command,
+                "start": self._offset(start),
+                "duration": round(duration, 6),
+                "step": current.step,
+                "action": current.action,
+            }
+        )
+
+    def add_span(self, name: str, start: float, duration: float):
+        self.spans.append(
+            {
+                "name": name,
+                "start": self._offset(start),
+                "duration": round(duration, 6),
+                "step": current.step,
+            }
+        )
+
+    def add_step(self, title: str, duration: float):
+        self.steps.append({"step": title, "duration": round(duration, 6)})
+
+    def summary(self) -> dict:
+        """
+        Сводка по таймлайну: перцентили по типам команд, время ожиданий
+        и самые долгие шаги.
+        """
+        by_command = defaultdict(list)
+        for record in self.commands:
+            by_command[record["command"]].append(record["duration"])
+        commands = {
+            name: {
+                "count": len(durations),
+                "total": round(sum(durations), 6),
+                "p50": percentile(durations, 50),
+                "p95": percentile(durations, 95),
+            }
+            for name, durations in sorted(
+                by_command.items(), key=lambda item: -sum(item[1])
+            )
+        }
+        wait_time = sum(
+            s["duration"] for s in self.spans if s["name"].startswith("wait")
+        )
+        return {
+            "test": self.test_id,
+            "total": round(time.perf_counter() - self.started, 6),
+            "commands": commands,
+            "round_trips": len(self.commands),
+            "wait_time": round(wait_time, 6),
+            "slowest_steps": sorted(self.steps, key=lambda s: -s["duration"])[:5],
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "summary": self.summary(),
+            "commands": self.commands,
+            "spans": self.spans,
+            "steps": self.steps,
+        }
+
+
+def percentile(values: list, percent: int) -> float:
+    """
+    Перцентиль методом ближайшего ранга.
+    """
+    ordered = sorted(values)
+    index = max(0, -(-len(ordered) * percent // 100) - 1)
+    return ordered[index]
+
+
+def span(name: str):
+    """
+    Замеряет интервал времени и записывает его в таймлайн текущего теста.
+    Если замеры выключены, ничего не делает.
+
+    :param name: Название интервала. Интервалы с префиксом "wait" считаются ожиданиями.
+    """
+    if active_timeline is None:
+        return nullcontext()
+    return _span(active_timeline, name)
+
+
+@contextmanager
+def _span(timeline: Timeline, name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timeline.add_span(name, start, time.perf_counter() - start)
+
+
+def instrument(driver: WebDriver):
+    """
+    Оборачивает метод execute драйвера, через который проходят все команды WebDriver,
+    и записывает длительность каждой команды в таймлайн текущего теста.
+    Повторный вызов для того же драйвера ничего не делает.
+
+    :param driver: Экземпляр WebDriver.
+    """
+    if getattr(driver, "_profiling_original_execute", None):
+        return
+    original = driver.execute
+
+    def execute(driver_command, params=None):
+        timeline = active_timeline
+        if timeline is None:
+            return original(driver_command, params)
+        start = time.perf_counter()
+        try:
+            return original(driver_command, params)
+        finally:
+            timeline.add_command(driver_command, start, time.perf_counter() - start)
+
+    driver._profiling_original_execute = original
+    driver.execute = execute
+
+
+def _format_summary(summary: dict) -> str:
+    """
+    Сводка в виде HTML-таблицы для вложения Allure.
+    """
+    rows = "".join(
+        f"<tr><td>{name}</td><td>{data['count']}</td><td>{data['total']:.3f}</td>"
+        f"<td>{data['p50'] * 1000:.1f}</td><td>{data['p95'] * 1000:.1f}</td></tr>"
+        for name, data in summary["commands"].items()
+    )
+    steps = "".join(
+        f"<tr><td>{step['step']}</td><td>{step['duration']:.3f}</td></tr>"
+        for step in summary["slowest_steps"]
+    )
+    return (
+        f"<p>Всего: {summary['total']:.3f} с, команд WebDriver: {summary['round_trips']}, "
+        f"ожидания: {summary['wait_time']:.3f} с</p>"
+        "<table border='1'><tr><th>Команда</th><th>Кол-во</th><th>Всего, с</th>"
+        f"<th>p50, мс</th><th>p95, мс</th></tr>{rows}</table>"
+        "<p>Самые долгие шаги</p>"
+        f"<table border='1'><tr><th>Шаг</th><th>Время, с</th></tr>{steps}</table>"
+    )
+
+
+class WebDriverProfiler:
+    """
+    Плагин pytest, включающий замеры команд WebDriver (опция `--profile-webdriver`).
+
+    Для каждого теста сохраняет JSON-таймлайн в указанную директорию и прикрепляет
+    к отчёту Allure таймлайн и сводную таблицу.
+    """
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        step_listener.on_stop.append(self._on_step_stop)
+        self._sink_id = logger.add(self._on_log, level="INFO", format="{message}")
+
+    @staticmethod
+    def _on_step_stop(title: str, duration: float):
+        if active_timeline is not None:
+            active_timeline.add_step(title, duration)
+
+    @staticmethod
+    def _on_log(message):
+        current.action = message.record["message"]
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item):
+        global active_timeline
+        active_timeline = Timeline(item.nodeid)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        global active_timeline
+        yield
+        if call.when != "teardown" or active_timeline is None:
+            return
+        timeline, active_timeline = active_timeline, None
+        data = timeline.to_dict()
+        name = re.sub(r"[^\w.-]+", "_", item.nodeid)
+        with open(
+            os.path.join(self.output_dir, f"{name}.json"), "w", encoding="utf-8"
+        ) as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        allure.attach(
+            json.dumps(data, ensure_ascii=False, indent=2),
+            name="webdriver-timeline",
+            attachment_type=allure.attachment_type.JSON,
+        )
+        allure.attach(
+            _format_summary(data["summary"]),
+            name="webdriver-summary",
+            attachment_type=allure.attachment_type.HTML,
+        )
+
+    def pytest_unconfigure(self, config):
+        step_listener.on_stop.remove(self._on_step_stop)
+        logger.remove(self._sink_id)
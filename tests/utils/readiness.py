@@ -0,0 +1,161 @@
+import weakref
+from dataclasses import dataclass
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from config.config import READINESS
+
+READINESS_KINDS = ("none", "domcontentloaded", "load", "networkidle", "locator")
+
+# Проверка готовности документа для скрипта ожидания (см. waits._WAIT_SCRIPT).
+# Документ, готовность которого уже подтверждена, помечен номером поколения
+# в window.__autotestDocument; для него whenReady срабатывает сразу.
+# Документ, из которого начат переход (window.__autotestLeaving), готовым
+# не считается: скрипт ждёт его выгрузки и перезапускается в новом документе.
+# Переменные finished и readyTimer объявлены в скрипте ожидания.
+READY_JS = """
+function whenReady(readiness, stamp, callback) {
+    if (window.__autotestLeaving) return;
+    if (window.__autotestDocument) return callback(false);
+    const mark = () => {
+        if (finished) return;
+        clearInterval(readyTimer);
+        if (readiness.observer) readiness.observer.disconnect();
+        window.__autotestDocument = stamp;
+        callback(true);
+    };
+    const poll = test => {
+        if (test()) return mark();
+        readyTimer = setInterval(() => { if (test()) mark(); }, 50);
+    };
+    switch (readiness.kind) {
+        case "none":
+            return mark();
+        case "domcontentloaded":
+            return poll(() => document.readyState !== "loading");
+        case "load":
+            return poll(() => document.readyState === "complete");
+        case "networkidle": {
+            // Сеть считается свободной, если после load за quiet_ms
+            // не завершилось ни одного запроса ресурса.
+            let last = performance.now();
+            readiness.observer = new PerformanceObserver(() => { last = performance.now(); });
+            readiness.observer.observe({type: "resource"});
+            return poll(() => document.readyState === "complete"
+                && performance.now() - last >= readiness.quiet_ms);
+        }
+        case "locator":
+            return poll(() => document.readyState !== "loading"
+                && locate(readiness.by, readiness.value).length > 0);
+    }
+    throw new Error("Unsupported readiness: " + readiness.kind);
+}
+"""
+
+
+@dataclass(frozen=True)
+class Readiness:
+    """
+    Условие готовности нового документа.
+
+    :param kind: "none", "domcontentloaded", "load", "networkidle" или "locator".
+    :param locator: Локатор элемента для kind="locator".
+    :param quiet_ms: Сколько миллисекунд без сетевых запросов считать простоем сети.
+    """
+
+    kind: str = "domcontentloaded"
+    locator: tuple | None = None
+    quiet_ms: int = 500
+
+    def __post_init__(self):
+        if self.kind not in READINESS_KINDS:
+            raise ValueError(f"Неизвестное условие готовности: {self.kind}")
+        if (self.kind == "locator") != (self.locator is not None):
+            raise ValueError("Локатор задаётся только для условия готовности 'locator'")
+
+    @classmethod
+    def from_string(cls, value: str) -> "Readiness":
+        """
+        Создаёт условие из строки: имя условия или "locator:<CSS-селектор>".
+        """
+        if value.startswith("locator:"):
+            return cls.for_locator((By.CSS_SELECTOR, value[len("locator:") :]))
+        return cls(value)
+
+    @classmethod
+    def for_locator(cls, locator: tuple) -> "Readiness":
+        """
+        Документ готов, когда на нём появился элемент по локатору.
+        """
+        return cls("locator", tuple(locator))
+
+    def as_script_argument(self) -> dict:
+        by, value = self.locator or (None, None)
+        return {"kind": self.kind, "by": by, "value": value, "quiet_ms": self.quiet_ms}
+
+
+class NavigationTracker:
+    """
+    Учёт документов, открытых в браузере.
+
+    Каждый документ, готовность которого подтвердил скрипт ожидания, получает
+    номер поколения. Номера растут монотонно и не повторяются между вкладками,
+    поэтому номер документа однозначно определяет пару (вкладка, документ).
+    """
+
+    def __init__(self, readiness: Readiness):
+        """
+        :param readiness: Условие готовности новых документов.
+        """
+        self.default_readiness = self.readiness = readiness
+        self.generation = 0
+        # Номер текущего документа или None, если документ сменился
+        # и ещё не был проверен скриптом ожидания.
+        self.document: int | None = None
+
+    @property
+    def next_stamp(self) -> int:
+        return self.generation + 1
+
+    def observe(self, document: int | None) -> bool:
+        """
+        Запоминает номер документа, который вернул скрипт ожидания.
+
+        :return: True, если документ новый (его готовность подтверждена впервые).
+        """
+        is_new = document is not None and document > self.generation
+        if is_new:
+            self.generation = document
+        self.document = document
+        return is_new
+
+    def navigated(self):
+        """
+        Отмечает, что текущий документ сменился (переход по URL, другая вкладка).
+        """
+        self.document = None
+
+    def reset(self):
+        """
+        Возвращает условие готовности по умолчанию (браузер передаётся следующему тесту).
+        """
+        self.readiness = self.default_readiness
+        self.document = None
+
+
+_trackers: "weakref.WeakKeyDictionary[WebDriver, NavigationTracker]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def tracker_for(driver: WebDriver) -> NavigationTracker:
+    """
+    Возвращает учёт документов драйвера, общий для всех объектов страниц.
+    """
+    tracker = _trackers.get(driver)
+    if tracker is None:
+        tracker = _trackers[driver] = NavigationTracker(
+            Readiness.from_string(READINESS)
+        )
+    return tracker
@@ -0,0 +1,438 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable
+
+import allure
+import psutil
+import pytest
+from loguru import logger
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from tests.utils.run_context import current
+
+_MB = 1024 * 1024
+
+
+@dataclass
+class ResourceSample:
+    """
+    Замер процессов одного браузера (chromedriver и все процессы Chrome).
+
+    RSS суммируется по процессам, поэтому разделяемая память учитывается
+    несколько раз: это оценка сверху, которой достаточно для сравнения тестов.
+
+    :param time: Время замера (time.time()).
+    :param session: Идентификатор сессии WebDriver.
+    :param test: Тест, выполнявшийся во время замера.
+    :param step: Шаг Allure, выполнявшийся во время замера.
+    :param processes: Количество процессов.
+    :param cpu_percent: Загрузка CPU всеми процессами (100 — одно ядро).
+    :param rss_mb: Суммарная резидентная память в МБ.
+    :param open_files: Открытые файловые дескрипторы (хендлы в Windows).
+    """
+
+    time: float
+    session: str
+    test: str | None
+    step: str | None
+    processes: int
+    cpu_percent: float
+    rss_mb: float
+    open_files: int
+
+
+@dataclass
+class _Session:
+    """
+    Отслеживаемый браузер: корневой процесс chromedriver и все его потомки,
+    которые когда-либо были замечены (включая процессы, оставшиеся после quit()).
+    """
+
+    session_id: str
+    root: psutil.Process
+    processes: dict = field(default_factory=dict)
+    exited_at: float | None = None
+    test_rss: list = field(default_factory=list)
+    growing: bool = False
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def _open_files(process: psutil.Process) -> int:
+    if hasattr(process, "num_fds"):
+        return process.num_fds()
+    return process.num_handles()
+
+
+def _summary(samples: list[ResourceSample]) -> dict:
+    """
+    Сводка по замерам: пики, средняя загрузка CPU и пики по шагам Allure.
+    """
+    if not samples:
+        return {"samples": 0}
+    steps = defaultdict(lambda: {"peak_rss_mb": 0.0, "peak_cpu_percent": 0.0})
+    for sample in samples:
+        step = steps[sample.step or "—"]
+        step["peak_rss_mb"] = max(step["peak_rss_mb"], round(sample.rss_mb, 1))
+        step["peak_cpu_percent"] = max(
+            step["peak_cpu_percent"], round(sample.cpu_percent, 1)
+        )
+    started = samples[0].time
+    return {
+        "samples": len(samples),
+        "peak_rss_mb": round(max(s.rss_mb for s in samples), 1),
+        "peak_cpu_percent": round(max(s.cpu_percent for s in samples), 1),
+        "mean_cpu_percent": round(
+            sum(s.cpu_percent for s in samples) / len(samples), 1
+        ),
+        "peak_open_files": max(s.open_files for s in samples),
+        "peak_processes": max(s.processes for s in samples),
+        "steps": dict(steps),
+        # Ряд [секунды от начала, RSS МБ, CPU %] для графиков
+        "series": [
+            [round(s.time - started, 2), round(s.rss_mb, 1), round(s.cpu_percent, 1)]
+            for s in samples
+        ],
+    }
+
+
+class ResourceMonitor:
+    """
+    Плагин pytest, следящий за процессами браузеров воркера.
+
+    Фоновый поток с интервалом `interval` замеряет CPU, RSS и открытые файлы
+    дерева процессов каждого браузера (chromedriver и его потомки) и помечает
+    замеры текущим тестом и шагом Allure. После каждого теста к отчёту Allure
+    прикрепляется сводка по браузеру теста, а память браузера после сброса
+    сравнивается с предыдущими тестами: если она растёт `leak_tests` тестов подряд
+    и выросла больше чем на `leak_mb`, браузер помечается как растущий.
+    Процессы Chrome, оставшиеся после завершения chromedriver, завершаются
+    принудительно через `grace` секунд и в конце сессии.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.5,
+        leak_tests: int = 3,
+        leak_mb: float = 100.0,
+        grace: float = 5.0,
+    ):
+        """
+        :param interval: Интервал замеров в секундах.
+        :param leak_tests: Сколько тестов подряд должна расти память браузера.
+        :param leak_mb: На сколько МБ она должна вырасти за эти тесты.
+        :param grace: Сколько секунд ждать завершения процессов Chrome после
+            завершения chromedriver, прежде чем завершить их принудительно.
+        """
+        self.interval = interval
+        self.leak_tests = max(1, leak_tests)
+        self.leak_mb = leak_mb
+        self.grace = grace
+        self.killed = 0
+        self.watched = 0
+        self._sessions: dict[str, _Session] = {}
+        self._samples: dict[str, list[ResourceSample]] = defaultdict(list)
+        self._peaks = {"rss_mb": 0.0, "cpu_percent": 0.0, "processes": 0}
+        self._growing: set[str] = set()
+        self._workers: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def watching(self, factory: Callable[[], WebDriver]) -> Callable[[], WebDriver]:
+        """
+        Оборачивает фабрику браузеров: каждый созданный браузер отслеживается.
+        """
+
+        def create() -> WebDriver:
+            return self.watch(factory())
+
+        return create
+
+    def watch(self, driver: WebDriver) -> WebDriver:
+        """
+        Начинает отслеживать процессы браузера.
+
+        :param driver: Экземпляр WebDriver, запущенный локально.
+        :return: Тот же экземпляр WebDriver.
+        """
+        service = getattr(driver, "service", None)
+        process = getattr(service, "process", None)
+        if process is None:
+            logger.debug("Браузер запущен не локально, процессы не отслеживаются")
+            return driver
+        try:
+            root = psutil.Process(process.pid)
+        except psutil.NoSuchProcess:
+            return driver
+        with self._lock:
+            self.watched += 1
+            self._sessions[driver.session_id] = _Session(
+                driver.session_id, root, {root.pid: root}
+            )
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="resource-monitor", daemon=True
+                )
+                self._thread.start()
+        return driver
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"Ошибка замера процессов браузера: {e}")
+
+    def sample(self) -> list[ResourceSample]:
+        """
+        Замеряет все отслеживаемые браузеры и завершает оставшиеся процессы
+        уже закрытых браузеров.
+
+        :return: Замеры браузеров, которые ещё работают.
+        """
+        now = time.time()
+        test, step = current.test_id, current.step
+        with self._lock:
+            sessions = list(self._sessions.values())
+        samples = []
+        for session in sessions:
+            if session.root.is_running():
+                sample = self._measure(session, now, test, step)
+                if sample is not None:
+                    samples.append(sample)
+            else:
+                self._reap(session, now)
+        with self._lock:
+            for sample in samples:
+                if sample.test is not None:
+                    self._samples[sample.test].append(sample)
+                self._peaks["rss_mb"] = max(self._peaks["rss_mb"], sample.rss_mb)
+                self._peaks["cpu_percent"] = max(
+                    self._peaks["cpu_percent"], sample.cpu_percent
+                )
+                self._peaks["processes"] = max(
+                    self._peaks["processes"], sample.processes
+                )
+        return samples
+
+    @staticmethod
+    def _measure(
+        session: _Session, now: float, test: str | None, step: str | None
+    ) -> ResourceSample | None:
+        # Браузер замеряют и фоновый поток, и поток теста после его завершения
+        with session.lock:
+            return ResourceMonitor._measure_tree(session, now, test, step)
+
+    @staticmethod
+    def _measure_tree(
+        session: _Session, now: float, test: str | None, step: str | None
+    ) -> ResourceSample | None:
+        try:
+            children = session.root.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return None
+        for child in children:
+            known = session.processes.get(child.pid)
+            # Объект процесса сохраняется между замерами: cpu_percent считается
+            # относительно предыдущего вызова для того же объекта.
+            if known is None or known != child:
+                session.processes[child.pid] = child
+        cpu, rss, files, count = 0.0, 0, 0, 0
+        for pid, process in list(session.processes.items()):
+            try:
+                with process.oneshot():
+                    cpu += process.cpu_percent(None)
+                    rss += process.memory_info().rss
+                    files += _open_files(process)
+                count += 1
+            except psutil.NoSuchProcess:
+                del session.processes[pid]
+            except psutil.AccessDenied:
+                count += 1
+        return ResourceSample(
+            now, session.session_id, test, step, count, cpu, rss / _MB, files
+        )
+
+    def _reap(self, session: _Session, now: float, force: bool = False):
+        """
+        Завершает процессы закрытого браузера, которые не завершились сами.
+        """
+        if session.exited_at is None:
+            session.exited_at = now
+        alive = [
+            process
+            for process in session.processes.values()
+            if process.pid != session.root.pid and process.is_running()
+        ]
+        if alive and (force or now - session.exited_at >= self.grace):
+            for process in alive:
+                try:
+                    process.kill()
+                except psutil.NoSuchProcess:
+                    continue
+                self.killed += 1
+            logger.warning(
+                f"Завершено процессов Chrome, оставшихся после закрытия браузера "
+                f"{session.session_id}: {len(alive)}"
+            )
+            alive = []
+        if not alive:
+            with self._lock:
+                self._sessions.pop(session.session_id, None)
+
+    def _record_test(self, session_id: str) -> bool:
+        """
+        Запоминает память браузера после теста и проверяет, растёт ли она.
+
+        :return: True, если память растёт `leak_tests` тестов подряд.
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None or not session.root.is_running():
+            return False
+        sample = self._measure(session, time.time(), None, None)
+        if sample is None:
+            return False
+        window = session.test_rss
+        window.append(sample.rss_mb)
+        del window[: -(self.leak_tests + 1)]
+        session.growing = (
+            len(window) == self.leak_tests + 1
+            and all(b > a for a, b in zip(window, window[1:]))
+            and window[-1] - window[0] >= self.leak_mb
+        )
+        if session.growing and session_id not in self._growing:
+            self._growing.add(session_id)
+            logger.warning(
+                f"Память браузера {session_id} растёт {self.leak_tests} тестов подряд: "
+                f"{window[0]:.0f} → {window[-1]:.0f} МБ"
+            )
+        return session.growing
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        yield
+        if call.when != "teardown":
+            return
+        with self._lock:
+            samples = self._samples.pop(item.nodeid, [])
+        driver = item.funcargs.get("driver")
+        if driver is not None:
+            # Остальные браузеры пула простаивали во время теста
+            samples = [s for s in samples if s.session == driver.session_id]
+        elif not samples:
+            return
+        summary = _summary(samples)
+        # Браузер уже сброшен и возвращён в пул: замер после теста стабильнее
+        if driver is not None:
+            summary["memory_growth"] = self._record_test(driver.session_id)
+            if summary["memory_growth"]:
+                allure.dynamic.tag("browser-memory-growth")
+        allure.attach(
+            json.dumps(summary, ensure_ascii=False),
+            name="browser-resources",
+            attachment_type=allure.attachment_type.JSON,
+        )
+
+    def session_summary(self) -> dict:
+        """
+        Сводка воркера: пики по всем браузерам, завершённые процессы
+        и браузеры с растущей памятью.
+        """
+        with self._lock:
+            return {
+                "browsers": self.watched,
+                "peak_rss_mb": round(self._peaks["rss_mb"], 1),
+                "peak_cpu_percent": round(self._peaks["cpu_percent"], 1),
+                "peak_processes": self._peaks["processes"],
+                "killed_processes": self.killed,
+                "growing_sessions": sorted(self._growing),
+            }
+
+    def pytest_sessionfinish(self, session):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        # Пул браузеров уже закрыт: ждём, пока процессы завершатся сами
+        deadline = time.time() + self.grace
+        while self._sessions and time.time() < deadline:
+            for tracked in list(self._sessions.values()):
+                if not tracked.root.is_running():
+                    self._reap(tracked, time.time())
+            time.sleep(0.1)
+        for tracked in list(self._sessions.values()):
+            if tracked.root.is_running():
+                # Браузер не был закрыт: завершаем chromedriver вместе с Chrome
+                self._measure(tracked, time.time(), None, None)
+                try:
+                    tracked.root.kill()
+                except psutil.NoSuchProcess:
+                    pass
+            self._reap(tracked, time.time(), force=True)
+        if self.watched:
+            summary = self.session_summary()
+            if hasattr(session.config, "workerinput"):
+                # Сводка воркера передаётся главному процессу pytest-xdist
+                session.config.workeroutput["browser_resources"] = summary
+                return
+            self._workers[current.worker] = summary
+        # Сводки воркеров к этому моменту уже получены (pytest_testnodedown)
+        alluredir = session.config.getoption("allure_report_dir", None)
+        if self._workers and alluredir:
+            self._write_allure_environment(alluredir)
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        summary = getattr(node, "workeroutput", {}).get("browser_resources")
+        if summary:
+            self._workers[node.gateway.id] = summary
+
+    def totals(self) -> dict:
+        """
+        Итоги прогона по сводкам всех воркеров, в которых запускались браузеры.
+        """
+        summaries = list(self._workers.values())
+        peaks = [s["peak_rss_mb"] for s in summaries]
+        return {
+            "browsers": sum(s["browsers"] for s in summaries),
+            "sum_peak_rss_mb": round(sum(peaks)),
+            "max_worker_peak_rss_mb": round(max(peaks)),
+            "killed_processes": sum(s["killed_processes"] for s in summaries),
+            "growing_browsers": sum(len(s["growing_sessions"]) for s in summaries),
+        }
+
+    def _write_allure_environment(self, directory: str):
+        """
+        Добавляет итоги прогона в environment.properties отчёта Allure
+        (блок Environment на главной странице отчёта).
+        """
+        path = os.path.join(directory, "environment.properties")
+        lines = []
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                lines = [
+                    line for line in f if not line.startswith("browser_resources.")
+                ]
+        lines += [
+            f"browser_resources.{name}={value}\n"
+            for name, value in self.totals().items()
+        ]
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self._workers:
+            return
+        totals = self.totals()
+        terminalreporter.write_line(
+            f"Браузеры: {totals['browsers']}, сумма пиков памяти воркеров "
+            f"{totals['sum_peak_rss_mb']} МБ "
+            f"(максимум на воркер {totals['max_worker_peak_rss_mb']} МБ), "
+            f"завершено зависших процессов: {totals['killed_processes']}, "
+            f"браузеров с растущей памятью: {totals['growing_browsers']}"
+        )
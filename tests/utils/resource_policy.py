@@ -0,0 +1,233 @@
+import json
+import weakref
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+def _extensions(*extensions: str) -> tuple:
+    """
+    Шаблоны файлов с расширениями: расширение в конце пути URL, перед параметрами
+    запроса или без них. Подстроки вроде "?format=png" или "/png/" не подходят.
+    """
+    return tuple(
+        pattern
+        for extension in extensions
+        for pattern in (f"*.{extension}", f"*.{extension}?*")
+    )
+
+
+# Категории ресурсов и шаблоны URL для Network.setBlockedURLs ("*" — любая подстрока).
+CATEGORIES = {
+    "analytics": (
+        "*mc.yandex.ru*",
+        "*google-analytics.com*",
+        "*googletagmanager.com*",
+        "*top-fwz1.mail.ru*",
+        "*counter.yadro.ru*",
+        "*doubleclick.net*",
+        "*connect.facebook.net*",
+        "*vk.com/rtrg*",
+    ),
+    "widgets": (
+        "*vk.com/js/api*",
+        "*jivosite.com*",
+        "*youtube.com/embed*",
+        "*api-maps.yandex.ru*",
+    ),
+    "fonts": _extensions("woff2", "woff", "ttf", "otf", "eot"),
+    "media": _extensions("mp4", "webm", "ogv", "mp3", "m3u8"),
+    "images": _extensions("png", "jpg", "jpeg", "gif", "webp", "svg", "ico"),
+}
+
+
+@dataclass(frozen=True)
+class ResourcePolicy:
+    """
+    Декларативная политика загрузки ресурсов страницы.
+
+    :param blocked: Заблокированные категории из CATEGORIES.
+    :param patterns: Дополнительные заблокированные шаблоны URL.
+    """
+
+    blocked: frozenset = field(default_factory=frozenset)
+    patterns: tuple = ()
+
+    @classmethod
+    def from_string(cls, categories: str) -> "ResourcePolicy":
+        """
+        Создаёт политику из списка категорий через запятую.
+        """
+        names = frozenset(c.strip() for c in categories.split(",") if c.strip())
+        unknown = names - set(CATEGORIES)
+        if unknown:
+            raise ValueError(f"Неизвестные категории ресурсов: {sorted(unknown)}")
+        return cls(names)
+
+    def allow(self, *categories: str) -> "ResourcePolicy":
+        """
+        Возвращает политику, в которой указанные категории разрешены.
+        """
+        return ResourcePolicy(self.blocked - set(categories), self.patterns)
+
+    def deny(self, *categories: str, patterns: tuple = ()) -> "ResourcePolicy":
+        """
+        Возвращает политику, в которой указанные категории и шаблоны заблокированы.
+        """
+        return ResourcePolicy(
+            self.blocked | set(categories), self.patterns + tuple(patterns)
+        )
+
+    @property
+    def urls(self) -> list[str]:
+        """
+        Шаблоны URL для Network.setBlockedURLs.
+        """
+        urls = [p for name in sorted(self.blocked) for p in CATEGORIES[name]]
+        return urls + list(self.patterns)
+
+
+_policies: "weakref.WeakKeyDictionary[WebDriver, ResourcePolicy]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def apply_policy(driver: WebDriver, policy: ResourcePolicy):
+    """
+    Применяет политику к текущей вкладке браузера через Chrome DevTools
+    и запоминает её для вкладок, на которые тест переключится позже.
+
+    Правила DevTools действуют в пределах вкладки, а execute_cdp_cmd работает
+    только с текущей вкладкой, поэтому вкладка, открытая кликом, загружает
+    свой первый документ без блокировки (и без учёта в статистике); правила
+    применяются к ней при переключении (см. reapply_policy).
+
+    :param driver: Экземпляр WebDriver.
+    :param policy: Политика загрузки ресурсов.
+    """
+    _policies[driver] = policy
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": policy.urls})
+
+
+def current_policy(driver: WebDriver) -> ResourcePolicy | None:
+    """
+    Возвращает политику, действующую для драйвера, или None.
+    """
+    return _policies.get(driver)
+
+
+def reapply_policy(driver: WebDriver):
+    """
+    Применяет текущую политику драйвера к активной вкладке (например, после
+    переключения на новую вкладку: правила DevTools действуют в пределах вкладки).
+    """
+    policy = _policies.get(driver)
+    if policy is not None:
+        apply_policy(driver, policy)
+
+
+def drain_network_events(driver: WebDriver) -> list[dict]:
+    """
+    Забирает накопленные сетевые события из performance-лога ChromeDriver.
+
+    :return: Список событий DevTools {"method": ..., "params": ...}.
+    """
+    try:
+        entries = driver.get_log("performance")
+    except WebDriverException:
+        return []
+    events = []
+    for entry in entries:
+        message = json.loads(entry["message"])["message"]
+        if message.get("method", "").startswith("Network."):
+            events.append(message)
+    return events
+
+
+class ResourceStats:
+    """
+    Статистика сетевых запросов теста: сколько запросов и байт загружено
+    и сколько запросов заблокировано политикой. Объём заблокированных ресурсов
+    оценивается по размерам, которые те же URL имели, когда загружались.
+    """
+
+    # Размеры ресурсов по URL без параметров, общие для всех тестов процесса.
+    known_sizes: dict[str, int] = {}
+
+    def __init__(self):
+        self.loaded_requests = 0
+        self.loaded_bytes = 0
+        self.blocked_requests = 0
+        self.blocked_bytes_estimate = 0
+        self.blocked_unknown = 0
+
+    @staticmethod
+    def _url_key(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.netloc}{parts.path}"
+
+    def consume(self, events: list[dict]):
+        """
+        Учитывает сетевые события DevTools.
+        """
+        urls = {}
+        for event in events:
+            params = event["params"]
+            method = event["method"]
+            if method == "Network.requestWillBeSent":
+                urls[params["requestId"]] = params["request"]["url"]
+            elif method == "Network.loadingFinished":
+                self.loaded_requests += 1
+                size = int(params.get("encodedDataLength", 0))
+                self.loaded_bytes += size
+                url = urls.get(params["requestId"])
+                if url:
+                    self.known_sizes[self._url_key(url)] = size
+            elif method == "Network.loadingFailed" and params.get("blockedReason"):
+                self.blocked_requests += 1
+                url = urls.get(params["requestId"], "")
+                size = self.known_sizes.get(self._url_key(url))
+                if size is None:
+                    self.blocked_unknown += 1
+                else:
+                    self.blocked_bytes_estimate += size
+
+    def report(self, driver: WebDriver) -> dict:
+        """
+        Забирает события текущего теста и формирует отчёт вместе с таймингами
+        загрузки текущего документа (Navigation Timing).
+
+        :param driver: Экземпляр WebDriver.
+        :return: Словарь со статистикой.
+        """
+        self.consume(drain_network_events(driver))
+        report = self.as_dict()
+        policy = current_policy(driver)
+        report["policy"] = sorted(policy.blocked) if policy else []
+        try:
+            report["navigation"] = driver.execute_script(
+                """
+                const nav = performance.getEntriesByType("navigation")[0];
+                return nav ? {
+                    url: nav.name,
+                    dom_content_loaded_ms: nav.domContentLoadedEventEnd,
+                    load_ms: nav.loadEventEnd,
+                    transfer_bytes: nav.transferSize,
+                } : null;
+                """
+            )
+        except WebDriverException:
+            report["navigation"] = None
+        return report
+
+    def as_dict(self) -> dict:
+        return {
+            "loaded_requests": self.loaded_requests,
+            "loaded_bytes": self.loaded_bytes,
+            "blocked_requests": self.blocked_requests,
+            "blocked_bytes_estimate": self.blocked_bytes_estimate,
+            "blocked_unknown_size": self.blocked_unknown,
+        }
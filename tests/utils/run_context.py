@@ -0,0 +1,89 @@
+import os
+import threading
+import time
+
+import allure_commons
+
+
+class RunContext:
+    """
+    Текущий контекст выполнения: тест, шаг Allure и последнее действие из лога.
+
+    Контекст общий для процесса, чтобы его могли читать фоновые потоки
+    (логирование, замеры), которые сами не знают, какой тест сейчас идёт.
+    """
+
+    def __init__(self):
+        self.worker = os.environ.get("PYTEST_XDIST_WORKER", "master")
+        self.test_id = None
+        self.action = None
+        self._steps: list[str] = []
+        self._lock = threading.Lock()
+
+    @property
+    def step(self) -> str | None:
+        """
+        Текущий (самый вложенный) шаг Allure.
+        """
+        with self._lock:
+            return self._steps[-1] if self._steps else None
+
+    @property
+    def steps(self) -> tuple:
+        """
+        Стек шагов Allure от внешнего к внутреннему.
+        """
+        with self._lock:
+            return tuple(self._steps)
+
+    def start_test(self, test_id: str):
+        with self._lock:
+            self.test_id = test_id
+            self.action = None
+            self._steps = []
+
+    def end_test(self):
+        with self._lock:
+            self.test_id = None
+            self.action = None
+            self._steps = []
+
+    def push_step(self, title: str):
+        with self._lock:
+            self._steps.append(title)
+
+    def pop_step(self):
+        with self._lock:
+            if self._steps:
+                self._steps.pop()
+
+
+current = RunContext()
+
+
+class _StepListener:
+    """
+    Слушатель allure-commons, отслеживающий вход и выход из шагов `@allure.step`.
+    """
+
+    def __init__(self):
+        # Обработчики завершения шага: callback(title, duration_seconds)
+        self.on_stop = []
+        self._started: dict[str, float] = {}
+
+    @allure_commons.hookimpl
+    def start_step(self, uuid, title, params):
+        self._started[uuid] = time.perf_counter()
+        current.push_step(title)
+
+    @allure_commons.hookimpl
+    def stop_step(self, uuid, exc_type, exc_val, exc_tb):
+        title = current.step
+        current.pop_step()
+        duration = time.perf_counter() - self._started.pop(uuid, time.perf_counter())
+        for callback in self.on_stop:
+            callback(title, duration)
+
+
+step_listener = _StepListener()
+allure_commons.plugin_manager.register(step_listener, "run-context-steps")
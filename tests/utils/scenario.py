@@ -0,0 +1,167 @@
+import json
+from dataclasses import dataclass
+from typing import Callable
+
+import allure
+from loguru import logger
+
+from config.config import STEP_RETRIES
+
+
+@dataclass(frozen=True)
+class Step:
+    """
+    Именованный шаг сценария.
+
+    :param title: Название шага (как в нумерованном списке в docstring сценария).
+    :param action: Действие шага.
+    :param navigates: Шаг оставляет браузер на другом URL.
+    :param opens_tab: Шаг переключает браузер на новую вкладку.
+    :param retries: Сколько раз повторить шаг при ошибке (None — значение по умолчанию).
+    :param restore: Перед повтором всегда открывать контрольную точку заново
+        (для шагов, которые оставляют на странице попапы и введённый текст).
+    """
+
+    title: str
+    action: Callable[[], object]
+    navigates: bool = False
+    opens_tab: bool = False
+    retries: int | None = None
+    restore: bool = False
+
+    @property
+    def changes_state(self) -> bool:
+        return self.navigates or self.opens_tab
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """
+    Состояние браузера после последнего успешного шага, изменившего URL или вкладку.
+
+    :param index: Номер шага (с нуля), после которого снято состояние;
+        -1 — начало сценария.
+    :param url: URL активной вкладки.
+    :param handle: Активная вкладка.
+    :param handles: Все открытые вкладки.
+    """
+
+    index: int
+    url: str
+    handle: str
+    handles: tuple
+
+
+class ScenarioRunner:
+    """
+    Выполняет сценарий по шагам и повторяет только упавший шаг.
+
+    После каждого шага, который меняет URL или вкладку, запоминается контрольная
+    точка. Если шаг упал и у него остались попытки, то:
+
+    - если браузер всё ещё в состоянии контрольной точки, повторяется только этот шаг;
+    - иначе (или если у шага restore=True) лишние вкладки закрываются, контрольная
+      точка открывается заново, и сценарий продолжается со следующего за ней шага.
+
+    Количество повторов каждого шага попадает в лог и в отчёт Allure.
+    """
+
+    def __init__(self, page, default_retries: int = STEP_RETRIES):
+        """
+        :param page: Объект страницы (BasePage), в котором выполняются шаги.
+        :param default_retries: Количество повторов шага по умолчанию.
+        """
+        self.page = page
+        self.driver = page.driver
+        self.default_retries = default_retries
+
+    def run(self, steps: list[Step]) -> dict[str, int]:
+        """
+        Выполняет шаги сценария.
+
+        :param steps: Шаги сценария по порядку.
+        :return: Количество повторов каждого шага {название: повторы}.
+        :raises Exception: Ошибка шага, у которого закончились попытки.
+        """
+        retries = [0] * len(steps)
+        checkpoint = self._checkpoint(-1)
+        index = 0
+        try:
+            while index < len(steps):
+                step = steps[index]
+                try:
+                    with allure.step(f"{index + 1}. {step.title}"):
+                        logger.info(f"Шаг {index + 1}: {step.title}")
+                        step.action()
+                except Exception as e:
+                    budget = step.retries
+                    if budget is None:
+                        budget = self.default_retries
+                    if retries[index] >= budget:
+                        raise
+                    retries[index] += 1
+                    logger.warning(
+                        f"Шаг '{step.title}' не выполнился: {e}. "
+                        f"Повтор {retries[index]} из {budget}"
+                    )
+                    if step.restore or not self._matches(checkpoint):
+                        self._restore(checkpoint)
+                        index = checkpoint.index + 1
+                    continue
+                if step.changes_state:
+                    checkpoint = self._checkpoint(index)
+                index += 1
+        finally:
+            self._report(steps, retries)
+        return {step.title: count for step, count in zip(steps, retries)}
+
+    def _checkpoint(self, index: int) -> Checkpoint:
+        return Checkpoint(
+            index,
+            self.driver.current_url,
+            self.driver.current_window_handle,
+            tuple(self.driver.window_handles),
+        )
+
+    def _matches(self, checkpoint: Checkpoint) -> bool:
+        """
+        Проверяет, что браузер всё ещё на вкладке и URL контрольной точки.
+        """
+        return (
+            self.driver.current_window_handle == checkpoint.handle
+            and self.driver.current_url == checkpoint.url
+        )
+
+    def _restore(self, checkpoint: Checkpoint):
+        """
+        Возвращает браузер в состояние контрольной точки.
+        """
+        logger.info(f"Возвращаемся к контрольной точке: {checkpoint.url}")
+        for handle in self.driver.window_handles:
+            if handle not in checkpoint.handles:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+        self.driver.switch_to.window(checkpoint.handle)
+        self.page.get(checkpoint.url)
+
+    @staticmethod
+    def _report(steps: list[Step], retries: list[int]):
+        """
+        Прикрепляет к отчёту Allure повторы шагов, если они были.
+        """
+        if not any(retries):
+            return
+        allure.dynamic.tag("step-retries")
+        allure.attach(
+            json.dumps(
+                [
+                    {"step": step.title, "retries": count}
+                    for step, count in zip(steps, retries)
+                    if count
+                ],
+                ensure_ascii=False,
+                indent=2,
+            ),
+            name="step-retries",
+            attachment_type=allure.attachment_type.JSON,
+        )
@@ -0,0 +1,147 @@
+import re
+from functools import lru_cache
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+try:
+    import lxml.html
+    from cssselect import HTMLTranslator
+except ImportError:  # pragma: no cover - зависит от окружения
+    lxml = None
+    HTMLTranslator = None
+
+
+@lru_cache(maxsize=None)
+def locator_to_xpath(locator: tuple) -> str:
+    """
+    Переводит локатор Selenium в XPath для локального поиска через lxml.
+
+    :param locator: Кортеж, содержащий способ поиска элемента и значение для поиска.
+    :return: Выражение XPath.
+    """
+    by, value = locator
+    if by == By.XPATH:
+        return value
+    if by == By.CSS_SELECTOR:
+        return HTMLTranslator().css_to_xpath(value)
+    if by == By.ID:
+        return f"descendant-or-self::*[@id={_literal(value)}]"
+    if by == By.NAME:
+        return f"descendant-or-self::*[@name={_literal(value)}]"
+    if by == By.TAG_NAME:
+        return f"descendant-or-self::{value.lower()}"
+    if by == By.CLASS_NAME:
+        return (
+            "descendant-or-self::*[contains(concat(' ', normalize-space(@class), ' '), "
+            f"{_literal(' ' + value + ' ')})]"
+        )
+    if by == By.LINK_TEXT:
+        return f"descendant-or-self::a[normalize-space(.)={_literal(value)}]"
+    if by == By.PARTIAL_LINK_TEXT:
+        return f"descendant-or-self::a[contains(., {_literal(value)})]"
+    raise ValueError(f"Неподдерживаемый способ поиска: {by}")
+
+
+def _literal(value: str) -> str:
+    """
+    Экранирует строку для использования в XPath.
+    """
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    parts = value.split("'")
+    return "concat(" + ', "\'", '.join(f"'{part}'" for part in parts) + ")"
+
+
+class DomSnapshot:
+    """
+    Снимок DOM страницы или её части, по которому локаторы из Locators
+    проверяются локально через lxml, без запросов к браузеру.
+
+    HTML разбирается при первом обращении, поэтому снимок можно сохранить
+    как артефакт, даже если lxml не установлен.
+    """
+
+    def __init__(self, html: str, url: str = None, fragment: bool = False):
+        """
+        :param html: HTML документа или поддерева (outerHTML).
+        :param url: URL страницы, с которой снят снимок.
+        :param fragment: True, если снимок содержит только поддерево документа.
+        """
+        self.html = html
+        self.url = url
+        self.fragment = fragment
+        self._root = None
+
+    @property
+    def root(self):
+        """
+        Корневой элемент разобранного дерева lxml.
+        """
+        if self._root is None:
+            if lxml is None:
+                raise ImportError(
+                    "Для работы со снимками DOM установите пакеты lxml и cssselect"
+                )
+            if self.fragment:
+                self._root = lxml.html.fragment_fromstring(self.html)
+            else:
+                self._root = lxml.html.document_fromstring(self.html)
+        return self._root
+
+    def find_elements(self, locator: tuple) -> list:
+        """
+        Находит все элементы снимка по локатору.
+
+        :param locator: Кортеж, содержащий способ поиска элемента и значение для поиска.
+        :return: Список элементов lxml.
+        """
+        return self.root.xpath(locator_to_xpath(locator))
+
+    def find_element(self, locator: tuple):
+        """
+        Находит первый элемент снимка по локатору.
+
+        :param locator: Кортеж, содержащий способ поиска элемента и значение для поиска.
+        :return: Элемент lxml.
+        :raises NoSuchElementException: Если элемент не найден.
+        """
+        elements = self.find_elements(locator)
+        if not elements:
+            raise NoSuchElementException(f"Элемент не найден в снимке DOM: {locator}")
+        return elements[0]
+
+    def count(self, locator: tuple) -> int:
+        """
+        Возвращает количество элементов, найденных по локатору.
+        """
+        return len(self.find_elements(locator))
+
+    def exists(self, locator: tuple) -> bool:
+        """
+        Проверяет, есть ли в снимке хотя бы один элемент по локатору.
+        """
+        return bool(self.find_elements(locator))
+
+    def text(self, locator: tuple) -> str:
+        """
+        Возвращает текст первого найденного элемента с нормализованными пробелами.
+        """
+        return re.sub(r"\s+", " ", self.find_element(locator).text_content()).strip()
+
+    def attribute(self, locator: tuple, name: str):
+        """
+        Возвращает значение атрибута первого найденного элемента.
+        """
+        return self.find_element(locator).get(name)
+
+    def save(self, path: str):
+        """
+        Сохраняет снимок в HTML-файл.
+
+        :param path: Путь к файлу.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.html)
@@ -0,0 +1,181 @@
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Generator
+
+from loguru import logger
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from tests.utils.readiness import tracker_for
+from tests.utils.resource_policy import reapply_policy
+from tests.utils.waits import InPageWait
+
+
+@dataclass
+class WaitFor:
+    """
+    Условие, которого задача ждёт, уступая браузер другим вкладкам.
+    Задача получает результат ожидания (элемент) как значение выражения yield.
+
+    :param locator: Кортеж, содержащий способ поиска элемента и значение для поиска.
+    :param condition: Условие InPageWait: "presence", "all", "text" или "clickable".
+    :param text: Ожидаемый текст для условия "text".
+    :param timeout: Максимальное время ожидания в секундах.
+    """
+
+    locator: tuple
+    condition: str = "presence"
+    text: str = None
+    timeout: float = 15
+
+
+@dataclass
+class TabTask:
+    """
+    Задача, выполняемая в одной вкладке.
+    """
+
+    name: str
+    handle: str
+    steps: Generator
+    started: float
+    waiting: WaitFor | None = None
+    deadline: float = 0.0
+    result: object = None
+    error: BaseException | None = None
+    finished: float | None = None
+
+    @property
+    def duration(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+
+class TabScheduler:
+    """
+    Кооперативный планировщик задач по вкладкам одного браузера.
+
+    Задача — генератор, который выполняет действия в своей вкладке и отдаёт (yield)
+    WaitFor, когда ему нужно дождаться страницы. Планировщик по кругу переключается
+    между вкладками и проверяет условие каждой задачи короткими отрезками времени,
+    поэтому пока одна вкладка ждёт ответа сайта, остальные продолжают работу.
+    Ошибка задачи завершает только эту задачу; освободившаяся вкладка получает
+    следующую задачу из очереди.
+    """
+
+    def __init__(self, driver: WebDriver, tabs: int = 4, time_slice: float = 0.25):
+        """
+        :param driver: Экземпляр WebDriver.
+        :param tabs: Сколько вкладок использовать одновременно.
+        :param time_slice: Сколько секунд ждать условие задачи за один проход.
+        """
+        self.driver = driver
+        self.tabs = max(1, tabs)
+        self.time_slice = time_slice
+        self.waits = InPageWait(driver)
+        self._current_handle = None
+
+    def run(self, jobs: dict[str, Callable[[], Generator]]) -> list[TabTask]:
+        """
+        Выполняет задачи и возвращает их в порядке завершения.
+
+        :param jobs: Словарь {название задачи: функция, создающая генератор задачи}.
+        :return: Завершённые задачи с результатом или ошибкой.
+        """
+        queue = deque(jobs.items())
+        original = self.driver.current_window_handle
+        self._current_handle = original
+        handles = [original]
+        for _ in range(min(self.tabs, len(queue)) - 1):
+            self.driver.switch_to.new_window("tab")
+            reapply_policy(self.driver)
+            handles.append(self.driver.current_window_handle)
+            self._current_handle = handles[-1]
+        active: list[TabTask] = []
+        done: list[TabTask] = []
+
+        def start(handle: str):
+            name, factory = queue.popleft()
+            self._switch(handle)
+            task = TabTask(name, handle, factory(), time.perf_counter())
+            self._advance(task)
+            (done if task.finished else active).append(task)
+
+        try:
+            for handle in handles:
+                if queue:
+                    start(handle)
+            while active:
+                for task in list(active):
+                    self._poll(task)
+                    if task.finished:
+                        active.remove(task)
+                        done.append(task)
+                        logger.info(
+                            f"Задача '{task.name}' завершена за {task.duration:.2f} с"
+                            + (f" с ошибкой: {task.error}" if task.error else "")
+                        )
+                        if queue:
+                            start(task.handle)
+        finally:
+            for handle in handles[1:]:
+                self._switch(handle)
+                self.driver.close()
+            self.driver.switch_to.window(original)
+            tracker_for(self.driver).navigated()
+        return done
+
+    def _switch(self, handle: str):
+        if handle != self._current_handle:
+            self.driver.switch_to.window(handle)
+            tracker_for(self.driver).navigated()
+            self._current_handle = handle
+
+    def _poll(self, task: TabTask):
+        """
+        Проверяет условие задачи в её вкладке в течение одного отрезка времени.
+        """
+        self._switch(task.handle)
+        wait = task.waiting
+        remaining = task.deadline - time.perf_counter()
+        try:
+            value = self.waits.until(
+                wait.locator,
+                wait.condition,
+                max(0.05, min(self.time_slice, remaining)),
+                wait.text,
+            )
+        except TimeoutException:
+            if remaining <= self.time_slice:
+                self._advance(
+                    task,
+                    error=TimeoutException(
+                        f"Условие '{wait.condition}' не выполнилось "
+                        f"за {wait.timeout} с: {wait.locator}"
+                    ),
+                )
+            return
+        except Exception as e:
+            self._advance(task, error=e)
+            return
+        self._advance(task, value)
+
+    def _advance(self, task: TabTask, value=None, error: BaseException = None):
+        """
+        Выполняет задачу до следующего ожидания или до завершения.
+        """
+        try:
+            if error is not None:
+                waiting = task.steps.throw(error)
+            else:
+                waiting = task.steps.send(value)
+        except StopIteration as stop:
+            task.result = stop.value
+            task.finished = time.perf_counter()
+            return
+        except Exception as e:
+            task.error = e
+            task.finished = time.perf_counter()
+            return
+        task.waiting = waiting
+        task.deadline = time.perf_counter() + waiting.timeout
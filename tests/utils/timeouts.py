@@ -0,0 +1,201 @@
+import json
+import math
+import os
+from collections import defaultdict
+
+import pytest
+
+from config.config import (
+    TIMEOUT_ADAPTIVE,
+    TIMEOUT_HISTORY,
+    TIMEOUT_MARGIN,
+    TIMEOUT_MIN,
+    TIMEOUT_MIN_SAMPLES,
+    TIMEOUT_OVERRIDES,
+    TIMEOUT_PROFILE,
+    TIMEOUT_PROFILES,
+)
+from tests.pages.locators import Locator, Locators
+
+# Сколько последних замеров каждого локатора хранить в истории.
+HISTORY_SIZE = 200
+
+
+def locator_name(locator: tuple) -> str | None:
+    """
+    Имя локатора в реестре Locators или None для локаторов вне реестра.
+    Имя берётся у самого локатора (см. Locator), а не ищется по значению:
+    в реестре есть разные имена с одинаковым селектором.
+    """
+    return getattr(locator, "name", None)
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """
+    Перцентиль замеров методом ближайшего ранга.
+
+    :param samples: Замеры (не пустой список).
+    :param q: Перцентиль от 0 до 100.
+    """
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def load_history(path: str) -> dict[str, list[float]]:
+    """
+    Загружает историю длительностей ожиданий {имя локатора: [секунды, ...]}.
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class TimeoutProfile:
+    """
+    Таймауты и интервал опроса ожиданий для окружения.
+
+    Ожидание без явного таймаута получает таймаут локатора из профиля или,
+    если локатора там нет, таймаут профиля по умолчанию. В адаптивном режиме
+    профиль записывает, сколько на самом деле ждали каждый локатор из Locators,
+    и для локатора с достаточной историей таймаут равен p99 прошлых замеров
+    плюс запас (но не больше таймаута из профиля). Так сломанный локатор
+    проваливает тест за секунду-две, а не за полный таймаут. Таймауты
+    по истории вычисляются один раз при загрузке и не меняются во время прогона.
+    Готовность нового документа (загрузка страницы) в замеры не входит и ждётся
+    с таймаутом по умолчанию (см. InPageWait.until).
+    """
+
+    def __init__(
+        self,
+        default: float,
+        poll: float,
+        locators: dict[str, float] | None = None,
+        history_path: str | None = None,
+        margin: float = 1,
+        minimum: float = 1,
+        min_samples: int = 20,
+    ):
+        """
+        :param default: Таймаут по умолчанию в секундах.
+        :param poll: Интервал проверки условия в секундах.
+        :param locators: Таймауты отдельных локаторов {имя в Locators: секунды}.
+        :param history_path: JSON-файл истории длительностей ожиданий.
+            Если указан, включается адаптивный режим.
+        :param margin: Запас к p99 в секундах.
+        :param minimum: Минимальный адаптивный таймаут в секундах.
+        :param min_samples: Сколько замеров нужно, чтобы доверять p99.
+        """
+        self.default = default
+        self.poll = poll
+        self.locators = locators or {}
+        unknown = {
+            name
+            for name in self.locators
+            if not isinstance(getattr(Locators, name, None), Locator)
+        }
+        if unknown:
+            raise ValueError(f"Таймауты заданы для неизвестных локаторов: {unknown}")
+        self.history_path = history_path
+        self.margin = margin
+        self.minimum = minimum
+        self.min_samples = min_samples
+        self.adaptive: dict[str, float] = {}
+        if history_path:
+            for name, samples in load_history(history_path).items():
+                if len(samples) >= min_samples:
+                    self.adaptive[name] = min(
+                        self.configured(name),
+                        max(minimum, percentile(samples, 99) + margin),
+                    )
+        self._recorded: dict[str, list[float]] = defaultdict(list)
+
+    @classmethod
+    def from_config(cls) -> "TimeoutProfile":
+        """
+        Профиль окружения TIMEOUT_PROFILE с переопределениями TIMEOUT_OVERRIDES.
+        """
+        if TIMEOUT_PROFILE not in TIMEOUT_PROFILES:
+            raise ValueError(f"Неизвестный профиль таймаутов: {TIMEOUT_PROFILE}")
+        settings = TIMEOUT_PROFILES[TIMEOUT_PROFILE]
+        overrides = json.loads(TIMEOUT_OVERRIDES) if TIMEOUT_OVERRIDES else {}
+        return cls(
+            overrides.get("default", settings["default"]),
+            overrides.get("poll", settings["poll"]),
+            {**settings.get("locators", {}), **overrides.get("locators", {})},
+            TIMEOUT_HISTORY if TIMEOUT_ADAPTIVE else None,
+            TIMEOUT_MARGIN,
+            TIMEOUT_MIN,
+            TIMEOUT_MIN_SAMPLES,
+        )
+
+    def configured(self, name: str | None) -> float:
+        """
+        Таймаут локатора из профиля (без учёта истории).
+        """
+        return self.locators.get(name, self.default)
+
+    def timeout_for(self, locator: tuple) -> float:
+        """
+        Таймаут ожидания локатора в секундах.
+
+        :param locator: Кортеж, содержащий способ поиска элемента и значение для поиска.
+        """
+        name = locator_name(locator)
+        return self.adaptive.get(name) or self.configured(name)
+
+    def describe(self, locator: tuple) -> str:
+        """
+        Откуда взят таймаут локатора (для сообщений об ошибках).
+        """
+        name = locator_name(locator)
+        if name in self.adaptive:
+            return (
+                f"адаптивный таймаут {name}: p99 прошлых прогонов + {self.margin} с, "
+                f"в профиле {self.configured(name)} с"
+            )
+        if name in self.locators:
+            return f"таймаут {name} из профиля"
+        return "таймаут профиля по умолчанию"
+
+    def record(self, locator: tuple, seconds: float):
+        """
+        Запоминает, сколько длилось успешное ожидание локатора (в адаптивном режиме).
+        """
+        name = locator_name(locator)
+        if self.history_path and name is not None:
+            self._recorded[name].append(round(seconds, 3))
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        for name, samples in (
+            getattr(node, "workeroutput", {}).get("wait_durations", {}).items()
+        ):
+            self._recorded[name].extend(samples)
+
+    def pytest_sessionfinish(self, session):
+        if hasattr(session.config, "workerinput"):
+            # Замеры воркера сохраняет главный процесс (см. pytest_testnodedown)
+            session.config.workeroutput["wait_durations"] = dict(self._recorded)
+            return
+        if not self._recorded:
+            return
+        history = load_history(self.history_path)
+        for name, samples in self._recorded.items():
+            history[name] = (history.get(name, []) + samples)[-HISTORY_SIZE:]
+        temporary = f"{self.history_path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(history, f, indent=1, sort_keys=True)
+        os.replace(temporary, self.history_path)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.adaptive:
+            terminalreporter.write_line(
+                "Адаптивные таймауты: "
+                + ", ".join(f"{n} {t:.1f} с" for n, t in sorted(self.adaptive.items()))
+            )
+
+
+# Профиль таймаутов сессии. В адаптивном режиме регистрируется в conftest.py
+# как плагин, чтобы сохранить замеры ожиданий в историю.
+profile = TimeoutProfile.from_config()
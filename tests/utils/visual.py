@@ -0,0 +1,306 @@
+import base64
+import io
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import allure
+import numpy as np
+from loguru import logger
+from PIL import Image
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from config.config import VISUAL_BASELINES
+from tests.utils.image_diff import (
+    BaselineStore,
+    Comparison,
+    ComparisonJob,
+    compare_job,
+)
+from tests.utils.waits import LOCATE_JS
+
+# Геометрия области для скриншота. Скрипт дожидается загрузки изображений
+# (не дольше timeoutMs) и одним ответом возвращает область контейнера
+# в координатах документа, области элементов и масок относительно контейнера.
+_REGIONS_SCRIPT = (
+    LOCATE_JS
+    + """
+const [by, value, itemSelector, maskSelectors, timeoutMs] = arguments;
+const callback = arguments[arguments.length - 1];
+const container = locate(by, value)[0];
+if (!container) {
+    callback(null);
+    return;
+}
+const items = itemSelector
+    ? Array.from(container.querySelectorAll(itemSelector)) : [container];
+const images = items.flatMap(
+    el => el.tagName === "IMG" ? [el] : Array.from(el.querySelectorAll("img")));
+const decoded = Promise.all(images.map(img => img.decode().catch(() => null)));
+const timer = new Promise(resolve => setTimeout(resolve, timeoutMs));
+Promise.race([decoded, timer]).then(() => {
+    const origin = container.getBoundingClientRect();
+    const relative = r => ({
+        x: r.x - origin.x, y: r.y - origin.y, width: r.width, height: r.height});
+    callback({
+        clip: {
+            x: origin.x + window.scrollX,
+            y: origin.y + window.scrollY,
+            width: origin.width,
+            height: origin.height,
+        },
+        items: items.map(el => ({
+            rect: relative(el.getBoundingClientRect()),
+            broken: el.tagName === "IMG" && (!el.complete || el.naturalWidth === 0),
+        })),
+        masks: maskSelectors
+            .flatMap(selector => Array.from(container.querySelectorAll(selector)))
+            .map(el => relative(el.getBoundingClientRect())),
+    });
+});
+"""
+)
+
+# Сравнитель сессии pytest (регистрируется в conftest.py).
+# None вне pytest: в этом случае создаётся сравнитель без пула процессов.
+comparator = None
+
+
+def capture_regions(
+    driver: WebDriver,
+    locator: tuple,
+    item_selector: str = None,
+    masks: tuple = (),
+    timeout: float = 5,
+) -> tuple[list[np.ndarray | None], list[np.ndarray | None]]:
+    """
+    Снимает области элементов одним скриншотом контейнера.
+
+    Геометрия всех элементов читается одним скриптом, контейнер снимается одной
+    командой DevTools Page.captureScreenshot (в том числе за пределами экрана),
+    а области элементов вырезаются из снимка локально.
+
+    :param driver: Экземпляр WebDriver.
+    :param locator: Кортеж, содержащий способ поиска контейнера и значение для поиска.
+    :param item_selector: CSS-селектор элементов внутри контейнера;
+        None — снимается сам контейнер.
+    :param masks: CSS-селекторы областей внутри контейнера, которые не сравниваются.
+    :param timeout: Сколько секунд ждать загрузки изображений.
+    :return: Изображения элементов HxWx3 (None для незагруженных изображений)
+        и маски игнорируемых пикселей (None, если масок нет).
+    :raises AssertionError: Если контейнер не найден.
+    """
+    by, value = locator
+    geometry = driver.execute_async_script(
+        _REGIONS_SCRIPT, by, value, item_selector, list(masks), int(timeout * 1000)
+    )
+    assert geometry, f"Элемент для визуальной проверки не найден: {locator}"
+    clip = geometry["clip"]
+    screenshot = driver.execute_cdp_cmd(
+        "Page.captureScreenshot",
+        {
+            "format": "png",
+            "clip": {**clip, "scale": 1},
+            "captureBeyondViewport": True,
+        },
+    )
+    with Image.open(io.BytesIO(base64.b64decode(screenshot["data"]))) as image:
+        block = np.asarray(image.convert("RGB"))
+    # Снимок в пикселях устройства, геометрия — в CSS-пикселях
+    scale = block.shape[1] / clip["width"] if clip["width"] else 1.0
+    mask = np.zeros(block.shape[:2], dtype=bool)
+    for rect in geometry["masks"]:
+        mask[_slices(rect, scale, block.shape)] = True
+    images, item_masks = [], []
+    for item in geometry["items"]:
+        region = _slices(item["rect"], scale, block.shape)
+        pixels = block[region]
+        if item["broken"] or pixels.size == 0:
+            images.append(None)
+            item_masks.append(None)
+            continue
+        images.append(np.ascontiguousarray(pixels))
+        item_masks.append(mask[region].copy() if mask[region].any() else None)
+    return images, item_masks
+
+
+def _slices(rect: dict, scale: float, shape: tuple) -> tuple[slice, slice]:
+    """
+    Переводит область в CSS-пикселях в срезы массива снимка.
+    """
+    top = min(max(round(rect["y"] * scale), 0), shape[0])
+    left = min(max(round(rect["x"] * scale), 0), shape[1])
+    bottom = min(max(round((rect["y"] + rect["height"]) * scale), top), shape[0])
+    right = min(max(round((rect["x"] + rect["width"]) * scale), left), shape[1])
+    return slice(top, bottom), slice(left, right)
+
+
+class VisualComparator:
+    """
+    Сравнение снимков с эталонами из хранилища BaselineStore.
+
+    Сравнения выполняются в пуле процессов: снимки передаются в процессы
+    пачками, и каждый процесс загружает только нужные ему эталоны.
+    Пул создаётся при первом сравнении и переиспользуется до конца сессии.
+    Плагин pytest: пул закрывается в pytest_unconfigure.
+    """
+
+    def __init__(
+        self,
+        store: BaselineStore,
+        tolerance: int = 16,
+        max_diff: float = 0.002,
+        max_distance: int = 10,
+        workers: int = 2,
+        update: bool = False,
+    ):
+        """
+        :param store: Хранилище эталонов.
+        :param tolerance: Допустимое отличие канала пикселя (0–255).
+        :param max_diff: Допустимая доля отличающихся пикселей.
+        :param max_distance: Расстояние pHash, после которого изображения
+            считаются разными без попиксельного сравнения.
+        :param workers: Количество процессов; 0 — сравнивать в текущем процессе.
+        :param update: Перезаписывать эталоны текущими снимками.
+        """
+        self.store = store
+        self.tolerance = tolerance
+        self.max_diff = max_diff
+        self.max_distance = max_distance
+        self.workers = workers
+        self.update = update
+        self._pool = None
+
+    def compare(self, images: dict[str, tuple]) -> list[Comparison]:
+        """
+        Сравнивает изображения с эталонами; в режиме обновления сохраняет эталоны.
+
+        :param images: Словарь {имя эталона: (изображение HxWx3, маска или None)}.
+        :return: Результаты в порядке `images`.
+        """
+        jobs = [
+            ComparisonJob(
+                name,
+                pixels,
+                mask,
+                self.store.ref(name),
+                self.store.directory,
+                self.tolerance,
+                self.max_diff,
+                self.max_distance,
+                self.update,
+            )
+            for name, (pixels, mask) in images.items()
+        ]
+        if self.workers and len(jobs) > 1:
+            if self._pool is None:
+                # spawn: форк процесса с потоками WebDriver и логирования небезопасен
+                self._pool = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            chunksize = max(1, len(jobs) // (self.workers * 4))
+            results = list(self._pool.map(compare_job, jobs, chunksize=chunksize))
+        else:
+            results = [compare_job(job) for job in jobs]
+        for result in results:
+            if result.status in ("new", "updated"):
+                self.store.save_ref(
+                    result.name, result.sha256, result.phash, result.shape
+                )
+        return results
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def pytest_unconfigure(self, config):
+        self.close()
+
+
+def _session_comparator() -> VisualComparator:
+    """
+    Сравнитель сессии или, вне pytest, сравнитель без пула процессов.
+    """
+    return comparator or VisualComparator(BaselineStore(VISUAL_BASELINES), workers=0)
+
+
+def baselines_missing(name: str, visual: VisualComparator = None) -> bool:
+    """
+    Проверка `name` не сможет пройти, потому что эталонов нет и сравнитель
+    не сохраняет их (не режим VISUAL_UPDATE).
+
+    :param name: Имя проверки.
+    :param visual: Сравнитель; по умолчанию — сравнитель сессии.
+    """
+    visual = visual or _session_comparator()
+    return not visual.update and not visual.store.has_refs(name)
+
+
+def check_region(
+    driver: WebDriver,
+    name: str,
+    locator: tuple,
+    item_selector: str = None,
+    masks: tuple = (),
+    visual: VisualComparator = None,
+) -> list[Comparison]:
+    """
+    Снимает область (или элементы внутри неё) и сравнивает с эталонами.
+    При несовпадении к отчёту Allure прикрепляется изображение отличий.
+
+    :param driver: Экземпляр WebDriver.
+    :param name: Имя проверки; эталоны элементов называются "<name>/<номер>".
+    :param locator: Кортеж, содержащий способ поиска контейнера и значение для поиска.
+    :param item_selector: CSS-селектор элементов внутри контейнера.
+    :param masks: CSS-селекторы областей, которые не сравниваются.
+    :param visual: Сравнитель; по умолчанию — сравнитель сессии.
+    :return: Результаты сравнения всех элементов.
+    """
+    visual = visual or _session_comparator()
+    images, item_masks = capture_regions(driver, locator, item_selector, masks)
+    names = [
+        name if item_selector is None else f"{name}/{index:03d}"
+        for index in range(len(images))
+    ]
+    results = visual.compare(
+        {
+            item_name: (pixels, mask)
+            for item_name, pixels, mask in zip(names, images, item_masks)
+            if pixels is not None
+        }
+    )
+    by_name = {result.name: result for result in results}
+    comparisons = []
+    for item_name, pixels in zip(names, images):
+        if pixels is None:
+            comparisons.append(
+                Comparison(
+                    item_name,
+                    "mismatch",
+                    "",
+                    0,
+                    (0, 0),
+                    reason="изображение не загрузилось",
+                )
+            )
+        else:
+            comparisons.append(by_name[item_name])
+    for result in comparisons:
+        if result.status == "new":
+            logger.warning(f"Сохранён новый эталон {result.name}")
+        if result.diff_png:
+            allure.attach(
+                result.diff_png,
+                name=f"visual-diff-{result.name}",
+                attachment_type=allure.attachment_type.PNG,
+            )
+    if not all(result.passed for result in comparisons):
+        allure.attach(
+            json.dumps(
+                [r.as_dict() for r in comparisons], ensure_ascii=False, indent=2
+            ),
+            name=f"visual-{name}",
+            attachment_type=allure.attachment_type.JSON,
+        )
+    return comparisons
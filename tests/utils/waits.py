@@ -0,0 +1,410 @@
+import time
+import weakref
+
+from selenium.common.exceptions import (
+    InvalidSelectorException,
+    JavascriptException,
+    TimeoutException,
+)
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from tests.utils import frontend_perf, timeouts
+from tests.utils.profiling import span
+from tests.utils.readiness import READY_JS, tracker_for
+
+# Поиск элементов по локатору Selenium внутри страницы. Используется всеми
+# скриптами, которые выполняются в браузере (ожидания, пакетные запросы).
+LOCATE_JS = """
+function locate(by, value, root) {
+    root = root || document;
+    switch (by) {
+        case "css selector":
+            return Array.from(root.querySelectorAll(value));
+        case "xpath": {
+            const snapshot = document.evaluate(
+                value, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            const nodes = [];
+            for (let i = 0; i < snapshot.snapshotLength; i++) {
+                nodes.push(snapshot.snapshotItem(i));
+            }
+            return nodes;
+        }
+        case "id":
+            return Array.from(root.querySelectorAll("#" + CSS.escape(value)));
+        case "name":
+            return Array.from(root.querySelectorAll('[name="' + CSS.escape(value) + '"]'));
+        case "tag name":
+            return Array.from(root.getElementsByTagName(value));
+        case "class name":
+            return Array.from(root.getElementsByClassName(value));
+        case "link text":
+            return Array.from(root.querySelectorAll("a")).filter(a => a.innerText.trim() === value);
+        case "partial link text":
+            return Array.from(root.querySelectorAll("a")).filter(a => a.innerText.includes(value));
+    }
+    throw new Error("Unsupported locator strategy: " + by);
+}
+
+function visible(el) {
+    const style = window.getComputedStyle(el);
+    if (style.display === "none" || style.visibility === "hidden" || style.opacity === "0") {
+        return false;
+    }
+    const rect = el.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0;
+}
+"""
+
+# Скрипт ожидания внутри страницы. Если документ новый, сначала дожидается
+# его готовности (см. readiness.READY_JS), затем проверяет условие сразу,
+# на каждое изменение DOM (MutationObserver) и по короткому таймеру (pollMs) для
+# изменений стилей и раскладки, которые MutationObserver не видит. Ответ возвращается
+# в тот же момент, когда условие выполнилось, без опроса по HTTP.
+# Если передан readyTimeoutMs, готовность документа ждётся не дольше readyTimeoutMs,
+# а timeoutMs отсчитывается заново после неё; иначе оба этапа делят timeoutMs.
+# В ответе ready_ms — сколько длилось ожидание готовности (null, если не дождались).
+_WAIT_SCRIPT = (
+    LOCATE_JS
+    + READY_JS
+    + """
+const [by, value, condition, text, timeoutMs, readiness, stamp, pollMs,
+       readyTimeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+const started = performance.now();
+
+function check() {
+    if (condition === "ready") return true;
+    const elements = locate(by, value);
+    const el = elements[0];
+    switch (condition) {
+        case "presence":
+            return el || null;
+        case "all":
+            return elements.length ? elements : null;
+        case "text":
+            return el && (el.innerText || el.textContent || "").includes(text) ? el : null;
+        case "clickable":
+            return el && visible(el) && !el.disabled ? el : null;
+    }
+    throw new Error("Unsupported condition: " + condition);
+}
+
+let finished = false, observer = null, interval = null, timer = null;
+let readyTimer = null, navigated = false, readyMs = null;
+function finish(result) {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    if (readiness.observer) readiness.observer.disconnect();
+    clearInterval(interval);
+    clearInterval(readyTimer);
+    clearTimeout(timer);
+    result.document = window.__autotestDocument || null;
+    result.navigated = navigated;
+    result.ready_ms = readyMs;
+    done(result);
+}
+function tick() {
+    try {
+        const value = check();
+        if (value) finish({ok: true, value: value});
+    } catch (e) {
+        finish({ok: false, error: String(e)});
+    }
+}
+
+const expire = () => finish({ok: false, timeout: true});
+timer = setTimeout(expire, readyTimeoutMs === null ? timeoutMs : readyTimeoutMs);
+try {
+    whenReady(readiness, stamp, changed => {
+        navigated = changed;
+        readyMs = performance.now() - started;
+        if (readyTimeoutMs !== null) {
+            clearTimeout(timer);
+            timer = setTimeout(expire, timeoutMs);
+        }
+        tick();
+        if (!finished) {
+            observer = new MutationObserver(tick);
+            observer.observe(document, {
+                childList: true, subtree: true, attributes: true, characterData: true});
+            interval = setInterval(tick, pollMs);
+        }
+    });
+} catch (e) {
+    finish({ok: false, error: String(e)});
+}
+"""
+)
+
+# Плавная прокрутка до элемента с ожиданием её окончания: по событию scrollend,
+# а там, где его нет (или прокрутка не понадобилась), — по стабильной позиции
+# элемента в течение нескольких кадров.
+_SCROLL_SCRIPT = """
+const [el, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+let finished = false, stableFrames = 0, lastTop = null, timer = null;
+function finish() {
+    if (finished) return;
+    finished = true;
+    document.removeEventListener("scrollend", finish, true);
+    clearTimeout(timer);
+    done(true);
+}
+document.addEventListener("scrollend", finish, true);
+timer = setTimeout(finish, timeoutMs);
+el.scrollIntoView({behavior: "smooth", block: "center"});
+function frame() {
+    if (finished) return;
+    const top = el.getBoundingClientRect().top;
+    stableFrames = top === lastTop ? stableFrames + 1 : 0;
+    lastTop = top;
+    if (stableFrames >= 3) finish(); else requestAnimationFrame(frame);
+}
+requestAnimationFrame(frame);
+"""
+
+# Запасные условия для WebDriverWait, если скрипт в странице выполнить нельзя.
+_FALLBACK_CONDITIONS = {
+    "presence": EC.presence_of_element_located,
+    "all": EC.presence_of_all_elements_located,
+    "clickable": EC.element_to_be_clickable,
+    "ready": lambda locator: lambda driver: driver.execute_script(
+        "return document.readyState !== 'loading';"
+    ),
+}
+
+# Запас к таймауту асинхронного скрипта: ожидание завершает сама страница,
+# а таймаут сессии нужен лишь как страховка.
+_SCRIPT_TIMEOUT_MARGIN = 5
+
+_script_timeouts: "weakref.WeakKeyDictionary[WebDriver, float]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class InPageWait:
+    """
+    Движок ожиданий, выполняющий ожидание внутри страницы через execute_async_script.
+
+    Вместо опроса WebDriver раз в 500 мс условие проверяется браузером при каждом
+    изменении DOM, поэтому результат возвращается через миллисекунды после того,
+    как условие выполнилось. Готовность документа (см. Readiness) проверяется
+    тем же скриптом и только для документа, который ещё не проверялся.
+    Если страница сменилась во время ожидания, скрипт перезапускается в новом
+    документе; если скрипт выполнить невозможно, используется WebDriverWait
+    с частым опросом.
+
+    Ожидание без явного таймаута получает таймаут из профиля таймаутов
+    (см. TimeoutProfile), и его длительность записывается в историю профиля.
+    """
+
+    def __init__(self, driver: WebDriver, poll_frequency: float | None = None):
+        """
+        :param driver: Экземпляр WebDriver.
+        :param poll_frequency: Интервал проверки условия; по умолчанию — из профиля.
+        """
+        self.driver = driver
+        self.profile = timeouts.profile
+        self.poll_frequency = poll_frequency or self.profile.poll
+        self.tracker = tracker_for(driver)
+
+    def ready(self, timeout: float | None = None):
+        """
+        Ожидает готовности текущего документа, если она ещё не подтверждена.
+
+        :param timeout: Максимальное время ожидания в секундах; None — по профилю.
+        """
+        self.until((None, None), "ready", timeout)
+
+    def presence(self, locator: tuple, timeout: float | None = None) -> WebElement:
+        """
+        Ожидает появления элемента в DOM.
+
+        :param locator: Кортеж, содержащий способ поиска элемента и значение для поиска.
+        :param timeout: Максимальное время ожидания в секундах; None — по профилю.
+        :return: Найденный веб-элемент.
+        """
+        return self.until(locator, "presence", timeout)
+
+    def all_present(
+        self, locator: tuple, timeout: float | None = None
+    ) -> list[WebElement]:
+        """
+        Ожидает появления хотя бы одного элемента и возвращает все найденные.
+
+        :param locator: Кортеж, содержащий способ поиска элемента и значение для поиска.
+        :param timeout: Максимальное время ожидания в секундах; None — по профилю.
+        :return: Список найденных веб-элементов.
+        """
+        return self.until(locator, "all", timeout)
+
+    def text_present(
+        self, locator: tuple, text: str, timeout: float | None = None
+    ) -> WebElement:
+        """
+        Ожидает появления текста в элементе.
+
+        :param locator: Кортеж, содержащий способ поиска элемента и значение для поиска.
+        :param text: Ожидаемый текст.
+        :param timeout: Максимальное время ожидания в секундах; None — по профилю.
+        :return: Элемент, содержащий текст.
+        """
+        return self.until(locator, "text", timeout, text)
+
+    def clickable(self, locator: tuple, timeout: float | None = None) -> WebElement:
+        """
+        Ожидает, пока элемент станет видимым и доступным для клика.
+
+        :param locator: Кортеж, содержащий способ поиска элемента и значение для поиска.
+        :param timeout: Максимальное время ожидания в секундах; None — по профилю.
+        :return: Найденный веб-элемент.
+        """
+        return self.until(locator, "clickable", timeout)
+
+    def scroll_into_view(self, element: WebElement, timeout: float = 2):
+        """
+        Плавно прокручивает страницу до элемента и ждёт окончания прокрутки.
+
+        :param element: Веб-элемент.
+        :param timeout: Максимальное время ожидания окончания прокрутки в секундах.
+        """
+        self._ensure_script_timeout(timeout)
+        with span("wait:scroll"):
+            self.driver.execute_async_script(
+                _SCROLL_SCRIPT, element, int(timeout * 1000)
+            )
+
+    def until(
+        self,
+        locator: tuple,
+        condition: str,
+        timeout: float | None = None,
+        text: str = None,
+    ):
+        """
+        Ожидает выполнения условия для элемента внутри страницы.
+
+        :param locator: Кортеж, содержащий способ поиска элемента и значение для поиска.
+        :param condition: Условие: "presence", "all", "text", "clickable" или "ready".
+        :param timeout: Максимальное время ожидания в секундах; None — по профилю.
+        :param text: Ожидаемый текст для условия "text".
+        :return: Веб-элемент или список веб-элементов.
+        :raises TimeoutException: Если условие не выполнилось за время ожидания.
+        """
+        if timeout is not None or condition == "ready":
+            with span(f"wait:{condition}"):
+                return self._until(
+                    locator, condition, timeout or self.profile.default, text
+                )[0]
+        # Таймаут профиля относится только к ожиданию условия: готовность нового
+        # документа (загрузка страницы) ждётся отдельно с таймаутом по умолчанию
+        # и не попадает в историю локатора.
+        with span(f"wait:{condition}"):
+            try:
+                value, waited = self._until(
+                    locator,
+                    condition,
+                    self.profile.timeout_for(locator),
+                    text,
+                    self.profile.default,
+                )
+            except TimeoutException as e:
+                raise TimeoutException(
+                    f"{e.msg} ({self.profile.describe(locator)})"
+                ) from e
+        if waited is not None:
+            self.profile.record(locator, waited)
+        return value
+
+    def _until(
+        self,
+        locator: tuple,
+        condition: str,
+        timeout: float,
+        text: str,
+        ready_timeout: float | None = None,
+    ) -> tuple[object, float | None]:
+        """
+        :param ready_timeout: Если задан, готовность нового документа ждётся
+            не дольше ready_timeout, а timeout относится только к условию.
+        :return: Результат ожидания и время ожидания условия без ожидания
+            готовности документа (None для запасного WebDriverWait).
+        """
+        by, value = locator
+        budget = timeout + (ready_timeout or 0)
+        deadline = time.monotonic() + budget
+        self._ensure_script_timeout(budget)
+        waited = 0.0
+        while (remaining := deadline - time.monotonic()) > 0:
+            started = time.monotonic()
+            try:
+                result = self.driver.execute_async_script(
+                    _WAIT_SCRIPT,
+                    by,
+                    value,
+                    condition,
+                    text,
+                    int(min(remaining, max(timeout - waited, 0.05)) * 1000),
+                    self.tracker.readiness.as_script_argument(),
+                    self.tracker.next_stamp,
+                    int(self.poll_frequency * 1000),
+                    (
+                        None
+                        if ready_timeout is None
+                        else int(min(remaining, ready_timeout) * 1000)
+                    ),
+                )
+            except JavascriptException as e:
+                if "unload" in str(e):
+                    # Документ сменился во время ожидания: ждём уже в новом.
+                    continue
+                return self._fallback(locator, condition, remaining, text), None
+            except TimeoutException:
+                break
+            ready_ms = result.get("ready_ms")
+            if ready_ms is not None:
+                waited += time.monotonic() - started - ready_ms / 1000
+            if (
+                self.tracker.observe(result.get("document"))
+                and frontend_perf.collector is not None
+            ):
+                # Новый документ: снимаем метрики страницы один раз
+                with span("perf:collect"):
+                    frontend_perf.collector.collect(self.driver)
+            if result.get("ok"):
+                return result["value"], max(waited, 0.0)
+            if result.get("error"):
+                raise InvalidSelectorException(f"{result['error']}: {locator}")
+            if ready_timeout is not None and ready_ms is None:
+                raise TimeoutException(
+                    f"Документ не стал готов за {ready_timeout} с "
+                    f"(ожидание '{condition}': {locator})"
+                )
+            break
+        raise TimeoutException(
+            f"Условие '{condition}' не выполнилось за {timeout} с: {locator}"
+        )
+
+    def _fallback(self, locator: tuple, condition: str, timeout: float, text: str):
+        """
+        Ожидание через WebDriverWait с частым опросом.
+        """
+        wait = WebDriverWait(self.driver, timeout, poll_frequency=self.poll_frequency)
+        if condition == "text":
+            wait.until(EC.text_to_be_present_in_element(locator, text))
+            return self.driver.find_element(*locator)
+        return wait.until(_FALLBACK_CONDITIONS[condition](locator))
+
+    def _ensure_script_timeout(self, timeout: float):
+        """
+        Увеличивает таймаут асинхронных скриптов сессии, если он меньше нужного.
+        Команда отправляется только при изменении значения.
+        """
+        required = timeout + _SCRIPT_TIMEOUT_MARGIN
+        if _script_timeouts.get(self.driver, 0) < required:
+            self.driver.set_script_timeout(required)
+            _script_timeouts[self.driver] = required